@@ -8,15 +8,30 @@ receiver sensitivity, and propagation models.
 
 Key Features:
 - Real-time calculation of maximum communication distance
-- Support for two path loss models:
+- Path loss models from a shared registry (link_budget.models):
   * Classic Model (1 km reference) - for outdoor/long-range links
   * Log-distance Model (1m reference) - for indoor/short-range analysis
-- Interactive visualization showing impact of path loss exponent on range
+  * Okumura-Hata and COST-231 Hata - for macro-cell links
+  * Two-ray ground reflection and ITU-R P.1238 indoor
+- Interactive visualization showing impact of path loss exponent on range, drawn
+  client-side (Vega-Lite) from the computed series, with PNG export on demand
 - Multiple unit conversions (kilometers, meters, miles, feet)
 - Adjustable FSPL (Free Space Path Loss) exponent for different environments
+- Optional ITU-R gas and rain attenuation, solved into the distance of every section
+- Optional Monte Carlo fading/shadowing simulation of link availability vs. distance
+- Optional area coverage heatmap for one or more transmitters
+- Design solver for the parameters required to reach target distances
+- Optional parameter sweep with tornado and contour charts of range sensitivity
+- Optional terrain path profile with Fresnel clearance and knife-edge diffraction loss
+- Optional per-channel range across a band with frequency-dependent antenna gain and cable loss tables
+- Optional fit of the path loss exponent to field RSSI measurements, with confidence intervals
+- Saved, tagged scenarios in a local SQLite store, with shareable links and bulk import/export
+- Optional mesh network planning: every feasible link between many nodes, with connectivity statistics
 
 How to Run:
     streamlit run app.py
+    LINK_BUDGET_PROFILE=1 streamlit run app.py   # log per-stage timings of every rerun
+    LINK_BUDGET_DB=/data/scenarios.db streamlit run app.py   # where saved scenarios are kept
 
 Usage:
 1. Adjust parameters in the left sidebar:
@@ -35,52 +50,82 @@ Requirements:
 - matplotlib
 """
 
+import io
+import os
+
 import streamlit as st
-import math
 import numpy as np
-import matplotlib.pyplot as plt
+
+from link_budget import atmosphere, charts, core, coverage, models, montecarlo, network, profiling, scenarios, solver, sweep, telemetry, terrain, wideband
+from link_budget.cache import LRUCache, figure_to_png, make_key
 
 # Minimum positive value for log scale compatibility
 MIN_POSITIVE_VALUE = 1e-10
 
+# Sidebar labels of the parameters available to the sensitivity analysis
+SWEEP_LABELS = {
+    "p_tx": "Transmit Power (dBm)",
+    "g_tx": "Transmit Antenna Gain (dBi)",
+    "l_tx": "Transmit Cable Loss (dB)",
+    "freq_mhz": "Frequency (MHz)",
+    "g_rx": "Receiver Antenna Gain (dBi)",
+    "l_rx": "Receiver Cable Loss (dB)",
+    "l_fade": "Fade Margin (dB)",
+    "l_misc": "Misc. Losses (dB)",
+    "p_rx_sensitivity": "Receiver Sensitivity (dBm)",
+    "n": "FSPL Exponent (n)",
+}
+
+# Distance unit label -> kilometers per unit
+DISTANCE_UNITS_KM = {
+    "Kilometers": 1.0,
+    "Meters": 1 / core.M_PER_KM,
+    "Miles": 1 / core.MI_PER_KM,
+    "Feet": 1 / (core.M_PER_KM * core.FT_PER_M),
+}
+
+# Largest N-dimensional grid the sensitivity analysis will evaluate interactively
+MAX_SWEEP_CELLS = 50_000_000
+
+# Sidebar number inputs that a saved scenario restores (the widget keys are the input names)
+SCENARIO_NUMBER_INPUTS = ("p_tx", "g_tx", "l_tx", "freq_mhz", "g_rx", "l_rx", "l_fade", "l_misc", "p_rx_sensitivity")
+
+# Links beyond this many are left off the network map (statistics still cover all of them)
+MAX_PLOTTED_LINKS = 50_000
+
+# Denser networks than this are not evaluated interactively
+MAX_NETWORK_LINKS = 2_000_000
+
 def calculate_max_path_loss(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity):
     """Calculates the maximum allowable path loss in the link budget."""
-    return p_tx + g_tx + g_rx - l_tx - l_rx - l_fade - l_misc - p_rx_sensitivity
+    return float(core.max_path_loss(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity))
 
-def calculate_distance_from_pl(max_path_loss, freq_mhz, n, model_choice):
-    """Calculates distance based on path loss, frequency, exponent, and model choice."""
-    if max_path_loss < 0:
-        return None, None
+def calculate_distance_from_pl(max_path_loss, freq_mhz, n, model_choice, **model_params):
+    """Calculates distance (km) based on path loss, frequency, exponent, and model choice.
 
-    try:
-        if model_choice == "1m":
-            # Using 1-meter reference model: PL(d) = (20log10(f) - 27.55) + 10n*log10(d_m)
-            log_term = (max_path_loss - 20 * math.log10(freq_mhz) + 27.55) / (10 * n)
-            distance_m = 10 ** log_term
-            distance_km = distance_m / 1000
-        else: # "1km"
-            # Using 1-km reference model: PL(d) = 20log10(f) + 10n*log10(d_km) + 32.44
-            log_term = (max_path_loss - 20 * math.log10(freq_mhz) - 32.44) / (10 * n)
-            distance_km = 10 ** log_term
-
-        return distance_km
-    except (ValueError, ZeroDivisionError):
+    Returns None when the link cannot be established. Use
+    link_budget.core.distance_from_path_loss for arrays of links.
+    """
+    result = core.distance_from_path_loss(max_path_loss, freq_mhz, n, model_choice, **model_params)
+    if not result.feasible:
         return None
+    return float(result.km)
 
-def create_plot(max_path_loss, freq_mhz, current_n, current_dist_ft, model_choice, x_scale='linear', y_scale='linear'):
+def exponent_sweep(max_path_loss, freq_mhz, model_choice, model_params=None, points=100):
+    """Returns the FSPL exponents from 2 to 10 and the maximum distance (ft) at each."""
+    n_values = np.linspace(2.0, 10.0, points)
+    distances_ft = core.distance_from_path_loss(max_path_loss, freq_mhz, n_values, model_choice, **(model_params or {})).ft
+    return n_values, distances_ft
+
+def create_plot(max_path_loss, freq_mhz, current_n, current_dist_ft, model_choice, x_scale='linear', y_scale='linear', model_params=None):
     """Creates and returns a matplotlib figure of distance vs. FSPL exponent."""
-    fig, ax = plt.subplots(figsize=(6, 4))
+    import matplotlib.pyplot as plt
 
-    n_values = np.linspace(2.0, 10.0, 100)
-    distances_ft = []
+    fig, ax = plt.subplots(figsize=(6, 4))
 
-    for n_val in n_values:
-        dist_km = calculate_distance_from_pl(max_path_loss, freq_mhz, n_val, model_choice)
-        if dist_km is not None and dist_km > 0:
-            distances_ft.append(dist_km * 1000 * 3.28084)
-        else:
-            # Use MIN_POSITIVE_VALUE for log scale compatibility
-            distances_ft.append(MIN_POSITIVE_VALUE)
+    n_values, distances_ft = exponent_sweep(max_path_loss, freq_mhz, model_choice, model_params)
+    # Use MIN_POSITIVE_VALUE for log scale compatibility
+    distances_ft = np.where(distances_ft > 0, distances_ft, MIN_POSITIVE_VALUE)
 
     ax.plot(n_values, distances_ft, label="Max Distance vs. FSPL Exponent")
     if current_dist_ft is not None:
@@ -99,8 +144,272 @@ def create_plot(max_path_loss, freq_mhz, current_n, current_dist_ft, model_choic
     fig.tight_layout()
     return fig
 
+def create_chart_spec(max_path_loss, freq_mhz, current_n, current_dist_ft, model_choice, x_scale='linear', y_scale='linear',
+                      model_params=None, points=100, max_points=charts.DEFAULT_MAX_POINTS):
+    """Creates a Vega-Lite spec of distance vs. FSPL exponent, drawn in the browser instead of as a PNG."""
+    n_values, distances_ft = exponent_sweep(max_path_loss, freq_mhz, model_choice, model_params, points)
+    marker = None if current_dist_ft is None else (current_n, current_dist_ft)
+    return charts.line_chart_spec(
+        n_values, distances_ft, "FSPL Path Loss Exponent (n)", "Maximum Distance (ft)",
+        title="Impact of Path Loss Exponent on Range", x_scale=x_scale, y_scale=y_scale,
+        line_label="Max Distance vs. FSPL Exponent", marker=marker,
+        marker_label=None if marker is None else f"Current: {current_dist_ft:,.0f} ft", max_points=max_points)
+
+def create_availability_plot(distribution, max_path_loss, freq_mhz, n, model_choice, target_availability, target_dist_ft, model_params=None):
+    """Creates and returns a matplotlib figure of simulated link availability vs. distance."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+
+    # Span from near-certain coverage out to where the link almost never closes
+    model_params = model_params or {}
+    bounds_km = montecarlo.distance_for_availability(max_path_loss, freq_mhz, n, model_choice, [0.99999, 0.01], distribution, **model_params).km
+    distances_km = np.geomspace(bounds_km[0] / 2, bounds_km[1], 200)
+    availability = montecarlo.availability(max_path_loss, freq_mhz, n, model_choice, distances_km, distribution, **model_params)
+    distances_ft = distances_km * core.M_PER_KM * core.FT_PER_M
+
+    ax.plot(distances_ft, availability * 100, label="Simulated Availability")
+    ax.axhline(target_availability * 100, color='gray', linestyle=':', label=f'Target: {target_availability:.3%}')
+    if target_dist_ft is not None:
+        ax.plot(target_dist_ft, target_availability * 100, 'ro', label=f'Range: {target_dist_ft:,.0f} ft')
+
+    ax.set_xlabel("Distance (ft)")
+    ax.set_ylabel("Link Availability (%)")
+    ax.set_title("Link Availability vs. Distance")
+    ax.set_ylim(0, 100.5)
+    ax.grid(True, which='both', linestyle='--')
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+def create_coverage_plot(result, transmitters):
+    """Creates and returns a matplotlib heatmap of link margin over the coverage area."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 5))
+
+    grid = result.grid
+    margin = result.margin_db(coverage.preview_stride(grid))
+    extent_km = [v / core.M_PER_KM for v in (grid.x_min, grid.x_max, grid.y_min, grid.y_max)]
+    # Center the diverging colormap on 0 dB so covered/uncovered reads at a glance
+    limit = min(40.0, max(1.0, float(np.nanmax(np.abs(margin)))))
+
+    image = ax.imshow(margin, origin='lower', extent=extent_km, cmap='RdYlGn', vmin=-limit, vmax=limit)
+    ax.contour(margin, levels=[0.0], origin='lower', extent=extent_km, colors='black', linewidths=1)
+    tx_km = np.array(transmitters) / core.M_PER_KM
+    ax.plot(tx_km[:, 0], tx_km[:, 1], 'k^', label='Transmitter')
+    fig.colorbar(image, ax=ax, label="Link Margin (dB)")
+
+    ax.set_xlabel("X (km)")
+    ax.set_ylabel("Y (km)")
+    ax.set_title(f"Coverage: {result.coverage_fraction():.1%} of Area")
+    ax.legend(loc='upper right')
+    fig.tight_layout()
+    return fig
+
+def create_network_plot(x_m, y_m, result):
+    """Creates and returns a matplotlib map of network nodes and their feasible links, colored by margin."""
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    fig, ax = plt.subplots(figsize=(6, 5))
+
+    x_km = np.asarray(x_m) / core.M_PER_KM
+    y_km = np.asarray(y_m) / core.M_PER_KM
+    # Strongest links first when there are too many to draw
+    shown = np.argsort(-result.margin_db)[:MAX_PLOTTED_LINKS]
+    segments = np.stack([np.column_stack((x_km[result.source[shown]], y_km[result.source[shown]])),
+                         np.column_stack((x_km[result.target[shown]], y_km[result.target[shown]]))], axis=1)
+    links = LineCollection(segments, array=result.margin_db[shown], cmap='viridis', linewidths=0.6)
+    ax.add_collection(links)
+    isolated = result.degree() == 0
+    ax.plot(x_km[~isolated], y_km[~isolated], 'k.', markersize=2, label='Connected Node')
+    ax.plot(x_km[isolated], y_km[isolated], 'rx', markersize=4, label='Isolated Node')
+    if len(shown):
+        fig.colorbar(links, ax=ax, label="Link Margin (dB)")
+
+    ax.set_xlabel("X (km)")
+    ax.set_ylabel("Y (km)")
+    ax.set_title("Feasible Links")
+    ax.set_aspect('equal', adjustable='datalim')
+    ax.legend(loc='upper right', fontsize='small')
+    fig.tight_layout()
+    return fig
+
+def create_terrain_plot(dem, tx_xy, rx_xy, tx_height_m, rx_height_m, freq_mhz):
+    """Creates and returns a matplotlib figure of the terrain profile, direct ray and Fresnel zone."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+
+    profile = terrain.terrain_profiles(dem, [tx_xy], [rx_xy], tx_height_m, rx_height_m, freq_mhz)
+    distance_km = profile.distance_m[0] / core.M_PER_KM
+    terrain_m = profile.terrain_m[0]
+    los_m = profile.line_of_sight_m[0]
+    fresnel_m = profile.fresnel_radius_m[0]
+
+    ax.fill_between(distance_km, np.nanmin(terrain_m) - 10, terrain_m, color='tan', label='Terrain (incl. earth bulge)')
+    ax.plot(distance_km, los_m, 'b-', label='Direct Ray')
+    ax.plot(distance_km, los_m - fresnel_m, 'b--', linewidth=0.8, label='1st Fresnel Zone')
+    ax.plot(distance_km, los_m + fresnel_m, 'b--', linewidth=0.8)
+    ax.plot(distance_km, los_m - terrain.FRESNEL_CLEARANCE_RATIO * fresnel_m, 'g:', linewidth=0.8,
+            label=f'{terrain.FRESNEL_CLEARANCE_RATIO:.0%} Fresnel Clearance')
+
+    ax.set_xlabel("Distance from Transmitter (km)")
+    ax.set_ylabel("Elevation (m)")
+    ax.set_title("Terrain Path Profile")
+    ax.grid(True, which='both', linestyle='--')
+    ax.legend(fontsize='small')
+    fig.tight_layout()
+    return fig
+
+def parse_distances(text):
+    """Parses a comma- or whitespace-separated list of positive distances."""
+    try:
+        values = [float(item) for item in text.replace(",", " ").split()]
+    except ValueError:
+        raise ValueError("Target distances must be numbers separated by commas.") from None
+    if not values or any(value <= 0 for value in values):
+        raise ValueError("Enter one or more positive target distances.")
+    return values
+
+def format_exponent(value):
+    """Formats a maximum exponent, where inf means any exponent and NaN unreachable."""
+    if np.isnan(value):
+        return "Not reachable"
+    if np.isinf(value):
+        return "Any"
+    return f"{value:.2f}"
+
+def sweep_spans(base, names, swing_db, freq_swing_pct, n_swing):
+    """Returns the (low, high) range of each parameter around its current value."""
+    spans = {}
+    for name in names:
+        value = base[name]
+        if name == "freq_mhz":
+            spans[name] = (value * (1 - freq_swing_pct / 100), value * (1 + freq_swing_pct / 100))
+        elif name == "n":
+            spans[name] = (max(2.0, value - n_swing), min(10.0, value + n_swing))
+        else:
+            spans[name] = (value - swing_db, value + swing_db)
+    return spans
+
+def create_tornado_plot(bars, base_dist_km):
+    """Creates and returns a matplotlib tornado chart of max distance per parameter swing."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 0.6 * len(bars) + 1.5))
+
+    # Largest swing on top
+    for i, bar in enumerate(reversed(bars)):
+        for value, dist, color in ((bar.low_value, bar.low_distance_km, 'tab:red'),
+                                   (bar.high_value, bar.high_distance_km, 'tab:green')):
+            dist = 0.0 if np.isnan(dist) else dist
+            ax.barh(i, dist - base_dist_km, left=base_dist_km, color=color, alpha=0.8)
+            ax.text(dist, i, f' {value:g} ', va='center', ha='left' if dist >= base_dist_km else 'right', fontsize=8)
+
+    ax.axvline(base_dist_km, color='black', linewidth=1)
+    ax.set_yticks(range(len(bars)))
+    ax.set_yticklabels([SWEEP_LABELS[bar.name] for bar in reversed(bars)])
+    ax.set_xlabel("Maximum Distance (km)")
+    ax.set_title("Sensitivity of Range (low = red, high = green)")
+    ax.grid(True, axis='x', linestyle='--')
+    fig.tight_layout()
+    return fig
+
+def create_contour_plot(result, current_x, current_y):
+    """Creates and returns a matplotlib contour plot of max distance over two swept parameters."""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(6, 4))
+
+    x_values, y_values = result.values
+    # Rows of the contour grid follow the y parameter
+    distance_km = result.distance_km.T
+    contours = ax.contourf(x_values, y_values, distance_km, levels=20, cmap='viridis')
+    ax.contour(x_values, y_values, distance_km, levels=contours.levels[::4], colors='white', linewidths=0.5)
+    ax.plot(current_x, current_y, 'ro', label='Current')
+    fig.colorbar(contours, ax=ax, label="Maximum Distance (km)")
+
+    ax.set_xlabel(SWEEP_LABELS[result.names[0]])
+    ax.set_ylabel(SWEEP_LABELS[result.names[1]])
+    ax.set_title("Maximum Distance Contours")
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+@st.cache_resource
+def get_elevation_model(path, mtime):
+    """Opens an elevation raster once per file version; its tile cache is shared by all sessions."""
+    return terrain.ElevationModel.open(path)
+
+@st.cache_resource
+def get_frequency_table(data, name):
+    """Parses an uploaded gain/loss table once per file content."""
+    return wideband.FrequencyTable.read(io.StringIO(data.decode("utf-8")), name)
+
+@st.cache_resource
+def get_result_cache():
+    """Returns the process-wide cache of rendered charts and results, shared by all sessions."""
+    return LRUCache(max_entries=512, max_bytes=128 * 1024 * 1024)
+
+@st.cache_resource
+def get_scenario_store():
+    """Opens the scenario database (LINK_BUDGET_DB, default scenarios.db) once per process."""
+    return scenarios.ScenarioStore()
+
+def apply_scenario(inputs):
+    """Copies a saved scenario's inputs into the sidebar widgets; call before the widgets are created."""
+    for name in SCENARIO_NUMBER_INPUTS:
+        st.session_state[name] = float(inputs[name])
+    st.session_state["n"] = min(max(float(inputs["n"]), 2.0), 10.0)
+    st.session_state["model_choice"] = inputs["model"]
+    for param_name, spec in models.get_model(inputs["model"]).parameters.items():
+        value = inputs.get(param_name, spec.default)
+        labels = [label for label, choice in (spec.choices or {}).items() if float(choice) == float(value)]
+        if labels:
+            st.session_state[f"model_{inputs['model']}_{param_name}"] = labels[0]
+        elif not spec.choices:
+            st.session_state[f"model_{param_name}"] = float(value)
+    st.session_state["atmosphere"] = any(name in inputs for name in atmosphere.PARAMETERS)
+    for param_name, spec in atmosphere.PARAMETERS.items():
+        value = float(inputs.get(param_name, spec.default))
+        labels = [label for label, choice in (spec.choices or {}).items() if float(choice) == value]
+        if labels:
+            st.session_state[f"atm_{param_name}"] = labels[0]
+        elif not spec.choices:
+            st.session_state[f"atm_{param_name}"] = value
+
+def load_selected_scenario():
+    """Button callback: applies the scenario chosen in the sidebar and makes it the shared link."""
+    scenario = get_scenario_store().get(st.session_state.get("selected_scenario"))
+    if scenario is not None:
+        apply_scenario(scenario.inputs)
+        st.query_params["scenario"] = scenario.name
+        st.session_state["shared_scenario"] = scenario.name
+
+def apply_fitted_exponent(fit):
+    """Button callback: moves the fitted exponent and reference offset into the sidebar budget."""
+    st.session_state["n"] = min(max(round(fit.n, 1), 2.0), 10.0)
+    st.session_state["l_misc"] = round(fit.offset_db, 1)
+
+def render_png(create_figure, *args):
+    """Builds a chart with create_figure(*args) and encodes it to PNG, timing each step."""
+    with profiler.stage("render"):
+        fig = create_figure(*args)
+    with profiler.stage("serialize"):
+        return figure_to_png(fig)
+
+def show_chart(png, container=st):
+    """Sends a rendered chart to the page."""
+    with profiler.stage("serialize"):
+        container.image(png, width="stretch")
+
 # --- Streamlit App Layout ---
 
+# Per-stage timings of this rerun, recorded only when LINK_BUDGET_PROFILE is set
+profiler = profiling.RerunProfiler("app")
+
 st.set_page_config(layout="centered")
 st.title("Interactive Link Budget Calculator")
 
@@ -128,28 +437,193 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# A ?scenario=<name> link opens that saved scenario once per session
+scenario_store = get_scenario_store()
+shared_name = st.query_params.get("scenario")
+if shared_name and st.session_state.get("shared_scenario") != shared_name:
+    st.session_state["shared_scenario"] = shared_name
+    shared_scenario = scenario_store.get(shared_name)
+    if shared_scenario is None:
+        st.warning(f"Saved scenario '{shared_name}' was not found.")
+    else:
+        apply_scenario(shared_scenario.inputs)
+
 # --- Sidebar for Inputs ---
 st.sidebar.header("Parameters")
 
-p_tx = st.sidebar.number_input("Transmit Power (dBm)", value=20.0, step=0.2, format="%.1f")
-g_tx = st.sidebar.number_input("Transmit Antenna Gain (dBi)", value=0.0, step=0.2, format="%.1f")
-l_tx = st.sidebar.number_input("Transmit Cable Loss (dB)", value=0.0, step=0.2, format="%.1f")
-freq_mhz = st.sidebar.number_input("Frequency (MHz)", value=2400.0, step=10.0, format="%.1f")
-g_rx = st.sidebar.number_input("Receiver Antenna Gain (dBi)", value=0.0, step=0.2, format="%.1f")
-l_rx = st.sidebar.number_input("Receiver Cable Loss (dB)", value=0.0, step=0.2, format="%.1f")
-l_fade = st.sidebar.number_input("Fade Margin (dB)", value=0.0, step=0.2, format="%.1f")
-l_misc = st.sidebar.number_input("Misc. Losses (dB)", value=0.0, step=0.2, format="%.1f")
-p_rx_sensitivity = st.sidebar.number_input("Receiver Sensitivity (dBm)", value=-95.0, step=0.2, format="%.1f")
+p_tx = st.sidebar.number_input("Transmit Power (dBm)", value=20.0, step=0.2, format="%.1f", key="p_tx")
+g_tx = st.sidebar.number_input("Transmit Antenna Gain (dBi)", value=0.0, step=0.2, format="%.1f", key="g_tx")
+l_tx = st.sidebar.number_input("Transmit Cable Loss (dB)", value=0.0, step=0.2, format="%.1f", key="l_tx")
+freq_mhz = st.sidebar.number_input("Frequency (MHz)", value=2400.0, step=10.0, format="%.1f", key="freq_mhz")
+g_rx = st.sidebar.number_input("Receiver Antenna Gain (dBi)", value=0.0, step=0.2, format="%.1f", key="g_rx")
+l_rx = st.sidebar.number_input("Receiver Cable Loss (dB)", value=0.0, step=0.2, format="%.1f", key="l_rx")
+l_fade = st.sidebar.number_input("Fade Margin (dB)", value=0.0, step=0.2, format="%.1f", key="l_fade")
+l_misc = st.sidebar.number_input("Misc. Losses (dB)", value=0.0, step=0.2, format="%.1f", key="l_misc")
+p_rx_sensitivity = st.sidebar.number_input("Receiver Sensitivity (dBm)", value=-95.0, step=0.2, format="%.1f", key="p_rx_sensitivity")
 
-n = st.sidebar.slider("FSPL Exponent (n)", min_value=2.0, max_value=10.0, value=2.0, step=0.1)
+n = st.sidebar.slider("FSPL Exponent (n)", min_value=2.0, max_value=10.0, value=2.0, step=0.1, key="n")
 
 st.sidebar.subheader("Path Loss Model")
-model_choice_label = st.sidebar.radio(
+model_choice = st.sidebar.radio(
     "Select Model:",
-    ("Classic Model (1 km reference)", "Log-distance Model (1m reference)"),
-    index=1
+    list(models.MODELS),
+    index=list(models.MODELS).index("1m"),
+    format_func=lambda name: models.MODELS[name].label,
+    key="model_choice",
 )
-model_choice = "1m" if "1m reference" in model_choice_label else "1km"
+selected_model = models.get_model(model_choice)
+
+# Widgets for the selected model's extra inputs come from the registry
+model_params = {}
+for param_name, spec in selected_model.parameters.items():
+    if spec.choices:
+        choice_label = st.sidebar.selectbox(spec.label, list(spec.choices),
+                                            index=list(spec.choices.values()).index(spec.default),
+                                            key=f"model_{model_choice}_{param_name}")
+        model_params[param_name] = float(spec.choices[choice_label])
+    else:
+        model_params[param_name] = st.sidebar.number_input(spec.label, value=float(spec.default), step=float(spec.step),
+                                                           format="%.1f", key=f"model_{param_name}")
+if not selected_model.uses_exponent:
+    st.sidebar.caption("This model does not use the FSPL exponent.")
+
+st.sidebar.subheader("Atmospheric Losses")
+include_atmosphere = st.sidebar.checkbox("Gas & rain attenuation", value=False, key="atmosphere")
+atmospheric_params = {}
+if include_atmosphere:
+    for param_name, spec in atmosphere.PARAMETERS.items():
+        if spec.choices:
+            choice_label = st.sidebar.selectbox(spec.label, list(spec.choices),
+                                                index=list(spec.choices.values()).index(spec.default),
+                                                key=f"atm_{param_name}")
+            atmospheric_params[param_name] = float(spec.choices[choice_label])
+        else:
+            atmospheric_params[param_name] = st.sidebar.number_input(spec.label, value=float(spec.default),
+                                                                     step=float(spec.step), format="%.2f",
+                                                                     key=f"atm_{param_name}")
+    # Every section takes the attenuation through the model inputs
+    model_params.update(atmospheric_params)
+
+st.sidebar.subheader("Fading Simulation")
+simulate_fading = st.sidebar.checkbox("Monte Carlo fading & shadowing", value=False)
+if simulate_fading:
+    shadowing_sigma = st.sidebar.number_input("Shadowing Std. Dev. (dB)", min_value=0.0, value=8.0, step=0.5, format="%.1f")
+    fading_label = st.sidebar.selectbox("Small-scale Fading", ("Rayleigh", "Rician", "None"))
+    rician_k_db = 6.0
+    if fading_label == "Rician":
+        rician_k_db = st.sidebar.number_input("Rician K-factor (dB)", value=6.0, step=0.5, format="%.1f")
+    target_availability = st.sidebar.number_input("Target Availability (%)", min_value=1.0, max_value=99.9999, value=99.9, step=0.1, format="%.4f") / 100
+    trials = st.sidebar.select_slider("Trials", options=[10_000, 100_000, 1_000_000], value=100_000)
+    seed = st.sidebar.number_input("Random Seed", min_value=0, value=0, step=1)
+
+st.sidebar.subheader("Design Solver")
+show_design = st.sidebar.checkbox("Requirements for target range", value=False)
+if show_design:
+    design_targets_text = st.sidebar.text_input("Target Distances (comma-separated)", value="1, 5, 10")
+    design_unit = st.sidebar.selectbox("Target Distance Unit", list(DISTANCE_UNITS_KM))
+
+st.sidebar.subheader("Sensitivity Analysis")
+show_sweep = st.sidebar.checkbox("Parameter sweep & sensitivity", value=False)
+if show_sweep:
+    sweep_names = st.sidebar.multiselect(
+        "Parameters to Sweep",
+        options=list(SWEEP_LABELS),
+        default=["p_tx", "p_rx_sensitivity", "n"],
+        format_func=SWEEP_LABELS.get,
+    )
+    sweep_swing_db = st.sidebar.number_input("Swing for dB Parameters (±dB)", min_value=0.1, value=3.0, step=0.5, format="%.1f")
+    sweep_freq_pct = st.sidebar.number_input("Frequency Swing (±%)", min_value=1.0, max_value=90.0, value=20.0, step=5.0, format="%.0f")
+    sweep_n_swing = st.sidebar.number_input("Exponent Swing (±)", min_value=0.1, value=0.5, step=0.1, format="%.1f")
+    sweep_points = st.sidebar.slider("Grid Points per Parameter", min_value=5, max_value=100, value=20)
+
+st.sidebar.subheader("Terrain Profile")
+use_terrain = st.sidebar.checkbox("Terrain-aware point-to-point link", value=False)
+if use_terrain:
+    dem_path = st.sidebar.text_input("Elevation Raster (.npy with .json sidecar)", value="dem.npy")
+    terrain_tx_col, terrain_rx_col = st.sidebar.columns(2)
+    terrain_tx_x = terrain_tx_col.number_input("Tx X (m)", value=0.0, step=100.0, format="%.0f")
+    terrain_tx_y = terrain_tx_col.number_input("Tx Y (m)", value=0.0, step=100.0, format="%.0f")
+    terrain_tx_h = terrain_tx_col.number_input("Tx Height AGL (m)", min_value=0.0, value=10.0, step=1.0, format="%.1f")
+    terrain_rx_x = terrain_rx_col.number_input("Rx X (m)", value=1000.0, step=100.0, format="%.0f")
+    terrain_rx_y = terrain_rx_col.number_input("Rx Y (m)", value=0.0, step=100.0, format="%.0f")
+    terrain_rx_h = terrain_rx_col.number_input("Rx Height AGL (m)", min_value=0.0, value=2.0, step=1.0, format="%.1f")
+
+st.sidebar.subheader("Coverage Map")
+show_coverage = st.sidebar.checkbox("Area coverage heatmap", value=False)
+if show_coverage:
+    coverage_size_m = st.sidebar.number_input("Area Size (m)", min_value=1.0, value=20000.0, step=1000.0, format="%.0f")
+    coverage_cells = st.sidebar.select_slider("Grid Resolution (cells per side)", options=[100, 250, 500, 1000, 2000], value=500)
+    coverage_tx_text = st.sidebar.text_area("Transmitter Locations (x,y in m, one per line)", value="0,0")
+
+st.sidebar.subheader("Network Planning")
+show_network = st.sidebar.checkbox("Mesh link feasibility", value=False)
+if show_network:
+    network_file = st.sidebar.file_uploader("Node File (CSV: x_m, y_m, optional p_tx, p_rx_sensitivity, g_ant, l_cable)",
+                                            type="csv")
+    network_nodes = st.sidebar.select_slider("Random Nodes (without a file)", options=[100, 1_000, 10_000, 100_000], value=1_000)
+    network_area_m = st.sidebar.number_input("Random Area Size (m)", min_value=1.0, value=5000.0, step=500.0, format="%.0f")
+    network_min_margin = st.sidebar.number_input("Minimum Link Margin (dB)", min_value=0.0, value=0.0, step=1.0, format="%.1f")
+
+st.sidebar.subheader("Wideband Channels")
+show_wideband = st.sidebar.checkbox("Per-channel range across a band", value=False)
+if show_wideband:
+    band_start_mhz = st.sidebar.number_input("Band Start (MHz)", min_value=0.001, value=2400.0, step=10.0, format="%.3f")
+    band_stop_mhz = st.sidebar.number_input("Band Stop (MHz)", min_value=0.001, value=2483.5, step=10.0, format="%.3f")
+    channel_spacing_mhz = st.sidebar.number_input("Channel Spacing (MHz)", min_value=0.001, value=0.5, step=0.5, format="%.3f")
+    st.sidebar.caption("Optional CSV tables of frequency (MHz) and value (dB); inputs without a table use the value above.")
+    wideband_files = {
+        name: st.sidebar.file_uploader(label, type="csv", key=f"wideband_{name}")
+        for name, label in (("g_tx", "Tx Antenna Gain Table"), ("l_tx", "Tx Cable Loss Table"),
+                            ("g_rx", "Rx Antenna Gain Table"), ("l_rx", "Rx Cable Loss Table"))
+    }
+
+st.sidebar.subheader("Field Measurements")
+fit_measurements = st.sidebar.checkbox("Fit exponent to RSSI measurements", value=False)
+if fit_measurements:
+    measurement_file = st.sidebar.file_uploader("Measurement File (CSV: distance_m, rssi_dbm, optional freq_mhz)",
+                                                type="csv")
+    fit_confidence = st.sidebar.select_slider("Confidence Level", options=[0.9, 0.95, 0.99], value=0.95,
+                                              format_func=lambda level: f"{level:.0%}")
+
+st.sidebar.subheader("Scenarios")
+scenario_name = st.sidebar.text_input("Scenario Name")
+scenario_tags = st.sidebar.text_input("Tags (comma-separated)")
+if st.sidebar.button("Save Scenario"):
+    try:
+        saved = scenario_store.save(scenario_name, dict(
+            p_tx=p_tx, g_tx=g_tx, l_tx=l_tx, freq_mhz=freq_mhz, g_rx=g_rx, l_rx=l_rx, l_fade=l_fade, l_misc=l_misc,
+            p_rx_sensitivity=p_rx_sensitivity, n=n, model=model_choice, **model_params), tags=scenario_tags)
+    except ValueError as e:
+        st.sidebar.error(str(e))
+    else:
+        st.query_params["scenario"] = saved.name
+        st.session_state["shared_scenario"] = saved.name
+        st.sidebar.success(f"Saved '{saved.name}'. Share this page's link to open it.")
+st.sidebar.selectbox("Saved Scenario", scenario_store.names(), index=None, placeholder="Choose a scenario",
+                     key="selected_scenario")
+st.sidebar.button("Load Scenario", on_click=load_selected_scenario)
+show_saved = st.sidebar.checkbox("Compare saved scenarios", value=False)
+if show_saved:
+    saved_tag = st.sidebar.selectbox("Filter by Tag", scenario_store.tags(), index=None, placeholder="All tags")
+with st.sidebar.expander("Import / Export"):
+    import_file = st.file_uploader("Scenario File (CSV or JSON)", type=["csv", "json"])
+    if import_file is not None and st.button("Import Scenarios"):
+        try:
+            records = scenarios.read_records(io.TextIOWrapper(import_file, encoding="utf-8", newline=""),
+                                             "json" if import_file.name.lower().endswith(".json") else "csv")
+            st.success(f"Imported {scenario_store.import_scenarios(records):,} scenarios.")
+        except (ValueError, KeyError) as e:
+            st.error(f"Import failed, nothing was saved: {e}")
+
+    def scenarios_csv():
+        buffer = io.StringIO()
+        scenarios.write_records(buffer, scenario_store.export_scenarios(), "csv")
+        return buffer.getvalue()
+
+    st.download_button("Export All (CSV)", data=scenarios_csv, file_name="scenarios.csv", mime="text/csv",
+                       on_click="ignore")
+
+profiler.lap("parse")
 
 # --- Main Page for Outputs ---
 
@@ -158,16 +632,25 @@ if freq_mhz <= 0:
     st.error("Frequency must be a positive number.")
     st.stop()
 
+if selected_model.valid_freq_mhz and not (selected_model.valid_freq_mhz[0] <= freq_mhz <= selected_model.valid_freq_mhz[1]):
+    low, high = selected_model.valid_freq_mhz
+    st.warning(f"{selected_model.label} is defined for {low:,.0f}-{high:,.0f} MHz; results at {freq_mhz:,.0f} MHz are extrapolated.")
+
+result_cache = get_result_cache()
+
 max_pl = calculate_max_path_loss(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity)
-dist_km = calculate_distance_from_pl(max_pl, freq_mhz, n, model_choice)
+dist_km = result_cache.get_or_compute(
+    make_key("distance", max_pl, freq_mhz, n, model_choice, model_params),
+    lambda: calculate_distance_from_pl(max_pl, freq_mhz, n, model_choice, **model_params),
+)
 
 st.header("Maximum Communication Distance")
 
 if dist_km is not None:
     # Unit Conversions
-    dist_m = dist_km * 1000
-    dist_mi = dist_km * 0.621371
-    dist_ft = dist_m * 3.28084
+    dist_m = dist_km * core.M_PER_KM
+    dist_mi = dist_km * core.MI_PER_KM
+    dist_ft = dist_m * core.FT_PER_M
 
     # Display results in columns
     col1, col2, col3, col4 = st.columns(4)
@@ -176,24 +659,408 @@ if dist_km is not None:
     col3.metric("Miles", f"{dist_mi:.2f}")
     col4.metric("Feet", f"{dist_ft:,.2f}")
 
+    if atmospheric_params:
+        gas_db_km, rain_db_km, rain_d0_km = (float(term) for term in atmosphere.attenuation_terms(freq_mhz, **atmospheric_params))
+        clear_params = atmosphere.split_parameters(model_params)[0]
+        clear_km = result_cache.get_or_compute(
+            make_key("distance", max_pl, freq_mhz, n, model_choice, clear_params),
+            lambda: calculate_distance_from_pl(max_pl, freq_mhz, n, model_choice, **clear_params),
+        )
+        st.caption(f"Atmospheric loss over {dist_km:.2f} km: {gas_db_km * dist_km:.2f} dB gas, "
+                   f"{rain_db_km * dist_km / (1 + dist_km / rain_d0_km):.2f} dB rain. "
+                   f"Range without it: {clear_km:.2f} km.")
+
     # Plot axis scale toggles
     st.subheader("Plot Settings")
-    toggle_col1, toggle_col2 = st.columns(2)
+    toggle_col1, toggle_col2, toggle_col3 = st.columns(3)
     with toggle_col1:
         x_scale = st.radio("X-axis Scale", ("Linear", "Logarithmic"), index=0, key="x_scale")
     with toggle_col2:
         y_scale = st.radio("Y-axis Scale", ("Linear", "Logarithmic"), index=0, key="y_scale")
+    with toggle_col3:
+        chart_mode = st.radio("Chart Rendering", ("Interactive", "Static Image"), index=0, key="chart_mode")
     
     # Convert to matplotlib scale values
     x_scale_value = 'log' if x_scale == "Logarithmic" else 'linear'
     y_scale_value = 'log' if y_scale == "Logarithmic" else 'linear'
 
-    # Create and display the plot
-    st.pyplot(create_plot(max_pl, freq_mhz, n, dist_ft, model_choice, x_scale_value, y_scale_value))
+    def distance_plot_png():
+        # Rendered PNGs are cached by the rounded inputs that determine them
+        return result_cache.get_or_compute(
+            make_key("distance_plot", max_pl, freq_mhz, n, model_choice, model_params, x_scale_value, y_scale_value),
+            lambda: render_png(create_plot, max_pl, freq_mhz, n, dist_ft, model_choice, x_scale_value, y_scale_value, model_params),
+        )
+
+    if chart_mode == "Interactive":
+        # Only the (n, distance) series goes to the browser; matplotlib is not
+        # touched unless the PNG download is clicked
+        sweep_col, downsample_col = st.columns(2)
+        chart_points = sweep_col.select_slider("Exponent Sweep Points", options=[100, 1_000, 10_000, 100_000], value=100)
+        chart_downsample = downsample_col.checkbox(f"Downsample to {charts.DEFAULT_MAX_POINTS} points", value=True)
+        chart_max_points = charts.DEFAULT_MAX_POINTS if chart_downsample else None
+        with profiler.stage("render"):
+            distance_chart_spec = result_cache.get_or_compute(
+                make_key("distance_chart", max_pl, freq_mhz, n, model_choice, model_params, x_scale_value, y_scale_value,
+                         chart_points, chart_max_points),
+                lambda: create_chart_spec(max_pl, freq_mhz, n, dist_ft, model_choice, x_scale_value, y_scale_value,
+                                          model_params, chart_points, chart_max_points),
+            )
+
+    def show_distance_chart(container=st):
+        if chart_mode == "Interactive":
+            with profiler.stage("serialize"):
+                container.vega_lite_chart(distance_chart_spec, width="stretch")
+            container.download_button("Download PNG", data=distance_plot_png, file_name="range_vs_exponent.png",
+                                      mime="image/png", on_click="ignore")
+        else:
+            show_chart(distance_plot_png(), container)
+
+    if simulate_fading:
+        # The simulated fading replaces the fixed fade margin in the budget
+        sim_max_pl = max_pl + l_fade
+        fading_model = montecarlo.FadingModel(shadowing_sigma, fading_label.lower(), rician_k_db)
+        fading_key = make_key("fading", fading_model, trials, int(seed))
+        distribution = result_cache.get_or_compute(
+            fading_key,
+            lambda: montecarlo.simulate_loss_distribution(fading_model, trials, seed=int(seed)),
+        )
+        target = montecarlo.distance_for_availability(sim_max_pl, freq_mhz, n, model_choice, target_availability, distribution, **model_params)
+        target_dist_ft = float(target.ft) if target.feasible else None
+
+        st.subheader(f"Range at {target_availability:.3%} Availability")
+        if target_dist_ft is not None:
+            sim_col1, sim_col2, sim_col3, sim_col4 = st.columns(4)
+            sim_col1.metric("Kilometers", f"{float(target.km):.2f}")
+            sim_col2.metric("Meters", f"{float(target.m):,.2f}")
+            sim_col3.metric("Miles", f"{float(target.mi):.2f}")
+            sim_col4.metric("Feet", f"{target_dist_ft:,.2f}")
+        else:
+            st.warning("Target availability cannot be met with the current parameters.")
+        st.caption(f"{distribution.trials:,} trials. The fixed fade margin is replaced by the simulated fading and shadowing.")
+
+        # Create and display the plots side by side
+        plot_col1, plot_col2 = st.columns(2)
+        availability_plot_png = result_cache.get_or_compute(
+            make_key("availability_plot", fading_key, sim_max_pl, freq_mhz, n, model_choice, model_params, target_availability),
+            lambda: render_png(create_availability_plot,
+                               distribution, sim_max_pl, freq_mhz, n, model_choice, target_availability, target_dist_ft, model_params),
+        )
+        show_distance_chart(plot_col1)
+        show_chart(availability_plot_png, plot_col2)
+    else:
+        # Display the plot
+        show_distance_chart()
 
 else:
     st.warning("Link cannot be established with the current parameters (Path Loss < 0).")
 
+if show_design:
+    st.header("Design Requirements")
+    try:
+        design_targets = parse_distances(design_targets_text)
+    except ValueError as e:
+        st.error(str(e))
+    else:
+        # One vectorized solve for every target distance
+        design = solver.design(np.array(design_targets) * DISTANCE_UNITS_KM[design_unit],
+                               p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity,
+                               freq_mhz, n, model_choice, **model_params)
+        st.table({
+            f"Target ({design_unit})": [f"{value:,.2f}" for value in design_targets],
+            "Tx Power (dBm)": [f"{value:.1f}" for value in design.tx_power_dbm],
+            "Sensitivity (dBm)": [f"{value:.1f}" for value in design.sensitivity_dbm],
+            "Tx Antenna Gain (dBi)": [f"{value:.1f}" for value in design.tx_gain_dbi],
+            "Max Exponent (n)": [format_exponent(value) for value in design.max_exponent],
+        })
+        st.caption("Each column is the value that just reaches the target with every other parameter unchanged. "
+                   "Sensitivity is the highest (least sensitive) receiver sensitivity that still closes the link.")
+
+if show_sweep:
+    st.header("Sensitivity Analysis")
+    if not sweep_names:
+        st.warning("Select at least one parameter to sweep.")
+    elif dist_km is None:
+        st.warning("Sensitivity analysis needs a link that closes at the current parameters.")
+    else:
+        sweep_base = dict(p_tx=p_tx, g_tx=g_tx, l_tx=l_tx, freq_mhz=freq_mhz, g_rx=g_rx, l_rx=l_rx,
+                          l_fade=l_fade, l_misc=l_misc, p_rx_sensitivity=p_rx_sensitivity, n=n)
+        spans = sweep_spans(sweep_base, sweep_names, sweep_swing_db, sweep_freq_pct, sweep_n_swing)
+        # The selection order picks the contour axes, so it is part of the key
+        sweep_key = make_key("sweep", sweep_base, model_choice, model_params, tuple(sweep_names),
+                             sorted(spans.items()), sweep_points)
+
+        tornado_png = result_cache.get_or_compute(
+            make_key("tornado_plot", sweep_key),
+            lambda: render_png(create_tornado_plot, sweep.tornado(sweep_base, spans, model_choice, model_params), dist_km),
+        )
+        show_chart(tornado_png)
+
+        if len(sweep_names) >= 2:
+            x_name, y_name = sweep_names[:2]
+
+            def render_contour():
+                contour_ranges = {name: np.linspace(*spans[name], 100) for name in (x_name, y_name)}
+                result = sweep.evaluate_grid(sweep_base, contour_ranges, model_choice, model_params=model_params)
+                return render_png(create_contour_plot, result, sweep_base[x_name], sweep_base[y_name])
+
+            show_chart(result_cache.get_or_compute(make_key("contour_plot", sweep_key), render_contour))
+
+        grid_cells = sweep_points ** len(sweep_names)
+        if grid_cells > MAX_SWEEP_CELLS:
+            st.warning(f"The {grid_cells:,}-point grid is too large to rank interactively; "
+                       "reduce the grid points or the number of parameters.")
+        else:
+            ranking = result_cache.get_or_compute(
+                make_key("sensitivity", sweep_key),
+                lambda: sweep.sensitivity(
+                    sweep_base, {name: np.linspace(*spans[name], sweep_points) for name in sweep_names}, model_choice,
+                    model_params=model_params),
+            )
+            st.subheader("Dominant Parameters")
+            st.table({
+                "Parameter": [SWEEP_LABELS[item.name] for item in ranking],
+                "Share of Range Variance": [f"{item.variance_share:.1%}" for item in ranking],
+                "Range at Worst (km)": [f"{item.min_effect_km:.2f}" for item in ranking],
+                "Range at Best (km)": [f"{item.max_effect_km:.2f}" for item in ranking],
+            })
+            st.caption(f"Evaluated over a {' x '.join([str(sweep_points)] * len(sweep_names))} grid "
+                       f"({grid_cells:,} points). Shares below 100% in total are due to parameter interactions.")
+
+if use_terrain:
+    st.header("Terrain Path Profile")
+    if not os.path.isfile(dem_path) or not os.path.isfile(f"{dem_path}.json"):
+        st.error(f"Elevation raster '{dem_path}' or its .json sidecar was not found.")
+    else:
+        dem = get_elevation_model(dem_path, os.path.getmtime(dem_path))
+        tx_xy = (terrain_tx_x, terrain_tx_y)
+        rx_xy = (terrain_rx_x, terrain_rx_y)
+        link = terrain.evaluate_links(dem, [tx_xy], [rx_xy], terrain_tx_h, terrain_rx_h, freq_mhz)
+
+        if np.isnan(link.diffraction_loss_db[0]):
+            st.error("The path extends beyond the elevation raster.")
+        else:
+            link_margin = float(terrain.link_margin_db(max_pl, freq_mhz, n, model_choice, link, **model_params)[0])
+            terrain_col1, terrain_col2, terrain_col3, terrain_col4 = st.columns(4)
+            terrain_col1.metric("Path Length (km)", f"{link.distance_km[0]:.2f}")
+            terrain_col2.metric("Diffraction Loss (dB)", f"{link.diffraction_loss_db[0]:.1f}")
+            terrain_col3.metric("Fresnel Clearance", f"{link.clearance_ratio[0]:.0%}")
+            terrain_col4.metric("Link Margin (dB)", f"{link_margin:.1f}")
+            if link_margin < 0:
+                st.warning("The link does not close over this terrain path.")
+
+            terrain_png = result_cache.get_or_compute(
+                make_key("terrain_plot", dem_path, os.path.getmtime(dem_path), tx_xy, rx_xy,
+                         terrain_tx_h, terrain_rx_h, freq_mhz),
+                lambda: render_png(create_terrain_plot, dem, tx_xy, rx_xy, terrain_tx_h, terrain_rx_h, freq_mhz),
+            )
+            show_chart(terrain_png)
+
+if show_coverage:
+    st.header("Coverage Heatmap")
+    try:
+        transmitters = coverage.parse_transmitters(coverage_tx_text)
+    except ValueError as e:
+        st.error(str(e))
+        transmitters = []
+
+    if transmitters:
+        coverage_params = coverage.LinkParameters.from_budget(
+            p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity, freq_mhz, n, model_choice, **model_params)
+        coverage_grid = coverage.CoverageGrid.square(coverage_size_m, coverage_cells)
+        coverage_png = result_cache.get_or_compute(
+            make_key("coverage_plot", coverage_params, coverage_grid, transmitters),
+            lambda: render_png(create_coverage_plot,
+                               coverage.compute_coverage(coverage_grid, transmitters, coverage_params), transmitters),
+        )
+        show_chart(coverage_png)
+    else:
+        st.warning("Enter at least one transmitter location.")
+if show_network:
+    st.header("Network Planning")
+    # Node radios not given in the file use the sidebar transmitter/receiver values
+    node_defaults = {"p_tx": p_tx, "p_rx_sensitivity": p_rx_sensitivity, "g_ant": g_tx, "l_cable": l_tx}
+    nodes = None
+    if network_file is not None:
+        try:
+            nodes = network.read_nodes(network_file, node_defaults)
+            nodes_key = make_key("network_file", network_file.file_id, node_defaults)
+        except ValueError as e:
+            st.error(str(e))
+    else:
+        rng = np.random.default_rng(0)
+        nodes = dict(node_defaults, x_m=rng.uniform(0, network_area_m, network_nodes),
+                     y_m=rng.uniform(0, network_area_m, network_nodes))
+        nodes_key = make_key("network_random", network_nodes, network_area_m, node_defaults)
+
+    if nodes is not None:
+        network_key = make_key("network", nodes_key, l_fade, l_misc, network_min_margin, freq_mhz, n, model_choice, model_params)
+        try:
+            network_result = result_cache.get_or_compute(
+                network_key,
+                lambda: network.find_links(nodes["x_m"], nodes["y_m"], nodes["p_tx"], nodes["p_rx_sensitivity"], freq_mhz, n,
+                                           model_choice, nodes["g_ant"], nodes["l_cable"], l_fade, l_misc, network_min_margin,
+                                           max_links=MAX_NETWORK_LINKS, **model_params),
+            )
+        except ValueError as e:
+            st.warning(f"{e} Spread the nodes out, raise the exponent or the minimum margin, "
+                       "or use `python -m link_budget.network` for networks this dense.")
+            nodes = None
+
+    if nodes is not None:
+        stats = network_result.connectivity()
+        net_col1, net_col2, net_col3, net_col4 = st.columns(4)
+        net_col1.metric("Links", f"{stats.links:,}")
+        net_col2.metric("Mean Degree", f"{stats.mean_degree:.1f}")
+        net_col3.metric("Components", f"{stats.components:,}")
+        net_col4.metric("Largest Component", f"{stats.largest_fraction:.0%}")
+        st.caption(f"{stats.nodes:,} nodes, {stats.isolated_nodes:,} isolated; maximum degree {stats.max_degree}. "
+                   "A link is kept when it closes in both directions.")
+
+        network_png = result_cache.get_or_compute(
+            make_key("network_plot", network_key),
+            lambda: render_png(create_network_plot, nodes["x_m"], nodes["y_m"], network_result),
+        )
+        show_chart(network_png)
+        if stats.links > MAX_PLOTTED_LINKS:
+            st.caption(f"Showing the {MAX_PLOTTED_LINKS:,} strongest links.")
+
+        def links_csv():
+            buffer = io.BytesIO()
+            network.write_links(buffer, network_result)
+            return buffer.getvalue()
+
+        st.download_button("Download Links (CSV)", data=links_csv, file_name="links.csv", mime="text/csv", on_click="ignore")
+if show_wideband:
+    st.header("Range Across the Band")
+    band_inputs = {"g_tx": g_tx, "l_tx": l_tx, "g_rx": g_rx, "l_rx": l_rx}
+    band_key_parts = []
+    try:
+        for name, upload in wideband_files.items():
+            if upload is not None:
+                band_inputs[name] = get_frequency_table(upload.getvalue(), upload.name)
+                band_key_parts.append((name, upload.file_id))
+        channels_mhz = wideband.channel_frequencies(band_start_mhz, band_stop_mhz, channel_spacing_mhz)
+    except ValueError as e:
+        st.error(str(e))
+        channels_mhz = None
+
+    if channels_mhz is not None:
+        band_result = result_cache.get_or_compute(
+            make_key("wideband", band_start_mhz, band_stop_mhz, channel_spacing_mhz, g_tx, l_tx, g_rx, l_rx, band_key_parts,
+                     p_tx, l_fade, l_misc, p_rx_sensitivity, n, model_choice, model_params),
+            lambda: wideband.channel_budget(channels_mhz, p_tx, band_inputs["g_tx"], band_inputs["l_tx"], band_inputs["g_rx"],
+                                            band_inputs["l_rx"], l_fade, l_misc, p_rx_sensitivity, n, model_choice,
+                                            **model_params),
+        )
+        worst = band_result.worst_index
+        best = band_result.best_index
+        band_km = band_result.distances.km
+        band_col1, band_col2, band_col3 = st.columns(3)
+        band_col1.metric("Channels", f"{len(channels_mhz):,}")
+        band_col2.metric("Worst Channel", f"{channels_mhz[worst]:,.3f} MHz",
+                         f"{band_km[worst]:.3f} km" if band_result.distances.feasible[worst] else "Not reachable",
+                         delta_color="off")
+        band_col3.metric("Best Channel", f"{channels_mhz[best]:,.3f} MHz",
+                         f"{band_km[best]:.3f} km" if band_result.distances.feasible[best] else "Not reachable",
+                         delta_color="off")
+        with profiler.stage("render"):
+            band_chart_spec = charts.line_chart_spec(
+                channels_mhz, band_km, "Frequency (MHz)", "Maximum Distance (km)", line_label="Per-channel range",
+                marker=(channels_mhz[worst], band_km[worst]) if band_result.distances.feasible[worst] else None,
+                marker_label="Worst channel")
+        with profiler.stage("serialize"):
+            st.vega_lite_chart(band_chart_spec, width="stretch")
+        if band_result.extrapolated.any():
+            st.warning(f"{int(band_result.extrapolated.sum()):,} channels lie outside a table's frequency range "
+                       "and use the value at its nearest end.")
+
+        def channels_csv():
+            buffer = io.StringIO()
+            wideband.write_channels(buffer, band_result)
+            return buffer.getvalue()
+
+        st.download_button("Download Channels (CSV)", data=channels_csv, file_name="channels.csv", mime="text/csv",
+                           on_click="ignore")
+if fit_measurements:
+    st.header("Fitted Path Loss Exponent")
+    measurement_fit = None
+    if not isinstance(selected_model, models.ReferenceDistanceModel):
+        st.info(f"{selected_model.label} has no exponent to fit. Choose a reference-distance model such as the 1 m or 1 km model.")
+    elif measurement_file is None:
+        st.info("Upload a CSV of field measurements (distance_m, rssi_dbm and optionally freq_mhz) in the sidebar.")
+    else:
+        fit_key = make_key("telemetry", measurement_file.file_id, p_tx, g_tx, l_tx, g_rx, l_rx, freq_mhz, model_choice, model_params)
+        measurement_fit = result_cache.get(fit_key)
+        if measurement_fit is None:
+            # Stream the file in blocks and show the estimate as it converges
+            measurement_fit = telemetry.ExponentFit(model_choice, **model_params)
+            live_fit = st.empty()
+            measurement_file.seek(0)
+            try:
+                for measurement_fit in telemetry.fit_stream(telemetry.read_measurements(measurement_file, freq_mhz),
+                                                            measurement_fit, p_tx, g_tx, l_tx, g_rx, l_rx):
+                    try:
+                        live_fit.caption(telemetry.format_result(measurement_fit.result(fit_confidence)))
+                    except ValueError:
+                        pass
+            except ValueError as e:
+                st.error(str(e))
+                measurement_fit = None
+            else:
+                result_cache.put(fit_key, measurement_fit)
+            live_fit.empty()
+
+    if measurement_fit is not None:
+        try:
+            fit_result = measurement_fit.result(fit_confidence)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            level = f"{fit_confidence:.0%}"
+            fit_col1, fit_col2, fit_col3, fit_col4 = st.columns(4)
+            fit_col1.metric("Fitted Exponent (n)", f"{fit_result.n:.2f}",
+                            f"{level} CI {fit_result.n_interval[0]:.2f} to {fit_result.n_interval[1]:.2f}", delta_color="off")
+            fit_col2.metric("Reference Offset", f"{fit_result.offset_db:+.1f} dB",
+                            f"{level} CI {fit_result.offset_interval[0]:+.1f} to {fit_result.offset_interval[1]:+.1f}",
+                            delta_color="off")
+            fit_col3.metric("RMS Error", f"{fit_result.rmse_db:.1f} dB")
+            fit_col4.metric("Measurements", f"{fit_result.count:,}")
+            st.caption("Measured path loss uses the transmitter and receiver gains and losses from the sidebar. "
+                       "The offset is the loss at the model's reference distance beyond the model, carried as misc. losses."
+                       + (f" {fit_result.skipped:,} rows with missing or non-positive values were skipped." if fit_result.skipped else ""))
+            if not 2.0 <= fit_result.n <= 10.0:
+                st.warning(f"The fitted exponent {fit_result.n:.2f} is outside the slider range; it will be clamped to 2-10.")
+            st.button("Use Fitted Exponent and Offset", on_click=apply_fitted_exponent, args=(fit_result,))
+
+            sample_m = measurement_fit.sample_distance_m
+            line_m = np.geomspace(sample_m.min(), sample_m.max(), 100)
+            with profiler.stage("render"):
+                fit_chart_spec = charts.scatter_fit_spec(
+                    sample_m, measurement_fit.sample_path_loss_db, line_m,
+                    measurement_fit.fitted_path_loss_db(line_m, freq_mhz), "Distance (m)", "Path Loss (dB)",
+                    x_scale="log", line_label=f"Fit (n = {fit_result.n:.2f})")
+            with profiler.stage("serialize"):
+                st.vega_lite_chart(fit_chart_spec, width="stretch")
+            if fit_result.count > len(sample_m):
+                st.caption(f"Showing a random sample of {len(sample_m):,} of the {fit_result.count:,} measurements.")
+if show_saved:
+    st.header("Saved Scenarios")
+    saved_scenarios = scenario_store.find(tag=saved_tag)
+    if not saved_scenarios:
+        st.info("No saved scenarios yet. Name the current inputs in the sidebar and save them.")
+    else:
+        # Results come from the store's index; only scenarios never evaluated before are computed
+        saved_results = scenario_store.results([scenario.inputs for scenario in saved_scenarios])
+        st.dataframe({
+            "Scenario": [scenario.name for scenario in saved_scenarios],
+            "Tags": [", ".join(scenario.tags) for scenario in saved_scenarios],
+            "Model": [models.get_model(scenario.inputs["model"]).label for scenario in saved_scenarios],
+            "Max Path Loss (dB)": [result["max_path_loss"] for result in saved_results],
+            "Max Distance (km)": [result["distance_km"] if result["feasible"] else None for result in saved_results],
+        }, hide_index=True)
+
+# Whatever the main page spent outside chart rendering is the link budget math
+profiler.lap("compute")
 
 st.markdown("---")
 st.info("""
@@ -201,5 +1068,18 @@ st.info("""
 - Adjust the parameters in the sidebar on the left.
 - The results and plot will update automatically.
 - **FSPL Exponent (n):** Represents how quickly the signal fades. `2.0` is for ideal free space. Higher values represent more obstructed environments (e.g., urban, indoors).
-- **Path Loss Model:** Choose the reference distance for the path loss calculation. The 1km model is common for outdoor/long-range links, while the 1m model is often used for indoor/short-range analysis.
-""")
\ No newline at end of file
+- **Chart Rendering:** Interactive charts are drawn by the browser from the computed series (downsampled for large sweeps); Static Image renders a PNG on the server. Use Download PNG to export the interactive chart.
+- **Path Loss Model:** Choose the reference distance for the path loss calculation. The 1km model is common for outdoor/long-range links, while the 1m model is often used for indoor/short-range analysis. Okumura-Hata and COST-231 cover macro-cells, two-ray ground reflection covers long line-of-sight links over flat ground, and ITU-R P.1238 covers indoor links.
+- **Design Solver:** Enter target distances to get the Tx power, receiver sensitivity, antenna gain and maximum exponent needed to reach each one.
+- **Sensitivity Analysis:** Sweeps the selected parameters around their current values and ranks which ones dominate the range, with a tornado chart and a contour plot of the first two.
+- **Terrain Profile:** Loads a local elevation raster, checks first Fresnel zone clearance between two points and adds knife-edge diffraction loss to the link margin.
+- **Coverage Map:** Shows the link margin over an area around one or more transmitters; the black contour marks the edge of coverage.
+- **Wideband Channels:** Enter a band and channel spacing, optionally upload antenna gain and cable loss tables (CSV of frequency in MHz and dB), and see the maximum distance of every channel with the worst one marked.
+- **Field Measurements:** Upload RSSI measurements to fit the exponent and reference offset of the selected 1 m / 1 km model; the estimate updates while the file streams in, and one click applies it to the calculator.
+- **Scenarios:** Save the current inputs under a name and tags, load them later, or share the page link (`?scenario=<name>`). Import or export many scenarios at once as CSV or JSON, and compare saved scenarios side by side.
+- **Network Planning:** Upload node positions (and optionally per-node radios) or generate random nodes to find every link that closes in both directions, with the network's connectivity. Download the links with their margins as CSV.
+- **Atmospheric Losses:** Adds oxygen and water vapour absorption and rain attenuation (ITU-R P.676, P.838 and P.530) to the path loss. Both grow with distance, so they shorten long links at high frequencies far more than short ones; the rain rate is the one exceeded 0.01% of the time at the site.
+- **Fading Simulation:** Replaces the fixed fade margin with simulated log-normal shadowing and Rayleigh/Rician fading, and reports the range achieving the target availability.
+""")
+
+profiler.report()
@@ -0,0 +1,304 @@
+"""
+Benchmark suite for the calculator hot paths.
+
+Times the link budget helpers, chart rendering, a micro-batch of API
+requests, a full simulated Streamlit rerun and the desktop GUI redraw, and
+compares the results against a saved baseline. Each benchmark reports the best
+per-call time over several repeats.
+
+How to Run:
+    python benchmarks/bench.py                       # run all, compare with baseline.json
+    python benchmarks/bench.py create_plot app_rerun # run a subset
+    python benchmarks/bench.py --save                # record a new baseline
+    python benchmarks/bench.py --tolerance 0.5       # allow 50% slowdown before failing
+
+Exits with status 1 when any benchmark is slower than its baseline by more
+than the tolerance. Baselines are only comparable on the machine that
+recorded them; re-save after changing hardware.
+
+Requirements:
+- streamlit
+- matplotlib
+- starlette
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_REPEAT = 5
+
+# Default sidebar inputs of app.py (20 dBm, 0 dBi / 0 dB, -95 dBm at 2.4 GHz)
+BUDGET = (20.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, -95.0)
+FREQ_MHZ = 2400.0
+
+BENCHMARKS = {}
+
+
+class Skipped(Exception):
+    """Raised by a benchmark setup when its environment is unavailable (e.g. no display)."""
+
+
+def benchmark(name):
+    """Registers a setup function that returns the zero-argument callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _app_module():
+    """Imports app.py for its helper functions (the script body runs once in bare mode)."""
+    if "app" not in sys.modules:
+        from streamlit import config, logger
+        # Silence the warnings about running outside `streamlit run`; loading the
+        # config first keeps it from resetting the level afterwards
+        config.get_config_options()
+        logger.set_log_level("error")
+        import app  # noqa: F401
+    return sys.modules["app"]
+
+
+@benchmark("calculate_max_path_loss")
+def _max_path_loss():
+    app = _app_module()
+    return lambda: app.calculate_max_path_loss(*BUDGET)
+
+
+@benchmark("calculate_distance_from_pl")
+def _distance():
+    app = _app_module()
+    return lambda: app.calculate_distance_from_pl(115.0, FREQ_MHZ, 2.0, "1m")
+
+
+@benchmark("calculate_distance_from_pl[hata]")
+def _distance_hata():
+    # Closed-form inverse with frequency- and height-dependent terms
+    app = _app_module()
+    return lambda: app.calculate_distance_from_pl(140.0, 900.0, 2.0, "hata")
+
+
+@benchmark("calculate_distance_from_pl[two-ray+rain]")
+def _distance_numeric():
+    # Attenuation added to a model without log-distance terms goes through the bisection solver
+    app = _app_module()
+    return lambda: app.calculate_distance_from_pl(115.0, FREQ_MHZ, 2.0, "two-ray", rain_rate_mm_h=25.0)
+
+
+@benchmark("create_plot")
+def _create_plot():
+    import matplotlib.pyplot as plt
+    app = _app_module()
+
+    def run():
+        plt.close(app.create_plot(115.0, FREQ_MHZ, 2.0, 1850.0, "1m"))
+    return run
+
+
+@benchmark("create_plot+png")
+def _create_plot_png():
+    app = _app_module()
+    return lambda: app.figure_to_png(app.create_plot(115.0, FREQ_MHZ, 2.0, 1850.0, "1m"))
+
+
+@benchmark("create_chart_spec")
+def _create_chart_spec():
+    app = _app_module()
+    return lambda: app.create_chart_spec(115.0, FREQ_MHZ, 2.0, 1850.0, "1m")
+
+
+@benchmark("create_chart_spec[100k]")
+def _create_chart_spec_large():
+    # Large sweep decimated to the default number of points sent to the browser
+    app = _app_module()
+    return lambda: app.create_chart_spec(115.0, FREQ_MHZ, 2.0, 1850.0, "1m", points=100_000)
+
+
+@benchmark("create_chart_spec[two-ray+rain]")
+def _create_chart_spec_attenuated():
+    # Exponent sweep through the numerical attenuated solve; the setup also checks
+    # that the vectorized sweep matches solving each exponent on its own
+    from link_budget import core
+    app = _app_module()
+    params = {"rain_rate_mm_h": 25.0}
+    n_values, distances_ft = app.exponent_sweep(115.0, FREQ_MHZ, "two-ray", params, points=5)
+    expected = [float(core.distance_from_path_loss(115.0, FREQ_MHZ, n, "two-ray", **params).ft) for n in n_values]
+    np.testing.assert_allclose(distances_ft, expected, rtol=1e-9)
+    return lambda: app.create_chart_spec(115.0, FREQ_MHZ, 2.0, 1850.0, "two-ray", model_params=params)
+
+
+@benchmark("api_max_distance[mixed atmosphere]")
+def _api_mixed_atmosphere():
+    # Micro-batch of single-link requests, half with rain; the setup also checks that
+    # each link's result does not depend on what it is batched with
+    from link_budget import api
+    records = [{"p_tx": 20.0, "freq_mhz": 60000.0, "p_rx_sensitivity": -95.0, "model": "1m"} for _ in range(64)]
+    for record in records[1::2]:
+        record["rain_rate_mm_h"] = 0.0
+    batched = api.evaluate("max-distance", records)
+    assert batched == [api.evaluate("max-distance", [record])[0] for record in records]
+    return lambda: api.evaluate("max-distance", records)
+
+
+def _app_test():
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+    # AppTest parses and compiles the script again on every run, a cost that grows
+    # with the size of app.py; a server compiles it once per process, so share one
+    # bytecode cache across runs to time only the rerun itself
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+    return AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+
+
+@benchmark("app_rerun")
+def _app_rerun():
+    # Steady state: the first run fills the shared result cache
+    at = _app_test()
+    at.run()
+    return at.run
+
+
+@benchmark("app_rerun[uncached]")
+def _app_rerun_uncached():
+    import streamlit as st
+    at = _app_test()
+
+    def run():
+        st.cache_resource.clear()
+        at.run()
+    return run
+
+
+@benchmark("gui_update_plot")
+def _gui_update_plot():
+    import tkinter as tk
+    from link_budget_calculator import LinkBudgetCalculator
+    try:
+        gui = LinkBudgetCalculator()
+    except tk.TclError as exc:
+        raise Skipped(f"no display ({exc})") from None
+    n_values = iter(np.tile(np.linspace(2.0, 10.0, 81), 10_000))
+
+    def run():
+        # Vary the exponent so every call redraws, then flush the idle draw
+        gui.update_plot(115.0, FREQ_MHZ, next(n_values), 1850.0, "1m")
+        gui.update_idletasks()
+    return run
+
+
+def measure(func, repeat=DEFAULT_REPEAT):
+    """Returns the best per-call time in seconds over repeat timing runs."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def load_baseline(path):
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_time(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def run_benchmarks(names, repeat=DEFAULT_REPEAT):
+    """Runs the named benchmarks; returns {name: seconds per call or None if skipped}."""
+    results = {}
+    for name in names:
+        try:
+            func = BENCHMARKS[name]()
+        except Skipped as exc:
+            print(f"{name:<34} skipped: {exc}", file=sys.stderr)
+            results[name] = None
+            continue
+        results[name] = measure(func, repeat)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints results next to the baseline; returns the names that regressed."""
+    previous = (baseline or {}).get("results", {})
+    regressions = []
+    print(f"{'benchmark':<34} {'time':>10} {'baseline':>10} {'ratio':>7}")
+    for name, seconds in results.items():
+        if seconds is None:
+            continue
+        base = previous.get(name)
+        if base is None:
+            print(f"{name:<34} {format_time(seconds):>10} {'-':>10} {'-':>7}")
+            continue
+        ratio = seconds / base
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<34} {format_time(seconds):>10} {format_time(base):>10} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the link budget calculator hot paths.")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare with or save to")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timing runs per benchmark")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    # The app benchmarks open the scenario store; keep it out of the working directory
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["LINK_BUDGET_DB"] = os.path.join(tmp, "scenarios.db")
+        results = run_benchmarks(args.names or list(BENCHMARKS), args.repeat)
+    baseline = load_baseline(args.baseline)
+    if baseline and baseline.get("machine") != machine_info():
+        print("Warning: baseline was recorded on a different machine or environment.", file=sys.stderr)
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        # Keep entries for benchmarks that were not run (or skipped) this time
+        saved = dict((baseline or {}).get("results", {}))
+        saved.update({name: seconds for name, seconds in results.items() if seconds is not None})
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": machine_info(), "results": saved}, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Link budget calculation package.
+
+The `core` module holds the vectorized math used by both user interfaces
+(`app.py` for Streamlit and `link_budget_calculator.py` for tkinter), and
+`models` the registry of propagation models it dispatches to. Importing the
+package needs only NumPy; plotting libraries are loaded by the UIs when a
+chart is first drawn (`python -m link_budget.profiling` reports cold-import
+times).
+"""
+
+from link_budget.core import (
+    FT_PER_M,
+    M_PER_KM,
+    MI_PER_KM,
+    MODEL_CODES,
+    Distances,
+    distance_from_path_loss,
+    exponent_from_path_loss,
+    link_distances,
+    max_path_loss,
+    model_codes,
+    path_loss_db,
+)
+from link_budget.models import MODELS, ModelParameter, PropagationModel, get_model, register_model
+
+__all__ = [
+    "FT_PER_M",
+    "M_PER_KM",
+    "MI_PER_KM",
+    "MODELS",
+    "MODEL_CODES",
+    "Distances",
+    "ModelParameter",
+    "PropagationModel",
+    "distance_from_path_loss",
+    "exponent_from_path_loss",
+    "get_model",
+    "link_distances",
+    "max_path_loss",
+    "model_codes",
+    "path_loss_db",
+    "register_model",
+]
@@ -0,0 +1,294 @@
+"""
+JSON HTTP API for link budget evaluation.
+
+Serves the vectorized core over HTTP next to the Streamlit UI. Single-link
+requests that arrive within a few milliseconds of each other are coalesced into
+one vectorized evaluation, and batch endpoints stream their results as
+newline-delimited JSON so large responses never sit in memory at once.
+
+Endpoints:
+    GET  /health
+    GET  /models                  registered propagation models and their parameters
+    POST /path-loss               {"freq_mhz": 900, "distance_km": 5, "model": "hata"}
+    POST /max-distance            {"p_tx": 30, "freq_mhz": 2400, "p_rx_sensitivity": -95}
+    POST /batch/path-loss         {"links": [{...}, ...]}  -> one JSON result per line
+    POST /batch/max-distance      {"links": [{...}, ...]}  -> one JSON result per line
+
+Link fields and defaults are the same as the batch file columns
+(see link_budget.batch); path loss requests take freq_mhz, distance_km, n and
+model. Results that are not finite (infeasible links) are returned as null.
+
+How to Run:
+    uvicorn link_budget.api:app --host 0.0.0.0 --port 8000
+
+Requirements:
+- starlette
+- uvicorn
+"""
+
+import asyncio
+import contextlib
+import json
+import math
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from link_budget import atmosphere, core, models
+
+PATH_LOSS_REQUIRED = ("freq_mhz", "distance_km")
+PATH_LOSS_DEFAULTS = {"n": core.DEFAULT_INPUTS["n"], "model": core.DEFAULT_INPUTS["model"]}
+BUDGET_FIELDS = ("p_tx", "g_tx", "l_tx", "g_rx", "l_rx", "l_fade", "l_misc", "p_rx_sensitivity")
+
+MAX_MICRO_BATCH = 4096
+MICRO_BATCH_DELAY_S = 0.002
+STREAM_CHUNK_SIZE = 10_000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _numeric_field(records, name, default):
+    values = [record.get(name) for record in records]
+    if default is None:
+        if any(value is None for value in values):
+            raise ValueError(f"Missing required field '{name}'")
+    else:
+        values = [default if value is None else value for value in values]
+    try:
+        column = np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        column = None
+    if column is None or column.ndim != 1:
+        raise ValueError(f"Field '{name}' must be a number")
+    return column
+
+
+def _columns(records, required, defaults):
+    """Converts a list of JSON link objects to field arrays plus model parameter arrays."""
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError("Expected a list of JSON objects")
+
+    columns = {name: _numeric_field(records, name, None) for name in required}
+    for name, default in defaults.items():
+        if name != "model":
+            columns[name] = _numeric_field(records, name, default)
+
+    names = [record.get("model") or defaults["model"] for record in records]
+    codes = core.model_codes(np.array(names, dtype=str))
+    if (codes < 0).any():
+        unknown = names[int(np.argmax(codes < 0))]
+        raise ValueError(f"Unknown model '{unknown}'. Available: {', '.join(models.MODELS)}")
+    columns["model"] = codes
+
+    # Only parameters that some record sets are passed on; the rest keep the model default
+    model_params = {
+        name: _numeric_field(records, name, default)
+        for name, default in core.model_parameter_defaults().items()
+        if any(name in record for record in records)
+    }
+    # Records without atmospheric fields keep their plain model path loss, whatever they are batched with
+    columns["attenuated"] = np.array(
+        [any(record.get(name) is not None for name in atmosphere.PARAMETERS) for record in records], dtype=bool
+    )
+    return columns, model_params
+
+
+def _path_loss(columns, model_params):
+    loss = core.path_loss_db(columns["freq_mhz"], columns["n"], columns["model"], columns["distance_km"],
+                             attenuated=columns["attenuated"], **model_params)
+    return {"path_loss_db": np.broadcast_to(loss, columns["freq_mhz"].shape)}
+
+
+def _max_distance(columns, model_params):
+    max_pl = core.max_path_loss(*(columns[name] for name in BUDGET_FIELDS))
+    distances = core.distance_from_path_loss(max_pl, columns["freq_mhz"], columns["n"], columns["model"],
+                                             attenuated=columns["attenuated"], **model_params)
+    return {
+        "max_path_loss": max_pl,
+        "distance_km": distances.km,
+        "distance_m": distances.m,
+        "distance_mi": distances.mi,
+        "distance_ft": distances.ft,
+        "feasible": distances.feasible,
+    }
+
+
+# Endpoint kind -> (required fields, defaulted fields, vectorized evaluation)
+ENDPOINTS = {
+    "path-loss": (PATH_LOSS_REQUIRED, PATH_LOSS_DEFAULTS, _path_loss),
+    "max-distance": (core.REQUIRED_INPUTS, core.DEFAULT_INPUTS, _max_distance),
+}
+
+
+def _json_values(values):
+    values = np.asarray(values).tolist()
+    # NaN and inf are not valid JSON
+    return [value if isinstance(value, bool) or math.isfinite(value) else None for value in values]
+
+
+def _results(arrays):
+    """Turns a dict of equal-length result arrays into a list of JSON-ready dicts."""
+    names = list(arrays)
+    return [dict(zip(names, row)) for row in zip(*(_json_values(arrays[name]) for name in names))]
+
+
+def evaluate(kind, records):
+    """Evaluates a list of JSON link objects for one endpoint kind; returns one result dict per record."""
+    required, defaults, func = ENDPOINTS[kind]
+    return _results(func(*_columns(records, required, defaults)))
+
+
+def iter_ndjson(kind, records, chunk_size=STREAM_CHUNK_SIZE):
+    """Validates every record up front, then yields NDJSON result lines chunk by chunk."""
+    required, defaults, func = ENDPOINTS[kind]
+    columns, model_params = _columns(records, required, defaults)
+
+    def generate():
+        for start in range(0, len(records), chunk_size):
+            part = slice(start, start + chunk_size)
+            rows = _results(func({name: values[part] for name, values in columns.items()},
+                                 {name: values[part] for name, values in model_params.items()}))
+            yield "".join(json.dumps(row) + "\n" for row in rows)
+
+    return generate()
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-link requests into one vectorized evaluation."""
+
+    def __init__(self, kind, max_batch=MAX_MICRO_BATCH, max_delay_s=MICRO_BATCH_DELAY_S):
+        self.kind = kind
+        self.max_batch = max_batch
+        self.max_delay_s = max_delay_s
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+    async def submit(self, record):
+        """Queues one link object and waits for its result dict (raises ValueError if invalid)."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Give concurrent requests a moment to join before evaluating
+            await asyncio.sleep(self.max_delay_s)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                self._resolve(batch)
+            except Exception as exc:
+                # Fail this batch's requests, not the loop serving all later ones
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _resolve(self, batch):
+        for (_, future), outcome in zip(batch, self._evaluate([record for record, _ in batch])):
+            if future.done():  # client went away
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def _evaluate(self, records):
+        """Returns a result dict or ValueError per record, halving the batch around malformed requests."""
+        try:
+            return evaluate(self.kind, records)
+        except ValueError as exc:
+            if len(records) == 1:
+                return [exc]
+        middle = len(records) // 2
+        return self._evaluate(records[:middle]) + self._evaluate(records[middle:])
+
+
+def _error(message, status_code=400):
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        raise ValueError("Request body is not valid JSON") from None
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def list_models(request):
+    return JSONResponse({
+        name: {
+            "label": model.label,
+            "uses_exponent": model.uses_exponent,
+            "valid_freq_mhz": model.valid_freq_mhz,
+            "parameters": {
+                param: {"label": spec.label, "default": spec.default, "choices": spec.choices}
+                for param, spec in model.parameters.items()
+            },
+        }
+        for name, model in models.MODELS.items()
+    })
+
+
+def _single(kind):
+    async def endpoint(request):
+        try:
+            record = await _read_json(request)
+            if not isinstance(record, dict):
+                raise ValueError("Expected a JSON object")
+            result = await request.app.state.batchers[kind].submit(record)
+        except ValueError as exc:
+            return _error(str(exc))
+        return JSONResponse(result)
+    return endpoint
+
+
+def _batch(kind):
+    async def endpoint(request):
+        try:
+            body = await _read_json(request)
+            records = body.get("links") if isinstance(body, dict) else body
+            lines = iter_ndjson(kind, records)
+        except ValueError as exc:
+            return _error(str(exc))
+        # Starlette runs the synchronous generator in a worker thread
+        return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+    return endpoint
+
+
+def create_app(max_batch=MAX_MICRO_BATCH, max_delay_s=MICRO_BATCH_DELAY_S):
+    """Builds the API application with one micro-batcher per single-link endpoint."""
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        for batcher in app.state.batchers.values():
+            batcher.start()
+        yield
+        for batcher in app.state.batchers.values():
+            await batcher.stop()
+
+    routes = [Route("/health", health), Route("/models", list_models)]
+    for kind in ENDPOINTS:
+        routes.append(Route(f"/{kind}", _single(kind), methods=["POST"]))
+        routes.append(Route(f"/batch/{kind}", _batch(kind), methods=["POST"]))
+
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.batchers = {kind: MicroBatcher(kind, max_batch, max_delay_s) for kind in ENDPOINTS}
+    return app
+
+
+app = create_app()
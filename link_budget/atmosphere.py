@@ -0,0 +1,245 @@
+"""
+Atmospheric gas and rain attenuation as distance-dependent path loss terms.
+
+Both grow with the path length, so they are added to the propagation
+model's path loss inside the distance solve rather than folded into a fixed
+misc. loss:
+
+    L_atm(d) = gamma_gas * d + A_rain(d)
+
+Gaseous attenuation (oxygen and water vapour) uses the ITU-R P.676 Annex 2
+approximation (1-350 GHz). Its specific attenuation gamma_gas (dB/km) is
+tabulated once per set of atmospheric conditions on a 10 MHz grid and
+linearly interpolated on each call.
+
+Rain uses ITU-R P.838, gamma_R = k * R^alpha, with k and alpha
+interpolated from the recommendation's coefficient table (log k and alpha
+against log f, horizontal and vertical polarization combined for the
+polarization tilt). The rain rate R is the one exceeded 0.01% of an average
+year; the path attenuation follows ITU-R P.530 with the effective path
+length reduction r = 1 / (1 + d/d0), d0 = 35 exp(-0.015 R), and is scaled to
+other time percentages p (0.001-1%) with the P.530 power law.
+
+The inputs are passed like model parameters (keyword arguments named after
+PARAMETERS); the core adds the attenuation wherever any of them is given.
+Below 1 GHz both terms are negligible and evaluate to practically zero.
+"""
+
+import functools
+
+import numpy as np
+
+from link_budget.models import ModelParameter
+
+PARAMETERS = {
+    "rain_rate_mm_h": ModelParameter("Rain Rate Exceeded 0.01% (mm/h)", 0.0, 5.0),
+    "rain_percent": ModelParameter("Time Percentage Exceeded", 0.01, choices={
+        "1% (99% availability)": 1.0,
+        "0.1% (99.9% availability)": 0.1,
+        "0.01% (99.99% availability)": 0.01,
+        "0.001% (99.999% availability)": 0.001,
+    }),
+    "rain_tilt_deg": ModelParameter("Polarization", 0.0, choices={"Horizontal": 0.0, "Vertical": 90.0, "Circular": 45.0}),
+    "low_latitude": ModelParameter("Latitude", 0.0, choices={"30 degrees or more": 0.0, "Below 30 degrees": 1.0}),
+    "water_vapour_g_m3": ModelParameter("Water Vapour Density (g/m^3)", 7.5, 0.5),
+    "temperature_c": ModelParameter("Temperature (C)", 15.0, 1.0),
+    "pressure_hpa": ModelParameter("Air Pressure (hPa)", 1013.25, 5.0),
+}
+
+# Frequency grid of the gas attenuation tables (GHz)
+GAS_TABLE_GHZ = np.arange(0.0, 350.0 + 1e-9, 0.01)
+
+# ITU-R P.838 coefficients: f (GHz), k_H, alpha_H, k_V, alpha_V
+RAIN_COEFFICIENTS = np.array([
+    [1.0, 0.0000387, 0.912, 0.0000352, 0.880],
+    [2.0, 0.000154, 0.963, 0.000138, 0.923],
+    [4.0, 0.000650, 1.121, 0.000591, 1.075],
+    [6.0, 0.00175, 1.308, 0.00155, 1.265],
+    [7.0, 0.00301, 1.332, 0.00265, 1.312],
+    [8.0, 0.00454, 1.327, 0.00395, 1.310],
+    [10.0, 0.0101, 1.276, 0.00887, 1.264],
+    [12.0, 0.0188, 1.217, 0.0168, 1.200],
+    [15.0, 0.0367, 1.154, 0.0335, 1.128],
+    [20.0, 0.0751, 1.099, 0.0691, 1.065],
+    [25.0, 0.124, 1.061, 0.113, 1.030],
+    [30.0, 0.187, 1.021, 0.167, 1.000],
+    [35.0, 0.263, 0.979, 0.233, 0.963],
+    [40.0, 0.350, 0.939, 0.310, 0.929],
+    [45.0, 0.442, 0.903, 0.393, 0.897],
+    [50.0, 0.536, 0.873, 0.479, 0.868],
+    [60.0, 0.707, 0.826, 0.642, 0.824],
+    [70.0, 0.851, 0.793, 0.784, 0.793],
+    [80.0, 0.975, 0.769, 0.906, 0.769],
+    [90.0, 1.06, 0.753, 0.999, 0.754],
+    [100.0, 1.12, 0.743, 1.06, 0.744],
+    [120.0, 1.18, 0.731, 1.13, 0.732],
+    [150.0, 1.31, 0.710, 1.27, 0.711],
+    [200.0, 1.45, 0.689, 1.42, 0.690],
+    [300.0, 1.36, 0.688, 1.35, 0.689],
+    [400.0, 1.32, 0.683, 1.31, 0.684],
+])
+_RAIN_LOG_F = np.log10(RAIN_COEFFICIENTS[:, 0])
+_RAIN_LOG_KH = np.log10(RAIN_COEFFICIENTS[:, 1])
+_RAIN_LOG_KV = np.log10(RAIN_COEFFICIENTS[:, 3])
+
+
+def split_parameters(params):
+    """Splits keyword inputs into (model parameters, atmospheric parameters)."""
+    model_params = {name: value for name, value in params.items() if name not in PARAMETERS}
+    atmosphere = {name: value for name, value in params.items() if name in PARAMETERS}
+    return model_params, atmosphere
+
+
+def _phi(rp, rt, a, b, c, d):
+    return rp ** a * rt ** b * np.exp(c * (1 - rp) + d * (1 - rt))
+
+
+def _log_quadratic(f, f0, f1, f2, g0, g1, g2):
+    """Interpolates ln(gamma) through three points, as P.676 does across the 60 GHz oxygen complex."""
+    return np.exp(np.log(g0) * (f - f1) * (f - f2) / ((f0 - f1) * (f0 - f2))
+                  + np.log(g1) * (f - f0) * (f - f2) / ((f1 - f0) * (f1 - f2))
+                  + np.log(g2) * (f - f0) * (f - f1) / ((f2 - f0) * (f2 - f1)))
+
+
+def oxygen_db_km(freq_ghz, pressure_hpa=1013.25, temperature_c=15.0):
+    """Specific attenuation of dry air (dB/km), ITU-R P.676 Annex 2, 1-350 GHz."""
+    f = np.asarray(freq_ghz, dtype=float)
+    rp = np.asarray(pressure_hpa, dtype=float) / 1013.0
+    rt = 288.0 / (273.0 + np.asarray(temperature_c, dtype=float))
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        xi1 = _phi(rp, rt, 0.0717, -1.8132, 0.0156, -1.6515)
+        xi2 = _phi(rp, rt, 0.5146, -4.6368, -0.1921, -5.7416)
+        xi3 = _phi(rp, rt, 0.3414, -6.5851, 0.2130, -8.5854)
+        below_54 = (7.2 * rt ** 2.8 / (f ** 2 + 0.34 * rp ** 2 * rt ** 1.6)
+                    + 0.62 * xi3 / ((54 - f) ** (1.16 * xi1) + 0.83 * xi2)) * f ** 2 * rp ** 2 * 1e-3
+
+        g54 = 2.192 * _phi(rp, rt, 1.8286, -1.9487, 0.4051, -2.8509)
+        g58 = 12.59 * _phi(rp, rt, 1.0045, 3.5610, 0.1588, 1.2834)
+        g60 = 15.00 * _phi(rp, rt, 0.9003, 4.1335, 0.0427, 1.6088)
+        g62 = 14.28 * _phi(rp, rt, 0.9886, 3.4176, 0.1827, 1.3429)
+        g64 = 6.819 * _phi(rp, rt, 1.4320, 0.6258, 0.3177, -0.5914)
+        g66 = 1.908 * _phi(rp, rt, 2.0717, -4.1404, 0.4910, -4.8718)
+        complex_54_60 = _log_quadratic(f, 54.0, 58.0, 60.0, g54, g58, g60)
+        complex_60_62 = g60 + (g62 - g60) * (f - 60) / 2
+        complex_62_66 = _log_quadratic(f, 62.0, 64.0, 66.0, g62, g64, g66)
+
+        xi4 = _phi(rp, rt, -0.0112, 0.0092, -0.1033, -0.0009)
+        xi5 = _phi(rp, rt, 0.2705, -2.7192, -0.3016, -4.1033)
+        xi6 = _phi(rp, rt, 0.2445, -5.9191, 0.0422, -8.0719)
+        xi7 = _phi(rp, rt, -0.1833, 6.5589, -0.2402, 6.131)
+        from_66 = (3.02e-4 * rt ** 3.5 + 0.283 * rt ** 3.8 / ((f - 118.75) ** 2 + 2.91 * rp ** 2 * rt ** 1.6)
+                   + 0.502 * xi6 * (1 - 0.0163 * xi7 * (f - 66))
+                   / ((f - 66) ** (1.4346 * xi4) + 1.15 * xi5)) * f ** 2 * rp ** 2 * 1e-3
+
+        delta = -0.00306 * _phi(rp, rt, 3.211, -14.94, 1.583, -16.37)
+        from_120 = ((3.02e-4 / (1 + 1.9e-5 * f ** 1.5) + 0.283 * rt ** 0.3 / ((f - 118.75) ** 2 + 2.91 * rp ** 2 * rt ** 1.6))
+                    * f ** 2 * rp ** 2 * rt ** 3.5 * 1e-3 + delta)
+
+    return np.select([f <= 54, f <= 60, f <= 62, f <= 66, f <= 120],
+                     [below_54, complex_54_60, complex_60_62, complex_62_66, from_66], from_120)
+
+
+def water_vapour_db_km(freq_ghz, water_vapour_g_m3=7.5, pressure_hpa=1013.25, temperature_c=15.0):
+    """Specific attenuation of water vapour (dB/km), ITU-R P.676 Annex 2, 1-350 GHz."""
+    f = np.asarray(freq_ghz, dtype=float)
+    rho = np.asarray(water_vapour_g_m3, dtype=float)
+    rp = np.asarray(pressure_hpa, dtype=float) / 1013.0
+    rt = 288.0 / (273.0 + np.asarray(temperature_c, dtype=float))
+    eta1 = 0.955 * rp * rt ** 0.68 + 0.006 * rho
+    eta2 = 0.735 * rp * rt ** 0.5 + 0.0353 * rt ** 4 * rho
+
+    def g(line):
+        return 1 + ((f - line) / (f + line)) ** 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lines = (3.98 * eta1 * np.exp(2.23 * (1 - rt)) / ((f - 22.235) ** 2 + 9.42 * eta1 ** 2) * g(22.0)
+                 + 11.96 * eta1 * np.exp(0.7 * (1 - rt)) / ((f - 183.31) ** 2 + 11.14 * eta1 ** 2)
+                 + 0.081 * eta1 * np.exp(6.44 * (1 - rt)) / ((f - 321.226) ** 2 + 6.29 * eta1 ** 2)
+                 + 3.66 * eta1 * np.exp(1.6 * (1 - rt)) / ((f - 325.153) ** 2 + 9.22 * eta1 ** 2)
+                 + 25.37 * eta1 * np.exp(1.09 * (1 - rt)) / (f - 380) ** 2
+                 + 17.4 * eta1 * np.exp(1.46 * (1 - rt)) / (f - 448) ** 2
+                 + 844.6 * eta1 * np.exp(0.17 * (1 - rt)) / (f - 557) ** 2 * g(557.0)
+                 + 290 * eta1 * np.exp(0.41 * (1 - rt)) / (f - 752) ** 2 * g(752.0)
+                 + 8.3328e4 * eta2 * np.exp(0.99 * (1 - rt)) / (f - 1780) ** 2 * g(1780.0))
+    return lines * f ** 2 * rt ** 2.5 * rho * 1e-4
+
+
+@functools.lru_cache(maxsize=64)
+def _gas_table(water_vapour_g_m3, pressure_hpa, temperature_c):
+    """gamma_gas (dB/km) on GAS_TABLE_GHZ for one set of conditions, computed once."""
+    table = (oxygen_db_km(GAS_TABLE_GHZ, pressure_hpa, temperature_c)
+             + water_vapour_db_km(GAS_TABLE_GHZ, water_vapour_g_m3, pressure_hpa, temperature_c))
+    table.setflags(write=False)
+    return table
+
+
+def gas_db_km(freq_mhz, water_vapour_g_m3=7.5, pressure_hpa=1013.25, temperature_c=15.0):
+    """Specific gaseous attenuation (dB/km) at each frequency.
+
+    Scalar conditions (the usual case) interpolate a cached table; arrays of
+    conditions are evaluated from the approximation directly.
+    """
+    freq_ghz = np.asarray(freq_mhz, dtype=float) / 1000.0
+    conditions = (water_vapour_g_m3, pressure_hpa, temperature_c)
+    if all(np.ndim(value) == 0 for value in conditions):
+        return np.interp(freq_ghz, GAS_TABLE_GHZ, _gas_table(*(float(value) for value in conditions)))
+    return (oxygen_db_km(freq_ghz, pressure_hpa, temperature_c)
+            + water_vapour_db_km(freq_ghz, water_vapour_g_m3, pressure_hpa, temperature_c))
+
+
+def rain_coefficients(freq_mhz, tilt_deg=0.0):
+    """ITU-R P.838 (k, alpha) at each frequency for a polarization tilt (0 horizontal, 90 vertical)."""
+    log_f = np.log10(np.maximum(np.asarray(freq_mhz, dtype=float) / 1000.0, 1e-3))
+    k_h = 10 ** np.interp(log_f, _RAIN_LOG_F, _RAIN_LOG_KH)
+    k_v = 10 ** np.interp(log_f, _RAIN_LOG_F, _RAIN_LOG_KV)
+    alpha_h = np.interp(log_f, _RAIN_LOG_F, RAIN_COEFFICIENTS[:, 2])
+    alpha_v = np.interp(log_f, _RAIN_LOG_F, RAIN_COEFFICIENTS[:, 4])
+    cos_2tau = np.cos(2 * np.radians(tilt_deg))
+    k = (k_h + k_v + (k_h - k_v) * cos_2tau) / 2
+    alpha = (k_h * alpha_h + k_v * alpha_v + (k_h * alpha_h - k_v * alpha_v) * cos_2tau) / (2 * k)
+    return k, alpha
+
+
+def _path_reduction_km(rain_rate_mm_h):
+    """P.530 reference distance d0 (km) of the effective path length d / (1 + d/d0)."""
+    return 35 * np.exp(-0.015 * np.minimum(np.maximum(np.asarray(rain_rate_mm_h, dtype=float), 0.0), 100.0))
+
+
+def rain_db_km(freq_mhz, rain_rate_mm_h=0.0, rain_percent=0.01, rain_tilt_deg=0.0, low_latitude=0.0):
+    """Specific rain attenuation (dB/km) exceeded rain_percent of the time, before path reduction."""
+    rain_rate = np.maximum(np.asarray(rain_rate_mm_h, dtype=float), 0.0)
+    percent = np.clip(np.asarray(rain_percent, dtype=float), 0.001, 1.0)
+    k, alpha = rain_coefficients(freq_mhz, rain_tilt_deg)
+    log_p = np.log10(percent)
+    scale = np.where(np.asarray(low_latitude, dtype=float) > 0,
+                     0.07 * percent ** -(0.855 + 0.139 * log_p),
+                     0.12 * percent ** -(0.546 + 0.043 * log_p))
+    return k * rain_rate ** alpha * scale
+
+
+def rain_db(distance_km, freq_mhz, rain_rate_mm_h=0.0, rain_percent=0.01, rain_tilt_deg=0.0, low_latitude=0.0):
+    """Rain attenuation (dB) exceeded rain_percent of the time over each path."""
+    distance_km = np.asarray(distance_km, dtype=float)
+    d0 = _path_reduction_km(rain_rate_mm_h)
+    return (rain_db_km(freq_mhz, rain_rate_mm_h, rain_percent, rain_tilt_deg, low_latitude)
+            * distance_km / (1 + distance_km / d0))
+
+
+def attenuation_terms(freq_mhz, **params):
+    """Per-path terms (gas dB/km, rain dB/km, d0 km) so that attenuation = gas*d + rain*d / (1 + d/d0).
+
+    Computing them once lets a distance solve evaluate the attenuation at many
+    trial distances cheaply.
+    """
+    p = {name: params.get(name, spec.default) for name, spec in PARAMETERS.items()}
+    gas = gas_db_km(freq_mhz, p["water_vapour_g_m3"], p["pressure_hpa"], p["temperature_c"])
+    rain = rain_db_km(freq_mhz, p["rain_rate_mm_h"], p["rain_percent"], p["rain_tilt_deg"], p["low_latitude"])
+    return gas, rain, _path_reduction_km(p["rain_rate_mm_h"])
+
+
+def attenuation_db(distance_km, freq_mhz, **params):
+    """Total gas and rain attenuation (dB) over each path; missing inputs take their defaults."""
+    gas, rain, d0 = attenuation_terms(freq_mhz, **params)
+    distance_km = np.asarray(distance_km, dtype=float)
+    return gas * distance_km + rain * distance_km / (1 + distance_km / d0)
@@ -0,0 +1,233 @@
+"""
+Headless bulk link budget evaluation.
+
+Streams a CSV or Parquet file of link scenarios through the vectorized core
+in fixed-size chunks and writes the results incrementally, so memory use stays
+constant regardless of the input size.
+
+How to Run:
+    python -m link_budget.batch scenarios.csv results.csv
+    python -m link_budget.batch scenarios.parquet results.parquet --workers 8
+
+Input columns (missing optional columns and empty cells take the default shown):
+    p_tx, freq_mhz, p_rx_sensitivity           (required)
+    g_tx, l_tx, g_rx, l_rx, l_fade, l_misc     (0.0)
+    n                                          (2.0)
+    model                                      (registered model name, default "1m")
+    model parameters, e.g. h_base_m            (the model's default)
+    atmospheric inputs, e.g. rain_rate_mm_h    (see link_budget.atmosphere)
+
+Gas and rain attenuation apply only to the rows with at least one non-empty
+atmospheric cell; their other atmospheric cells take the defaults.
+
+Output columns are the input columns followed by max_path_loss, distance_km,
+distance_m, distance_mi, distance_ft and feasible.
+
+Requirements:
+- pyarrow
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from link_budget import atmosphere, core
+
+REQUIRED_COLUMNS = core.REQUIRED_INPUTS
+OPTIONAL_COLUMNS = core.DEFAULT_INPUTS
+RESULT_COLUMNS = ("max_path_loss", "distance_km", "distance_m", "distance_mi", "distance_ft", "feasible")
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+def _file_format(path, override=None):
+    """Returns "csv" or "parquet" from an explicit override or the file extension."""
+    if override:
+        return override
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def _rechunk(batches, chunk_size):
+    """Regroups a stream of record batches into tables of exactly chunk_size rows (last may be short)."""
+    buffered = []
+    buffered_rows = 0
+    for batch in batches:
+        buffered.append(batch)
+        buffered_rows += batch.num_rows
+        while buffered_rows >= chunk_size:
+            table = pa.Table.from_batches(buffered)
+            yield table.slice(0, chunk_size)
+            remainder = table.slice(chunk_size)
+            buffered = remainder.to_batches()
+            buffered_rows = remainder.num_rows
+    if buffered_rows:
+        yield pa.Table.from_batches(buffered)
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, file_format=None):
+    """Yields the scenario file as pyarrow Tables of at most chunk_size rows."""
+    if _file_format(path, file_format) == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+    else:
+        source = sys.stdin.buffer if path == "-" else path
+        batches = pa_csv.open_csv(source)
+    yield from _rechunk(batches, chunk_size)
+
+
+def _numeric_column(table, name):
+    """Returns a numeric column as floats; missing columns and empty cells take the default."""
+    if name not in table.column_names:
+        return OPTIONAL_COLUMNS[name]
+    column = table.column(name).cast(pa.float64())
+    if name in REQUIRED_COLUMNS:
+        if column.null_count:
+            raise ValueError(f"Required column '{name}' has {column.null_count} empty cell(s)")
+        return column.to_numpy()
+    return column.fill_null(OPTIONAL_COLUMNS[name]).to_numpy()
+
+
+def _model_column(table):
+    """Encodes the model column to integer model codes without per-row string work."""
+    if "model" not in table.column_names:
+        return OPTIONAL_COLUMNS["model"]
+    column = table.column("model").cast(pa.string())
+    # The CSV reader keeps empty cells as "" rather than null; both take the default
+    column = pc.if_else(pc.equal(column, ""), pa.scalar(None, pa.string()), column)
+    encoded = column.fill_null(OPTIONAL_COLUMNS["model"]).combine_chunks().dictionary_encode()
+    names = encoded.dictionary.to_numpy(zero_copy_only=False)
+    return core.model_codes(names)[encoded.indices.to_numpy()]
+
+
+def evaluate_chunk(table):
+    """Runs the link budget over one table of scenarios and appends the result columns."""
+    missing = [col for col in REQUIRED_COLUMNS if col not in table.column_names]
+    if missing:
+        raise ValueError(f"Scenario file is missing required column(s): {', '.join(missing)}")
+
+    max_pl = core.max_path_loss(*(_numeric_column(table, name) for name in (
+        "p_tx", "g_tx", "l_tx", "g_rx", "l_rx", "l_fade", "l_misc", "p_rx_sensitivity")))
+    max_pl = np.broadcast_to(max_pl, (table.num_rows,))
+    # Columns named after any registered model's parameters are passed through to
+    # the models; empty cells take the parameter's default
+    model_params = {
+        name: table.column(name).cast(pa.float64()).fill_null(default).to_numpy()
+        for name, default in core.model_parameter_defaults().items()
+        if name in table.column_names
+    }
+    present = [name for name in atmosphere.PARAMETERS if name in table.column_names]
+    attenuated = None
+    if present:
+        attenuated = np.zeros(table.num_rows, dtype=bool)
+        for name in present:
+            attenuated |= pc.is_valid(table.column(name)).to_numpy(zero_copy_only=False)
+    distances = core.distance_from_path_loss(
+        max_pl, _numeric_column(table, "freq_mhz"), _numeric_column(table, "n"), _model_column(table),
+        attenuated=attenuated, **model_params)
+
+    for name, values in zip(RESULT_COLUMNS, (max_pl, *distances)):
+        table = table.append_column(name, pa.array(values))
+    return table
+
+
+class _ResultWriter:
+    """Appends result tables to a CSV or Parquet file as they arrive."""
+
+    def __init__(self, path, file_format=None):
+        self.path = path
+        self.format = _file_format(path, file_format)
+        self._writer = None
+
+    def write(self, table):
+        if self._writer is None:
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                sink = sys.stdout.buffer if self.path == "-" else self.path
+                self._writer = pa_csv.CSVWriter(sink, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _ordered_parallel_map(executor, func, items, max_in_flight):
+    """Like executor.map, but keeps at most max_in_flight chunks queued at once."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_batch(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=1,
+              input_format=None, output_format=None):
+    """Streams input_path through the link budget into output_path.
+
+    With workers > 1 the chunks are evaluated in a process pool; results are
+    still written in input order. Returns (rows processed, elapsed seconds).
+    """
+    chunks = read_chunks(input_path, chunk_size, input_format)
+    writer = _ResultWriter(output_path, output_format)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for result in _ordered_parallel_map(executor, evaluate_chunk, chunks, 2 * workers):
+                    writer.write(result)
+                    rows += result.num_rows
+        else:
+            for chunk in chunks:
+                result = evaluate_chunk(chunk)
+                writer.write(result)
+                rows += result.num_rows
+    finally:
+        writer.close()
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m link_budget.batch",
+        description="Evaluate a file of link scenarios without the GUI.",
+    )
+    parser.add_argument("input", help="Scenario file (.csv or .parquet, '-' for CSV on stdin)")
+    parser.add_argument("output", help="Result file (.csv or .parquet, '-' for CSV on stdout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Rows per chunk (default {DEFAULT_CHUNK_SIZE:,})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; 0 uses every CPU core (default 1)")
+    parser.add_argument("--input-format", choices=("csv", "parquet"), help="Override input format detection")
+    parser.add_argument("--output-format", choices=("csv", "parquet"), help="Override output format detection")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be a positive number.")
+    workers = args.workers or os.cpu_count() or 1
+
+    try:
+        rows, elapsed = run_batch(args.input, args.output, args.chunk_size, workers,
+                                  args.input_format, args.output_format)
+    except (OSError, ValueError, pa.ArrowInvalid) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    rate = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {rows:,} rows in {elapsed:.2f} s ({rate:,.0f} rows/sec)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
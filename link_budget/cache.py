@@ -0,0 +1,123 @@
+"""
+Bounded in-memory memoization for rendered charts and computed results.
+
+Streamlit reruns the whole script on every widget change, for every user.
+An LRUCache shared across sessions lets identical (rounded) inputs reuse an
+already-rendered PNG or an already-computed result instead of paying the
+matplotlib render and the computation again. The cache is bounded both by
+entry count and by the total size of the stored values, evicting the least
+recently used entries first.
+"""
+
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Inputs are rounded to this many decimal places when building cache keys, so
+# float noise from the widgets (e.g. 2.3000000000000003) does not miss the cache.
+KEY_DECIMALS = 6
+
+
+def make_key(*values, decimals=KEY_DECIMALS):
+    """Builds a hashable cache key, rounding every float (recursively) to `decimals` places."""
+    def normalize(value):
+        if isinstance(value, (float, np.floating)):
+            return round(float(value), decimals) + 0.0  # + 0.0 folds -0.0 into 0.0
+        if isinstance(value, (list, tuple)):
+            return tuple(normalize(v) for v in value)
+        if isinstance(value, dict):
+            return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+        if isinstance(value, np.ndarray):
+            return normalize(value.tolist())
+        return value
+
+    return normalize(values)
+
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached value in bytes."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in vars(value).values())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Stores a value; values larger than max_bytes on their own are not cached."""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, calling compute() and caching the result on a miss.
+
+        Concurrent misses on the same key may compute twice; the lock is not held
+        during compute() so slow renders never block other sessions.
+        """
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+def figure_to_png(fig, dpi=200):
+    """Renders a matplotlib figure to PNG bytes and closes it to release its memory."""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
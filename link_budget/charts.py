@@ -0,0 +1,129 @@
+"""
+Compact client-side chart payloads.
+
+Builds Vega-Lite specs that carry only the plotted series, so the browser
+draws the chart instead of the server rasterizing a PNG on every rerun. Long
+series are decimated to a bounded number of points first.
+"""
+
+import numpy as np
+
+DEFAULT_MAX_POINTS = 500
+LINE_COLOR = "#1f77b4"
+MARKER_COLOR = "red"
+
+
+def downsample(x, y, max_points=DEFAULT_MAX_POINTS):
+    """Min/max decimation of a series to at most max_points points.
+
+    Keeps both end points and the lowest and highest y of each bucket in
+    between, so peaks and the overall shape survive. Series that are already
+    short enough (or max_points=None) are returned unchanged.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if max_points is None or len(x) <= max(max_points, 4):
+        return x, y
+
+    interior = y[1:-1]
+    buckets = max((max_points - 2) // 2, 1)
+    size = -(-len(interior) // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:len(interior)] = interior
+    padded = padded.reshape(buckets, size)
+    # NaN (infeasible) points never win the min or max
+    lows = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    highs = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    offsets = np.arange(buckets) * size + 1
+    keep = np.unique(np.concatenate(([0, len(x) - 1], offsets + lows, offsets + highs)))
+    keep = keep[keep < len(x)]
+    return x[keep], y[keep]
+
+
+def _plottable(x, y, x_scale, y_scale):
+    mask = np.isfinite(x) & np.isfinite(y)
+    if x_scale == "log":
+        mask &= x > 0
+    if y_scale == "log":
+        mask &= y > 0
+    return x[mask], y[mask]
+
+
+def _compact(values):
+    # Six significant digits is far below a pixel and keeps the payload small
+    return [float(f"{value:.6g}") for value in values]
+
+
+def line_chart_spec(x, y, x_title, y_title, title=None, x_scale="linear", y_scale="linear",
+                    line_label="Series", marker=None, marker_label=None, max_points=DEFAULT_MAX_POINTS):
+    """Builds a Vega-Lite line chart of (x, y), optionally with one highlighted (x, y) marker.
+
+    Points Vega-Lite cannot place (non-finite, or non-positive on a log axis)
+    are dropped before downsampling.
+    """
+    x, y = downsample(*_plottable(np.asarray(x, dtype=float), np.asarray(y, dtype=float), x_scale, y_scale),
+                      max_points)
+    domain = [line_label]
+    layers = [{
+        "data": {"values": [{"x": px, "y": py} for px, py in zip(_compact(x), _compact(y))]},
+        "mark": {"type": "line"},
+        "encoding": {"color": {"datum": line_label}},
+    }]
+    if marker is not None:
+        domain.append(marker_label or "Current")
+        layers.append({
+            "data": {"values": [dict(zip(("x", "y"), _compact(marker)))]},
+            "mark": {"type": "point", "filled": True, "size": 80},
+            "encoding": {"color": {"datum": domain[-1]}},
+        })
+
+    spec = {
+        "encoding": {
+            "x": {"field": "x", "type": "quantitative", "title": x_title, "scale": {"type": x_scale}},
+            "y": {"field": "y", "type": "quantitative", "title": y_title, "scale": {"type": y_scale}},
+            "color": {
+                "scale": {"domain": domain, "range": [LINE_COLOR, MARKER_COLOR][:len(domain)]},
+                "legend": {"title": None, "orient": "top"},
+            },
+            "tooltip": [
+                {"field": "x", "type": "quantitative", "title": x_title},
+                {"field": "y", "type": "quantitative", "title": y_title},
+            ],
+        },
+        "layer": layers,
+    }
+    if title:
+        spec["title"] = title
+    return spec
+
+
+def scatter_fit_spec(x, y, line_x, line_y, x_title, y_title, title=None, x_scale="linear",
+                     point_label="Measured", line_label="Fit"):
+    """Builds a Vega-Lite scatter of (x, y) points with a fitted (line_x, line_y) curve on top."""
+    x, y = _plottable(np.asarray(x, dtype=float), np.asarray(y, dtype=float), x_scale, "linear")
+    line_x, line_y = _plottable(np.asarray(line_x, dtype=float), np.asarray(line_y, dtype=float), x_scale, "linear")
+    spec = {
+        "encoding": {
+            "x": {"field": "x", "type": "quantitative", "title": x_title, "scale": {"type": x_scale}},
+            "y": {"field": "y", "type": "quantitative", "title": y_title, "scale": {"zero": False}},
+            "color": {
+                "scale": {"domain": [point_label, line_label], "range": [LINE_COLOR, MARKER_COLOR]},
+                "legend": {"title": None, "orient": "top"},
+            },
+        },
+        "layer": [
+            {
+                "data": {"values": [{"x": px, "y": py} for px, py in zip(_compact(x), _compact(y))]},
+                "mark": {"type": "circle", "size": 12, "opacity": 0.4},
+                "encoding": {"color": {"datum": point_label}},
+            },
+            {
+                "data": {"values": [{"x": px, "y": py} for px, py in zip(_compact(line_x), _compact(line_y))]},
+                "mark": {"type": "line", "strokeWidth": 2},
+                "encoding": {"color": {"datum": line_label}},
+            },
+        ],
+    }
+    if title:
+        spec["title"] = title
+    return spec
@@ -0,0 +1,258 @@
+"""
+Vectorized link budget math shared by the Streamlit app and the tkinter GUI.
+
+Every function accepts Python scalars or NumPy arrays (any broadcastable shape)
+for every parameter, including the model choice, so a whole planning run of
+candidate links can be evaluated in a single call instead of a Python loop.
+
+Path loss models come from the registry in `link_budget.models` (f in MHz,
+n = path loss exponent), e.g.:
+  * "1km" - Classic Model:      PL(d) = 20log10(f) + 10n*log10(d_km) + 32.44
+  * "1m"  - Log-distance Model: PL(d) = 20log10(f) - 27.55 + 10n*log10(d_m)
+Model-specific inputs (antenna heights, environment, ...) are passed as extra
+keyword arguments named after the model's parameters; models ignore the ones
+they do not use and fall back to their defaults for missing ones. Passing any
+of the inputs in `link_budget.atmosphere.PARAMETERS` the same way adds gas and
+rain attenuation on top of every model's path loss; an `attenuated` mask limits
+it to the links that actually asked for it when links are evaluated together.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import atmosphere, models
+
+# Unit conversion factors
+M_PER_KM = 1000.0
+MI_PER_KM = 0.621371
+FT_PER_M = 3.28084
+
+# Model choice -> integer code used for vectorized dispatch (live view of the registry)
+MODEL_CODES = models.MODEL_CODES
+
+# Link budget inputs without a sensible default, and defaults for the others,
+# used by the headless entry points (batch files, HTTP API)
+REQUIRED_INPUTS = ("p_tx", "freq_mhz", "p_rx_sensitivity")
+DEFAULT_INPUTS = {
+    "g_tx": 0.0,
+    "l_tx": 0.0,
+    "g_rx": 0.0,
+    "l_rx": 0.0,
+    "l_fade": 0.0,
+    "l_misc": 0.0,
+    "n": 2.0,
+    "model": "1m",
+}
+
+
+class Distances(NamedTuple):
+    """Maximum distance in every unit plus a mask of links that can be established.
+
+    Infeasible entries (negative path loss budget, non-positive frequency,
+    exponent or slope, unknown model) hold NaN in every unit array.
+    """
+    km: np.ndarray
+    m: np.ndarray
+    mi: np.ndarray
+    ft: np.ndarray
+    feasible: np.ndarray
+
+
+def model_codes(model_choice):
+    """Converts registered model names (e.g. "1m"/"1km") to integer codes, element-wise.
+
+    Integer input is passed through unchanged, so callers evaluating many links
+    can encode once and skip the string lookups. Unknown names map to -1.
+    """
+    choice = np.asarray(model_choice)
+    if choice.dtype.kind in "iu":
+        return choice
+    if choice.ndim == 0:
+        return np.asarray(MODEL_CODES.get(str(choice), -1))
+    # One vectorized comparison per known model is far cheaper than sorting
+    # a large string array with np.unique.
+    codes = np.full(choice.shape, -1, dtype=np.int8)
+    for name, code in MODEL_CODES.items():
+        codes[choice == name] = code
+    return codes
+
+
+def max_path_loss(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity):
+    """Calculates the maximum allowable path loss in the link budget."""
+    return (np.asarray(p_tx, dtype=float) + g_tx + g_rx
+            - l_tx - l_rx - l_fade - l_misc - p_rx_sensitivity)
+
+
+def model_parameter_defaults():
+    """Returns {parameter name: default} over every registered model's extra inputs and the atmospheric ones."""
+    defaults = {}
+    for model in models.MODELS.values():
+        for name, spec in model.parameters.items():
+            defaults.setdefault(name, float(spec.default))
+    for name, spec in atmosphere.PARAMETERS.items():
+        defaults.setdefault(name, float(spec.default))
+    return defaults
+
+
+def _dispatch(model_choice, evaluate, *arrays, **model_params):
+    """Evaluates evaluate(model, *arrays, **model_params) with each link's model.
+
+    Inputs are broadcast together; with a mixed-model array every registered
+    model is evaluated once on the subset of links that use it. Unknown models
+    give NaN.
+    """
+    code = model_codes(model_choice)
+    arrays = [np.asarray(a, dtype=float) for a in arrays]
+    params = {key: np.asarray(value, dtype=float) for key, value in model_params.items()}
+    shape = np.broadcast_shapes(code.shape, *(a.shape for a in arrays), *(v.shape for v in params.values()))
+
+    if code.ndim == 0:
+        if not 0 <= code < len(models.MODELS):
+            return np.full(shape, np.nan)
+        return np.broadcast_to(evaluate(models.model_by_code(int(code)), *arrays, **params), shape)
+
+    code = np.broadcast_to(code, shape)
+    out = np.full(shape, np.nan)
+    for model_code, model in enumerate(models.MODELS.values()):
+        mask = code == model_code
+        if not mask.any():
+            continue
+        subset = [np.broadcast_to(a, shape)[mask] for a in arrays]
+        subset_params = {key: np.broadcast_to(value, shape)[mask] for key, value in params.items()}
+        out[mask] = evaluate(model, *subset, **subset_params)
+    return out
+
+
+def _masked(attenuated, attenuation):
+    """Zeroes the attenuation of the links outside the `attenuated` mask (None keeps all)."""
+    return attenuation if attenuated is None else np.where(attenuated, attenuation, 0.0)
+
+
+def path_loss_db(freq_mhz, n, model_choice, distance_km, attenuated=None, **model_params):
+    """Calculates the path loss (dB) at each distance; NaN for unknown models.
+
+    With atmospheric inputs, `attenuated` (a boolean mask, default all links)
+    selects the links the attenuation is added to.
+    """
+    model_params, atmospheric = atmosphere.split_parameters(model_params)
+    loss = _dispatch(model_choice, lambda model, d, f, n, **p: model.path_loss_db(d, f, n, **p),
+                     distance_km, freq_mhz, n, **model_params)
+    if atmospheric:
+        loss = loss + _masked(attenuated, atmosphere.attenuation_db(distance_km, freq_mhz, **atmospheric))
+    return loss
+
+
+def _inverse_distance(max_path_loss, freq_mhz, n, model_choice, **model_params):
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        return _dispatch(model_choice, lambda model, pl, f, n, **p: model.distance_km(pl, f, n, **p),
+                         max_path_loss, freq_mhz, n, **model_params)
+
+
+def _solve_attenuated(model, pl, freq, n, hi_km, gas, rain, d0, **params):
+    """Solves PL_model(d) + gas*d + rain*d / (1 + d/d0) = pl for one model's links.
+
+    The attenuation is non-negative and grows with d, so the root lies between
+    the model's inverse at pl - L_atm(hi_km) and the unattenuated distance
+    hi_km. Log-distance models take Newton steps on log10(d) inside that
+    bracket (falling back to bisection when a step leaves it); other models
+    are bisected.
+    """
+    def attenuation(d):
+        return gas * d + rain * d / (1 + d / d0)
+
+    lo_km = model.distance_km(pl - attenuation(hi_km), freq, n, **params)
+    lo_km = np.where(np.isfinite(lo_km) & (lo_km > 0), np.minimum(lo_km, hi_km), models.BISECTION_RANGE_KM[0])
+    if not isinstance(model, models.LogDistanceModel):
+        return models.solve_distance_km(lambda d: model.path_loss_db(d, freq, n, **params) + attenuation(d),
+                                        pl, lo_km, hi_km)
+
+    intercept, slope = model.terms(freq, n, **params)
+    lo, hi = np.log10(lo_km), np.log10(hi_km)
+    lo, hi = np.broadcast_arrays(lo, hi)
+    lo, hi = lo.copy(), hi.copy()
+    x = hi.copy()
+    for _ in range(models.BISECTION_ITERATIONS):
+        d = 10 ** x
+        excess = intercept + slope * x + attenuation(d) - pl
+        lo = np.where(excess <= 0, x, lo)
+        hi = np.where(excess > 0, x, hi)
+        step = excess / (slope + np.log(10) * d * (gas + rain / (1 + d / d0) ** 2))
+        x_next = x - step
+        x_next = np.where((x_next >= lo) & (x_next <= hi), x_next, (lo + hi) / 2)
+        converged = np.abs(x_next - x) <= models.SOLVE_TOLERANCE_DECADES
+        x = x_next
+        if np.all(converged | ~np.isfinite(x)):
+            break
+
+    closes = intercept + slope * np.log10(lo_km) + attenuation(lo_km) <= pl
+    return np.where(closes & (slope > 0), 10 ** x, np.nan)
+
+
+def _attenuated_distance(pl, freq, n, model_choice, unattenuated_km, model_params, atmospheric, attenuated=None):
+    """Maximum distance with gas and rain attenuation added to each link's model path loss."""
+    gas, rain, d0 = atmosphere.attenuation_terms(freq, **atmospheric)
+    if attenuated is not None:
+        # Unattenuated links get an unknown model code, so the solve skips them
+        attenuated = np.asarray(attenuated, dtype=bool)
+        model_choice = np.where(attenuated, model_codes(model_choice), -1)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        distance_km = _dispatch(model_choice, _solve_attenuated, pl, freq, n, unattenuated_km, gas, rain, d0,
+                                **model_params)
+    return distance_km if attenuated is None else np.where(attenuated, distance_km, unattenuated_km)
+
+
+def distance_from_path_loss(max_path_loss, freq_mhz, n, model_choice, attenuated=None, **model_params):
+    """Calculates maximum distance for every link from its allowable path loss.
+
+    Applies each model's inverse kernel, or solves numerically when
+    atmospheric attenuation is included (for the links selected by the
+    `attenuated` mask, default all). Returns a Distances tuple of arrays
+    broadcast to the common shape of the inputs.
+    """
+    pl = np.asarray(max_path_loss, dtype=float)
+    freq = np.asarray(freq_mhz, dtype=float)
+    model_params, atmospheric = atmosphere.split_parameters(model_params)
+    distance_km = _inverse_distance(pl, freq, n, model_choice, **model_params)
+    if atmospheric:
+        # Distance-dependent attenuation has no closed-form inverse
+        distance_km = _attenuated_distance(pl, freq, n, model_choice, distance_km, model_params, atmospheric,
+                                           attenuated)
+
+    feasible = (pl >= 0) & (freq > 0) & np.isfinite(distance_km) & (distance_km > 0)
+    distance_km = np.where(feasible, distance_km, np.nan)
+    distance_m = distance_km * M_PER_KM
+
+    return Distances(
+        km=distance_km,
+        m=distance_m,
+        mi=distance_km * MI_PER_KM,
+        ft=distance_m * FT_PER_M,
+        feasible=feasible,
+    )
+
+
+def exponent_from_path_loss(max_path_loss, freq_mhz, model_choice, distance_km, attenuated=None, **model_params):
+    """Calculates the largest path loss exponent n at which each link still reaches distance_km.
+
+    Inverts the model for n. At or inside the reference distance the path loss
+    does not grow with n, so every exponent works (inf) when the link closes
+    there; NaN marks links that no positive exponent can close and models that
+    do not use an exponent.
+    """
+    pl = np.asarray(max_path_loss, dtype=float)
+    distance_km = np.asarray(distance_km, dtype=float)
+    model_params, atmospheric = atmosphere.split_parameters(model_params)
+    if atmospheric:
+        # The attenuation does not depend on n: it only takes budget away from the model
+        pl = pl - _masked(attenuated, atmosphere.attenuation_db(distance_km, freq_mhz, **atmospheric))
+    n_max = _dispatch(model_choice, lambda model, pl, f, d, **p: model.max_exponent(pl, f, d, **p),
+                      pl, freq_mhz, distance_km, **model_params)
+    return np.where((distance_km > 0) & (pl >= 0), n_max, np.nan)
+
+
+def link_distances(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity,
+                   freq_mhz, n, model_choice, **model_params):
+    """Evaluates the full link budget: parameters in, Distances out."""
+    pl = max_path_loss(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity)
+    return distance_from_path_loss(pl, freq_mhz, n, model_choice, **model_params)
@@ -0,0 +1,247 @@
+"""
+Area coverage maps: received power and link margin over a 2D grid.
+
+The grid is evaluated tile by tile with the vectorized path loss kernel, so
+only one tile of intermediate arrays exists per worker at a time. Received
+power is written into a float32 .npy file opened as a memory map, which lets
+grids larger than RAM be computed and then inspected lazily (e.g. a strided
+preview for display). Tiles are independent and can be spread over a
+process pool; every worker opens the same memory-mapped file and writes only
+its own tile.
+
+For each cell the strongest transmitter wins (all transmitters share the link
+parameters, so that is the nearest one):
+
+    rx_power(cell) = link_gain - PL(min distance to a transmitter)
+    margin(cell)   = rx_power(cell) - required_power
+
+How to Run (large grids, written to disk):
+    python -m link_budget.coverage out.npy --size-m 50000 --cells 10000 --tx 0,0 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import core
+
+DEFAULT_TILE_SIZE = 1024
+
+# Cells closer than this to a transmitter are evaluated at this distance,
+# keeping the log-distance models finite at the transmitter location.
+MIN_DISTANCE_M = 1.0
+
+
+class CoverageGrid(NamedTuple):
+    """Rectangular area (meters) divided into rows x cols cells; row 0 is at y_min."""
+    x_min: float
+    x_max: float
+    y_min: float
+    y_max: float
+    cols: int
+    rows: int
+
+    @classmethod
+    def square(cls, size_m, cells, center=(0.0, 0.0)):
+        half = size_m / 2
+        return cls(center[0] - half, center[0] + half, center[1] - half, center[1] + half, cells, cells)
+
+    def x_centers(self, start=0, stop=None):
+        step = (self.x_max - self.x_min) / self.cols
+        return self.x_min + (np.arange(start, self.cols if stop is None else stop) + 0.5) * step
+
+    def y_centers(self, start=0, stop=None):
+        step = (self.y_max - self.y_min) / self.rows
+        return self.y_min + (np.arange(start, self.rows if stop is None else stop) + 0.5) * step
+
+    def tiles(self, tile_size=DEFAULT_TILE_SIZE):
+        """Yields (row_start, row_stop, col_start, col_stop) for every tile."""
+        for r0 in range(0, self.rows, tile_size):
+            for c0 in range(0, self.cols, tile_size):
+                yield r0, min(r0 + tile_size, self.rows), c0, min(c0 + tile_size, self.cols)
+
+
+class LinkParameters(NamedTuple):
+    """Link budget terms used for coverage, reduced to the two power levels that matter."""
+    link_gain_db: float     # p_tx + g_tx - l_tx + g_rx - l_rx - l_misc
+    required_dbm: float     # p_rx_sensitivity + l_fade
+    freq_mhz: float
+    n: float
+    model_choice: str
+    model_params: dict = None   # extra inputs of the propagation model
+
+    @classmethod
+    def from_budget(cls, p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity, freq_mhz, n, model_choice,
+                    **model_params):
+        link_gain = p_tx + g_tx - l_tx + g_rx - l_rx - l_misc
+        return cls(link_gain, p_rx_sensitivity + l_fade, freq_mhz, n, model_choice, model_params)
+
+
+class CoverageResult(NamedTuple):
+    """Received power grid (possibly memory-mapped) plus what is needed to derive margins."""
+    rx_power_dbm: np.ndarray
+    required_dbm: float
+    grid: CoverageGrid
+
+    def margin_db(self, stride=1):
+        """Link margin (dB), optionally subsampled by `stride` to avoid reading the full grid."""
+        return self.rx_power_dbm[::stride, ::stride] - self.required_dbm
+
+    def coverage_fraction(self):
+        """Fraction of cells where the link closes, computed tile by tile."""
+        covered = 0
+        for r0 in range(0, self.grid.rows, DEFAULT_TILE_SIZE):
+            covered += np.count_nonzero(self.rx_power_dbm[r0:r0 + DEFAULT_TILE_SIZE] >= self.required_dbm)
+        return covered / (self.grid.rows * self.grid.cols)
+
+
+def tile_rx_power(grid, bounds, transmitters, params):
+    """Received power (dBm, float32) over one tile, from the nearest transmitter."""
+    r0, r1, c0, c1 = bounds
+    x = grid.x_centers(c0, c1)[np.newaxis, :]
+    y = grid.y_centers(r0, r1)[:, np.newaxis]
+
+    nearest_sq = np.full((r1 - r0, c1 - c0), np.inf)
+    for tx_x, tx_y in transmitters:
+        np.minimum(nearest_sq, (x - tx_x) ** 2 + (y - tx_y) ** 2, out=nearest_sq)
+
+    distance_km = np.sqrt(np.maximum(nearest_sq, MIN_DISTANCE_M ** 2)) / core.M_PER_KM
+    path_loss = core.path_loss_db(params.freq_mhz, params.n, params.model_choice, distance_km,
+                                  **(params.model_params or {}))
+    return (params.link_gain_db - path_loss).astype(np.float32)
+
+
+def _compute_tiles(args):
+    path, grid, tile_bounds, transmitters, params = args
+    out = np.load(path, mmap_mode="r+")
+    for bounds in tile_bounds:
+        r0, r1, c0, c1 = bounds
+        out[r0:r1, c0:c1] = tile_rx_power(grid, bounds, transmitters, params)
+    out.flush()
+    return len(tile_bounds)
+
+
+def compute_coverage(grid, transmitters, params, out_path=None, tile_size=DEFAULT_TILE_SIZE, workers=1):
+    """Computes received power over the grid for a list of (x, y) transmitter positions in meters.
+
+    With `out_path` the result is a memory-mapped .npy file on disk; otherwise a
+    small grid is computed in memory (through a temporary file, removed afterwards,
+    when workers > 1).
+    """
+    transmitters = [(float(x), float(y)) for x, y in transmitters]
+    if not transmitters:
+        raise ValueError("At least one transmitter location is required.")
+    if grid.rows <= 0 or grid.cols <= 0:
+        raise ValueError("Grid must have a positive number of rows and columns.")
+
+    tiles = list(grid.tiles(tile_size))
+    if out_path is None and workers <= 1:
+        rx_power = np.empty((grid.rows, grid.cols), dtype=np.float32)
+        for bounds in tiles:
+            r0, r1, c0, c1 = bounds
+            rx_power[r0:r1, c0:c1] = tile_rx_power(grid, bounds, transmitters, params)
+        return CoverageResult(rx_power, params.required_dbm, grid)
+
+    temporary = out_path is None
+    if temporary:
+        fd, out_path = tempfile.mkstemp(suffix=".npy")
+        os.close(fd)
+    try:
+        rx_power = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(grid.rows, grid.cols))
+        del rx_power  # Workers (or the loop below) reopen the file; make sure the header is on disk
+
+        if workers > 1:
+            # Hand each worker a contiguous batch of tiles to amortize reopening the map
+            per_worker = -(-len(tiles) // workers)
+            batches = [tiles[i:i + per_worker] for i in range(0, len(tiles), per_worker)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(_compute_tiles, [(out_path, grid, b, transmitters, params) for b in batches]))
+        else:
+            _compute_tiles((out_path, grid, tiles, transmitters, params))
+
+        # A temporary result is read into memory so its file can be removed
+        rx_power = np.load(out_path, mmap_mode=None if temporary else "r")
+    finally:
+        if temporary:
+            os.remove(out_path)
+    return CoverageResult(rx_power, params.required_dbm, grid)
+
+
+def preview_stride(grid, max_pixels=800):
+    """Stride that subsamples the grid to at most max_pixels per side for display."""
+    return max(1, -(-max(grid.rows, grid.cols) // max_pixels))
+
+
+def parse_transmitters(text):
+    """Parses "x,y" pairs (meters), one per line or separated by ';'."""
+    transmitters = []
+    for item in text.replace(";", "\n").splitlines():
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            x, y = (float(v) for v in item.split(","))
+        except ValueError:
+            raise ValueError(f"Invalid transmitter location '{item}'. Expected 'x,y' in meters.") from None
+        transmitters.append((x, y))
+    return transmitters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m link_budget.coverage",
+        description="Compute a received-power coverage grid into a memory-mapped .npy file.",
+    )
+    parser.add_argument("output", help="Output .npy file (float32 received power in dBm, row 0 at y_min)")
+    parser.add_argument("--size-m", type=float, required=True, help="Side length of the square area (m)")
+    parser.add_argument("--cells", type=int, required=True, help="Cells per side")
+    parser.add_argument("--tx", action="append", required=True, help="Transmitter location 'x,y' in meters (repeatable)")
+    parser.add_argument("--p-tx", type=float, default=20.0, help="Transmit power (dBm)")
+    parser.add_argument("--g-tx", type=float, default=0.0, help="Transmit antenna gain (dBi)")
+    parser.add_argument("--l-tx", type=float, default=0.0, help="Transmit cable loss (dB)")
+    parser.add_argument("--g-rx", type=float, default=0.0, help="Receiver antenna gain (dBi)")
+    parser.add_argument("--l-rx", type=float, default=0.0, help="Receiver cable loss (dB)")
+    parser.add_argument("--l-fade", type=float, default=0.0, help="Fade margin (dB)")
+    parser.add_argument("--l-misc", type=float, default=0.0, help="Misc. losses (dB)")
+    parser.add_argument("--sensitivity", type=float, default=-95.0, help="Receiver sensitivity (dBm)")
+    parser.add_argument("--freq-mhz", type=float, default=2400.0, help="Frequency (MHz)")
+    parser.add_argument("--n", type=float, default=2.0, help="Path loss exponent")
+    parser.add_argument("--model", choices=tuple(core.MODEL_CODES), default="1m", help="Path loss model")
+    parser.add_argument("--model-param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra propagation model input, e.g. h_base_m=40 (repeatable)")
+    parser.add_argument("--tile-size", type=int, default=DEFAULT_TILE_SIZE, help="Tile side length in cells")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes; 0 uses every CPU core")
+    args = parser.parse_args(argv)
+
+    try:
+        transmitters = parse_transmitters(";".join(args.tx))
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        model_params = {name: float(value) for name, value in (item.split("=", 1) for item in args.model_param)}
+    except ValueError:
+        parser.error("--model-param values must be NAME=NUMBER.")
+
+    params = LinkParameters.from_budget(args.p_tx, args.g_tx, args.l_tx, args.g_rx, args.l_rx, args.l_fade,
+                                        args.l_misc, args.sensitivity, args.freq_mhz, args.n, args.model,
+                                        **model_params)
+    grid = CoverageGrid.square(args.size_m, args.cells)
+    workers = args.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    result = compute_coverage(grid, transmitters, params, args.output, args.tile_size, workers)
+    elapsed = time.perf_counter() - start
+    print(f"Computed {grid.rows * grid.cols:,} cells in {elapsed:.2f} s; "
+          f"{result.coverage_fraction():.1%} of the area is covered.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""
+Registry of propagation (path loss) models.
+
+Every model provides a vectorized forward kernel (distance -> path loss) and
+an inverse kernel (path loss -> distance). Models whose path loss is linear
+in log10(distance) only describe their intercept and slope, computed once per
+call from the frequency-dependent terms, and get both kernels in closed form.
+Models without an analytic inverse fall back to vectorized bisection.
+
+Registering a model once makes it available to the core math, the batch and
+coverage engines, the solver and both user interfaces:
+
+    register_model(MyModel())
+
+Units: frequency in MHz, distance in km, heights in m, losses in dB.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+SPEED_OF_LIGHT_M_S = 299_792_458.0
+
+# Bracket for the generic bisection inverse (km) and its iteration count;
+# 60 halvings of 11 decades in log10 space is far below float resolution.
+BISECTION_RANGE_KM = (1e-6, 1e5)
+BISECTION_ITERATIONS = 60
+# Numerical inverses stop once every distance is known to this many decades
+SOLVE_TOLERANCE_DECADES = 1e-12
+
+
+def solve_distance_km(path_loss_db, target_db, lo_km=BISECTION_RANGE_KM[0], hi_km=BISECTION_RANGE_KM[1],
+                      iterations=BISECTION_ITERATIONS):
+    """Vectorized bisection on log10(distance) for path_loss_db(d) == target_db.
+
+    path_loss_db maps an array of distances (km, the shape of target_db) to
+    path loss and must increase with distance. The bracket may be given per
+    element; targets outside it have no solution and give NaN.
+    """
+    target_db, lo_km, hi_km = np.broadcast_arrays(
+        np.asarray(target_db, dtype=float), np.asarray(lo_km, dtype=float), np.asarray(hi_km, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lo = np.log10(lo_km)
+        hi = np.log10(hi_km)
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            too_far = path_loss_db(10 ** mid) > target_db
+            hi = np.where(too_far, mid, hi)
+            lo = np.where(too_far, lo, mid)
+            if not np.any(hi - lo > SOLVE_TOLERANCE_DECADES):
+                break
+        distance = 10 ** ((lo + hi) / 2)
+        # Targets outside the bracket have no solution
+        in_range = (path_loss_db(lo_km) <= target_db) & (path_loss_db(hi_km) >= target_db)
+    return np.where(in_range, distance, np.nan)
+
+
+class ModelParameter(NamedTuple):
+    """Extra input of a model, described once so every UI can build a widget for it."""
+    label: str
+    default: float
+    step: float = 1.0
+    choices: dict = None    # display label -> numeric value, for categorical inputs
+
+
+class PropagationModel:
+    """Base class: subclasses implement path_loss_db and may override the inverses."""
+
+    name = ""
+    label = ""
+    parameters = {}
+    # Whether the FSPL exponent n enters the model
+    uses_exponent = False
+    # Frequency range (MHz) the model is defined for; None if unrestricted
+    valid_freq_mhz = None
+
+    def _params(self, params):
+        """Returns this model's parameters as float arrays, filling in defaults."""
+        return {key: np.asarray(params.get(key, spec.default), dtype=float)
+                for key, spec in self.parameters.items()}
+
+    def path_loss_db(self, distance_km, freq_mhz, n, **params):
+        raise NotImplementedError
+
+    def distance_km(self, path_loss_db, freq_mhz, n, **params):
+        """Inverts path_loss_db (increasing in distance) by bisection on log10(distance)."""
+        path_loss_db, freq_mhz, n = np.broadcast_arrays(
+            np.asarray(path_loss_db, dtype=float), np.asarray(freq_mhz, dtype=float), np.asarray(n, dtype=float))
+        return solve_distance_km(lambda d: self.path_loss_db(d, freq_mhz, n, **params), path_loss_db)
+
+    def max_exponent(self, path_loss_db, freq_mhz, distance_km, **params):
+        """Largest exponent n reaching distance_km; NaN for models that do not use n."""
+        return np.full(np.broadcast(path_loss_db, freq_mhz, distance_km).shape, np.nan)
+
+
+class LogDistanceModel(PropagationModel):
+    """Model of the form PL(d) = intercept + slope * log10(d_km) with closed-form inverse."""
+
+    def terms(self, freq_mhz, n, **params):
+        """Returns (intercept dB at 1 km, slope dB per decade) for the given inputs."""
+        raise NotImplementedError
+
+    def path_loss_db(self, distance_km, freq_mhz, n, **params):
+        intercept, slope = self.terms(freq_mhz, n, **params)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return intercept + slope * np.log10(distance_km)
+
+    def distance_km(self, path_loss_db, freq_mhz, n, **params):
+        intercept, slope = self.terms(freq_mhz, n, **params)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            distance = np.power(10.0, (path_loss_db - intercept) / slope)
+        return np.where(slope > 0, distance, np.nan)
+
+
+class ReferenceDistanceModel(LogDistanceModel):
+    """PL(d) = PL(d_ref) + 10n*log10(d / d_ref): the exponent sets the slope."""
+
+    uses_exponent = True
+    reference_km = 1.0
+
+    def reference_loss_db(self, freq_mhz, **params):
+        """Path loss at the reference distance."""
+        raise NotImplementedError
+
+    def terms(self, freq_mhz, n, **params):
+        n = np.asarray(n, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reference = self.reference_loss_db(np.asarray(freq_mhz, dtype=float), **params)
+        return reference - 10 * n * np.log10(self.reference_km), 10 * n
+
+    def max_exponent(self, path_loss_db, freq_mhz, distance_km, **params):
+        """Closed-form inverse for n. Inside the reference distance any exponent works (inf)."""
+        distance_km = np.asarray(distance_km, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            excess = path_loss_db - self.reference_loss_db(np.asarray(freq_mhz, dtype=float), **params)
+            log_ratio = np.log10(distance_km / self.reference_km)
+            n_max = excess / (10 * log_ratio)
+        unbounded = (log_ratio < 0) | ((log_ratio == 0) & (excess >= 0))
+        n_max = np.where(log_ratio > 0, n_max, np.where(unbounded, np.inf, np.nan))
+        return np.where(n_max > 0, n_max, np.nan)
+
+
+class ClassicModel(ReferenceDistanceModel):
+    """PL(d) = 20log10(f) + 10n*log10(d_km) + 32.44"""
+    name = "1km"
+    label = "Classic Model (1 km reference)"
+    reference_km = 1.0
+
+    def reference_loss_db(self, freq_mhz, **params):
+        return 20 * np.log10(freq_mhz) + 32.44
+
+
+class LogDistance1mModel(ReferenceDistanceModel):
+    """PL(d) = 20log10(f) - 27.55 + 10n*log10(d_m)"""
+    name = "1m"
+    label = "Log-distance Model (1m reference)"
+    reference_km = 1e-3
+
+    def reference_loss_db(self, freq_mhz, **params):
+        return 20 * np.log10(freq_mhz) - 27.55
+
+
+class IndoorP1238Model(ReferenceDistanceModel):
+    """ITU-R P.1238 indoor: PL(d) = 20log10(f) + N*log10(d_m) + Lf - 28, with N = 10n."""
+    name = "p1238"
+    label = "ITU-R P.1238 Indoor"
+    reference_km = 1e-3
+    valid_freq_mhz = (300.0, 100_000.0)
+    parameters = {
+        "floor_loss_db": ModelParameter("Floor Penetration Loss (dB)", 0.0, 1.0),
+    }
+
+    def reference_loss_db(self, freq_mhz, **params):
+        p = self._params(params)
+        return 20 * np.log10(freq_mhz) - 28 + p["floor_loss_db"]
+
+
+def _hata_mobile_correction(log_f, h_mobile_m, large_city=None):
+    """Mobile antenna height correction a(hm) of the Hata model (dB)."""
+    small_medium = (1.1 * log_f - 0.7) * h_mobile_m - (1.56 * log_f - 0.8)
+    if large_city is None:
+        return small_medium
+    large = np.where(log_f <= np.log10(300.0),
+                     8.29 * np.log10(1.54 * h_mobile_m) ** 2 - 1.1,
+                     3.2 * np.log10(11.75 * h_mobile_m) ** 2 - 4.97)
+    return np.where(large_city, large, small_medium)
+
+
+class OkumuraHataModel(LogDistanceModel):
+    """Okumura-Hata macro-cell model (150-1500 MHz, 1-20 km, base 30-200 m, mobile 1-10 m)."""
+    name = "hata"
+    label = "Okumura-Hata"
+    valid_freq_mhz = (150.0, 1500.0)
+
+    URBAN_LARGE, URBAN, SUBURBAN, OPEN = 0, 1, 2, 3
+    parameters = {
+        "h_base_m": ModelParameter("Base Station Height (m)", 30.0, 1.0),
+        "h_mobile_m": ModelParameter("Mobile Height (m)", 1.5, 0.5),
+        "environment": ModelParameter("Environment", 1, choices={
+            "Urban (large city)": 0, "Urban (small/medium city)": 1, "Suburban": 2, "Open / rural": 3,
+        }),
+    }
+
+    def terms(self, freq_mhz, n, **params):
+        p = self._params(params)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_f = np.log10(np.asarray(freq_mhz, dtype=float))
+            log_hb = np.log10(p["h_base_m"])
+            environment = p["environment"]
+            urban = (69.55 + 26.16 * log_f - 13.82 * log_hb
+                     - _hata_mobile_correction(log_f, p["h_mobile_m"], environment == self.URBAN_LARGE))
+            intercept = np.select(
+                [environment == self.SUBURBAN, environment == self.OPEN],
+                [urban - 2 * (log_f - np.log10(28.0)) ** 2 - 5.4,
+                 urban - 4.78 * log_f ** 2 + 18.33 * log_f - 40.94],
+                default=urban,
+            )
+            return intercept, 44.9 - 6.55 * log_hb
+
+
+class Cost231HataModel(LogDistanceModel):
+    """COST-231 Hata extension (1500-2000 MHz, 1-20 km, base 30-200 m, mobile 1-10 m)."""
+    name = "cost231"
+    label = "COST-231 Hata"
+    valid_freq_mhz = (1500.0, 2000.0)
+    parameters = {
+        "h_base_m": ModelParameter("Base Station Height (m)", 30.0, 1.0),
+        "h_mobile_m": ModelParameter("Mobile Height (m)", 1.5, 0.5),
+        "city_correction_db": ModelParameter("Environment", 0, choices={
+            "Suburban / medium city": 0, "Metropolitan center": 3,
+        }),
+    }
+
+    def terms(self, freq_mhz, n, **params):
+        p = self._params(params)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_f = np.log10(np.asarray(freq_mhz, dtype=float))
+            log_hb = np.log10(p["h_base_m"])
+            intercept = (46.3 + 33.9 * log_f - 13.82 * log_hb
+                         - _hata_mobile_correction(log_f, p["h_mobile_m"]) + p["city_correction_db"])
+            return intercept, 44.9 - 6.55 * log_hb
+
+
+class TwoRayModel(PropagationModel):
+    """Two-ray ground reflection: free space up to the crossover distance 4*pi*ht*hr/lambda,
+    then PL = 40log10(d_m) - 20log10(ht*hr). The two branches meet at the crossover."""
+    name = "two-ray"
+    label = "Two-Ray Ground Reflection"
+    parameters = {
+        "h_tx_m": ModelParameter("Tx Antenna Height (m)", 10.0, 1.0),
+        "h_rx_m": ModelParameter("Rx Antenna Height (m)", 2.0, 0.5),
+    }
+
+    def _terms(self, freq_mhz, params):
+        p = self._params(params)
+        freq_mhz = np.asarray(freq_mhz, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fspl_1km = 20 * np.log10(freq_mhz) + 32.44
+            height_gain = 20 * np.log10(p["h_tx_m"] * p["h_rx_m"])
+            wavelength_m = SPEED_OF_LIGHT_M_S / (freq_mhz * 1e6)
+            crossover_km = 4 * np.pi * p["h_tx_m"] * p["h_rx_m"] / wavelength_m / 1000
+        return fspl_1km, height_gain, crossover_km
+
+    def path_loss_db(self, distance_km, freq_mhz, n, **params):
+        fspl_1km, height_gain, crossover_km = self._terms(freq_mhz, params)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_d = np.log10(distance_km)
+            return np.where(distance_km <= crossover_km,
+                            fspl_1km + 20 * log_d,
+                            40 * (log_d + 3) - height_gain)
+
+    def distance_km(self, path_loss_db, freq_mhz, n, **params):
+        fspl_1km, height_gain, crossover_km = self._terms(freq_mhz, params)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            crossover_loss = fspl_1km + 20 * np.log10(crossover_km)
+            free_space = np.power(10.0, (path_loss_db - fspl_1km) / 20)
+            ground = np.power(10.0, (path_loss_db + height_gain) / 40 - 3)
+        return np.where(path_loss_db <= crossover_loss, free_space, ground)
+
+
+# name -> model instance, in registration order (the order sets the integer model codes)
+MODELS = {}
+# name -> integer code used for vectorized dispatch over mixed-model arrays
+MODEL_CODES = {}
+
+
+def register_model(model):
+    """Adds a model to the registry, making it available everywhere by name."""
+    if not model.name:
+        raise ValueError("Propagation models must have a name.")
+    if model.name not in MODELS:
+        MODEL_CODES[model.name] = len(MODEL_CODES)
+    MODELS[model.name] = model
+    return model
+
+
+def get_model(name):
+    try:
+        return MODELS[name]
+    except KeyError:
+        raise ValueError(f"Unknown propagation model '{name}'. Expected one of {tuple(MODELS)}.") from None
+
+
+def model_by_code(code):
+    return MODELS[list(MODEL_CODES)[code]]
+
+
+for _model in (ClassicModel(), LogDistance1mModel(), OkumuraHataModel(), Cost231HataModel(),
+               TwoRayModel(), IndoorP1238Model()):
+    register_model(_model)
@@ -0,0 +1,166 @@
+"""
+Monte Carlo fading and shadowing simulation for link availability.
+
+Instead of subtracting a fixed fade margin, the excess loss on top of the
+median path loss is drawn as a random variable:
+
+    X = S + F
+    S ~ Normal(0, sigma_dB)                  log-normal shadowing
+    F = -10log10(|h|^2)                      small-scale fading, E[|h|^2] = 1
+        h Rayleigh (K = 0) or Rician (K > 0)
+
+A link of allowable path loss PL_max at distance d is in outage when
+X > PL_max - PL(d). Because X does not depend on d, the trials are reduced to
+one fine-grained histogram of X that answers the outage probability at every
+distance, and the distance achieving a target availability comes from the
+closed-form model inversion at PL_max - quantile(X).
+
+Trials are generated in fixed-size chunks, each with its own child seed
+spawned from one SeedSequence, so a seeded run gives the same result
+regardless of chunk scheduling or the number of worker processes.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import core
+
+FADING_TYPES = ("none", "rayleigh", "rician")
+
+# Histogram of excess loss X: 0.01 dB bins, samples outside are clipped to the ends
+HISTOGRAM_MIN_DB = -100.0
+HISTOGRAM_MAX_DB = 100.0
+HISTOGRAM_BIN_DB = 0.01
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+class FadingModel(NamedTuple):
+    """Statistical description of the excess loss on top of the median path loss."""
+    shadowing_sigma_db: float = 8.0
+    fading: str = "rayleigh"
+    rician_k_db: float = 6.0
+
+
+def sample_excess_loss_db(rng, size, model):
+    """Draws `size` samples of shadowing plus fading loss (dB) for a FadingModel."""
+    if model.fading not in FADING_TYPES:
+        raise ValueError(f"Unknown fading type '{model.fading}'. Expected one of {FADING_TYPES}.")
+
+    loss_db = np.zeros(size)
+    if model.shadowing_sigma_db > 0:
+        loss_db += rng.normal(0.0, model.shadowing_sigma_db, size)
+
+    if model.fading != "none":
+        k = 10 ** (model.rician_k_db / 10) if model.fading == "rician" else 0.0
+        # h = sqrt(K/(K+1)) + sqrt(1/(2(K+1))) * (x + jy), normalized so E[|h|^2] = 1
+        los = math.sqrt(k / (k + 1))
+        scatter = math.sqrt(1 / (2 * (k + 1)))
+        in_phase = los + scatter * rng.standard_normal(size)
+        quadrature = scatter * rng.standard_normal(size)
+        power = in_phase * in_phase + quadrature * quadrature
+        loss_db -= 10 * np.log10(power)
+
+    return loss_db
+
+
+class LossDistribution:
+    """Empirical distribution of excess loss accumulated as a fixed-bin histogram."""
+
+    def __init__(self, counts=None):
+        n_bins = int(round((HISTOGRAM_MAX_DB - HISTOGRAM_MIN_DB) / HISTOGRAM_BIN_DB))
+        self.edges = HISTOGRAM_MIN_DB + HISTOGRAM_BIN_DB * np.arange(n_bins + 1)
+        self.counts = np.zeros(n_bins, dtype=np.int64) if counts is None else counts
+        self._cdf = None
+
+    @property
+    def trials(self):
+        return int(self.counts.sum())
+
+    def add_samples(self, loss_db):
+        """Adds a chunk of excess-loss samples to the histogram."""
+        idx = np.floor((loss_db - HISTOGRAM_MIN_DB) / HISTOGRAM_BIN_DB).astype(np.int64)
+        np.clip(idx, 0, len(self.counts) - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        self._cdf = None
+
+    def merge(self, other):
+        """Adds the counts of another LossDistribution (e.g. from a worker process)."""
+        self.counts += other.counts
+        self._cdf = None
+        return self
+
+    def _cumulative(self):
+        if self._cdf is None:
+            cdf = np.cumsum(self.counts) / max(self.trials, 1)
+            self._cdf = np.concatenate(([0.0], cdf))
+        return self._cdf
+
+    def outage_probability(self, margin_db):
+        """P(X > margin) for each link margin (dB); accepts arrays."""
+        return 1.0 - np.interp(margin_db, self.edges, self._cumulative())
+
+    def quantile(self, availability):
+        """Excess loss (dB) not exceeded with the given probability; accepts arrays.
+
+        Rounds up to the bin edge, so the result is conservative by at most
+        HISTOGRAM_BIN_DB.
+        """
+        idx = np.searchsorted(self._cumulative(), availability, side="left")
+        return self.edges[np.clip(idx, 0, len(self.edges) - 1)]
+
+
+def _simulate_chunk(args):
+    seed_sequence, size, model = args
+    distribution = LossDistribution()
+    distribution.add_samples(sample_excess_loss_db(np.random.default_rng(seed_sequence), size, model))
+    return distribution.counts
+
+
+def simulate_loss_distribution(model, trials, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    """Runs `trials` Monte Carlo draws of the FadingModel and returns a LossDistribution.
+
+    A fixed `seed` makes the run reproducible; `workers` > 1 spreads the chunks
+    over a process pool.
+    """
+    if trials <= 0:
+        raise ValueError("Number of trials must be positive.")
+    if model.fading not in FADING_TYPES:
+        raise ValueError(f"Unknown fading type '{model.fading}'. Expected one of {FADING_TYPES}.")
+
+    n_chunks = -(-trials // chunk_size)
+    sizes = [chunk_size] * (n_chunks - 1) + [trials - chunk_size * (n_chunks - 1)]
+    tasks = zip(np.random.SeedSequence(seed).spawn(n_chunks), sizes, [model] * n_chunks)
+
+    distribution = LossDistribution()
+    if workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for counts in executor.map(_simulate_chunk, tasks):
+                distribution.counts += counts
+    else:
+        for task in tasks:
+            distribution.counts += _simulate_chunk(task)
+    return distribution
+
+
+def link_margin_db(max_path_loss, freq_mhz, n, model_choice, distance_km, **model_params):
+    """Margin (dB) between the allowable and the median path loss at each distance."""
+    return (np.asarray(max_path_loss, dtype=float)
+            - core.path_loss_db(freq_mhz, n, model_choice, distance_km, **model_params))
+
+
+def availability(max_path_loss, freq_mhz, n, model_choice, distance_km, distribution, **model_params):
+    """Probability that the link closes at each distance (1 - outage probability)."""
+    margin = link_margin_db(max_path_loss, freq_mhz, n, model_choice, distance_km, **model_params)
+    return 1.0 - distribution.outage_probability(margin)
+
+
+def distance_for_availability(max_path_loss, freq_mhz, n, model_choice, target_availability, distribution,
+                              **model_params):
+    """Maximum distance at which the link closes with the target availability (e.g. 0.999)."""
+    required_margin = distribution.quantile(target_availability)
+    return core.distance_from_path_loss(
+        np.asarray(max_path_loss, dtype=float) - required_margin, freq_mhz, n, model_choice, **model_params)
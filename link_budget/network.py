@@ -0,0 +1,297 @@
+"""
+Mesh and network planning: every feasible link between a set of nodes.
+
+Each node has a position and its own radio (transmit power, antenna gain,
+cable loss and sensitivity); all nodes share the channel and propagation
+model. A link between two nodes is kept when both directions close:
+
+    margin(a -> b) = p_tx_a + g_a - l_a + g_b - l_b - l_fade - l_misc - PL(d) - sens_b
+    link margin    = min(margin(a -> b), margin(b -> a))
+
+Instead of testing all N^2 pairs, every node's maximum range (towards the
+best receiver in the network) is computed with the vectorized inverse
+models, nodes are hashed into grid buckets one maximum range wide, and only
+pairs in the same or adjacent buckets are evaluated, in bounded chunks.
+The result is a sparse edge list with margins, from which a CSR adjacency
+list and connectivity statistics are derived.
+
+How to Run:
+    python -m link_budget.network nodes.csv links.csv --freq-mhz 915 --model two-ray
+
+Node columns (missing optional columns take the default shown):
+    x_m, y_m, p_tx, p_rx_sensitivity     (required)
+    g_ant, l_cable                       (0.0)
+
+Requirements:
+- pyarrow (node and link files only)
+"""
+
+import argparse
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import core
+from link_budget.coverage import MIN_DISTANCE_M
+
+DEFAULT_CHUNK_PAIRS = 2_000_000
+
+NODE_COLUMNS = ("x_m", "y_m", "p_tx", "p_rx_sensitivity", "g_ant", "l_cable")
+NODE_DEFAULTS = {"g_ant": 0.0, "l_cable": 0.0}
+
+# Grid bucket (dx, dy) offsets covering every adjacent pair of buckets once
+_NEIGHBOUR_OFFSETS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+class ConnectivityStats(NamedTuple):
+    nodes: int
+    links: int
+    mean_degree: float
+    max_degree: int
+    isolated_nodes: int
+    components: int
+    largest_component: int
+
+    @property
+    def largest_fraction(self):
+        return self.largest_component / self.nodes if self.nodes else 0.0
+
+
+class NetworkResult(NamedTuple):
+    """Feasible links as a sparse edge list (source < target) plus each node's maximum range."""
+    source: np.ndarray
+    target: np.ndarray
+    distance_m: np.ndarray
+    margin_db: np.ndarray
+    range_m: np.ndarray
+
+    @property
+    def node_count(self):
+        return len(self.range_m)
+
+    def degree(self):
+        return np.bincount(np.concatenate((self.source, self.target)), minlength=self.node_count)
+
+    def adjacency(self):
+        """Symmetric adjacency list in CSR form: (indptr, neighbours, margin_db).
+
+        The neighbours of node i are neighbours[indptr[i]:indptr[i + 1]].
+        """
+        origin = np.concatenate((self.source, self.target))
+        order = np.argsort(origin, kind="stable")
+        indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origin, minlength=self.node_count), out=indptr[1:])
+        neighbours = np.concatenate((self.target, self.source))[order]
+        return indptr, neighbours, np.concatenate((self.margin_db, self.margin_db))[order]
+
+    def component_labels(self):
+        """Connected component of every node, labelled by its lowest node index."""
+        labels = np.arange(self.node_count)
+        while True:
+            # Hook each root onto the smallest root across its links, then flatten
+            low = np.minimum(labels[self.source], labels[self.target])
+            np.minimum.at(labels, labels[self.source], low)
+            np.minimum.at(labels, labels[self.target], low)
+            while True:
+                flattened = labels[labels]
+                if np.array_equal(flattened, labels):
+                    break
+                labels = flattened
+            if np.array_equal(labels[self.source], labels[self.target]):
+                return labels
+
+    def connectivity(self):
+        degree = self.degree()
+        sizes = np.bincount(self.component_labels(), minlength=self.node_count)
+        return ConnectivityStats(
+            nodes=self.node_count,
+            links=len(self.source),
+            mean_degree=float(degree.mean()) if self.node_count else 0.0,
+            max_degree=int(degree.max()) if self.node_count else 0,
+            isolated_nodes=int(np.count_nonzero(degree == 0)),
+            components=int(np.count_nonzero(sizes)),
+            largest_component=int(sizes.max()) if self.node_count else 0,
+        )
+
+
+def _candidate_pairs(x_m, y_m, bucket_m, chunk_pairs=DEFAULT_CHUNK_PAIRS):
+    """Yields (a, b) node index arrays for every pair in the same or adjacent grid buckets, each once."""
+    bx = np.floor((x_m - x_m.min()) / bucket_m).astype(np.int64)
+    # Shift by one so the dy = -1 neighbour never wraps into the previous column
+    by = np.floor((y_m - y_m.min()) / bucket_m).astype(np.int64) + 1
+    height = int(by.max()) + 2
+    keys = bx * height + by
+
+    order = np.argsort(keys, kind="stable")
+    buckets, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+    for dx, dy in _NEIGHBOUR_OFFSETS:
+        wanted = buckets + dx * height + dy
+        pos = np.minimum(np.searchsorted(buckets, wanted), len(buckets) - 1)
+        first = np.flatnonzero(buckets[pos] == wanted)
+        second = pos[first]
+        count_a, count_b = counts[first], counts[second]
+        ends = np.cumsum(count_a * count_b)
+        total = int(ends[-1]) if len(ends) else 0
+
+        # Walk the flattened pair space in chunks so memory stays bounded
+        # however many nodes share a bucket
+        for start in range(0, total, chunk_pairs):
+            flat = np.arange(start, min(start + chunk_pairs, total))
+            k = np.searchsorted(ends, flat, side="right")
+            local = flat - (ends[k] - count_a[k] * count_b[k])
+            i_a, i_b = np.divmod(local, count_b[k])
+            if dx == 0 and dy == 0:
+                keep = i_a < i_b
+                k, i_a, i_b = k[keep], i_a[keep], i_b[keep]
+            yield order[starts[first[k]] + i_a], order[starts[second[k]] + i_b]
+
+
+def find_links(x_m, y_m, p_tx, p_rx_sensitivity, freq_mhz, n, model_choice, g_ant=0.0, l_cable=0.0,
+               l_fade=0.0, l_misc=0.0, min_margin_db=0.0, chunk_pairs=DEFAULT_CHUNK_PAIRS, max_links=None,
+               **model_params):
+    """Finds every node pair whose link closes in both directions with at least min_margin_db to spare.
+
+    Positions are in meters; radio parameters may be scalars or one value per node.
+    Raises ValueError as soon as more than max_links links are found (no limit by default).
+    """
+    x_m = np.asarray(x_m, dtype=float)
+    y_m = np.asarray(y_m, dtype=float)
+    if x_m.shape != y_m.shape or x_m.ndim != 1:
+        raise ValueError("Node x and y coordinates must be 1-D arrays of the same length.")
+    if not (np.isfinite(x_m).all() and np.isfinite(y_m).all()):
+        raise ValueError("Node coordinates must be finite.")
+    count = len(x_m)
+    eirp = np.broadcast_to(np.asarray(p_tx, dtype=float) + g_ant - l_cable, (count,))
+    rx_gain = np.broadcast_to(np.asarray(g_ant, dtype=float) - l_cable, (count,))
+    sensitivity = np.broadcast_to(np.asarray(p_rx_sensitivity, dtype=float), (count,))
+    fixed_loss = l_fade + l_misc + min_margin_db
+
+    empty = np.empty(0, dtype=np.int64)
+    if count < 2:
+        return NetworkResult(empty, empty, np.empty(0), np.empty(0), np.zeros(count))
+
+    # Each node's reach towards the most capable receiver bounds every link it can be part of
+    best_receiver = float(np.nanmax(rx_gain - sensitivity))
+    reach = core.distance_from_path_loss(eirp + best_receiver - fixed_loss, freq_mhz, n, model_choice,
+                                         **model_params)
+    range_m = np.where(reach.feasible, reach.m, 0.0)
+    bucket_m = float(range_m.max())
+    if bucket_m <= 0:
+        return NetworkResult(empty, empty, np.empty(0), np.empty(0), range_m)
+
+    parts = []
+    found = 0
+    for a, b in _candidate_pairs(x_m, y_m, bucket_m, chunk_pairs):
+        distance = np.hypot(x_m[a] - x_m[b], y_m[a] - y_m[b])
+        close = distance <= np.minimum(range_m[a], range_m[b])
+        a, b, distance = a[close], b[close], distance[close]
+        path_loss = core.path_loss_db(freq_mhz, n, model_choice,
+                                      np.maximum(distance, MIN_DISTANCE_M) / core.M_PER_KM, **model_params)
+        forward = eirp[a] + rx_gain[b] - sensitivity[b]
+        reverse = eirp[b] + rx_gain[a] - sensitivity[a]
+        margin = np.minimum(forward, reverse) - fixed_loss - path_loss
+        ok = margin >= 0
+        parts.append((np.minimum(a[ok], b[ok]), np.maximum(a[ok], b[ok]), distance[ok], margin[ok] + min_margin_db))
+        found += len(parts[-1][0])
+        if max_links is not None and found > max_links:
+            raise ValueError(f"The network has more than {max_links:,} feasible links.")
+
+    if not parts:
+        return NetworkResult(empty, empty, np.empty(0), np.empty(0), range_m)
+    source, target, distance, margin = (np.concatenate(column) for column in zip(*parts))
+    order = np.lexsort((target, source))
+    return NetworkResult(source[order], target[order], distance[order], margin[order], range_m)
+
+
+def read_nodes(source, defaults=None):
+    """Reads a node CSV (path or file object) into {column: array}.
+
+    Columns absent from the file and empty cells take the value in `defaults`
+    (merged over NODE_DEFAULTS); any other missing column or empty cell is an
+    error.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    defaults = {**NODE_DEFAULTS, **(defaults or {})}
+    table = pa_csv.read_csv(source)
+    missing = [name for name in NODE_COLUMNS if name not in table.column_names and name not in defaults]
+    if missing:
+        raise ValueError(f"Node file is missing required column(s): {', '.join(missing)}")
+    nodes = {}
+    for name in NODE_COLUMNS:
+        if name not in table.column_names:
+            nodes[name] = defaults[name]
+            continue
+        try:
+            column = table.column(name).cast(pa.float64())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            raise ValueError("Node file columns must be numeric.") from None
+        if name in defaults:
+            column = column.fill_null(defaults[name])
+        elif column.null_count:
+            raise ValueError(f"Node file column '{name}' has {column.null_count} empty cell(s).")
+        nodes[name] = column.to_numpy()
+    return nodes
+
+
+def write_links(destination, result):
+    """Writes the edge list (to a path or file object) as CSV with columns source, target, distance_m, margin_db."""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    pa_csv.write_csv(pa.table({
+        "source": result.source,
+        "target": result.target,
+        "distance_m": result.distance_m,
+        "margin_db": result.margin_db,
+    }), destination)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m link_budget.network",
+        description="Find every feasible link between the nodes of a network.",
+    )
+    parser.add_argument("nodes", help="Node CSV (x_m, y_m, p_tx, p_rx_sensitivity[, g_ant, l_cable])")
+    parser.add_argument("output", help="Output CSV of links (source, target, distance_m, margin_db)")
+    parser.add_argument("--l-fade", type=float, default=0.0, help="Fade margin (dB)")
+    parser.add_argument("--l-misc", type=float, default=0.0, help="Misc. losses (dB)")
+    parser.add_argument("--min-margin", type=float, default=0.0, help="Minimum link margin to keep a link (dB)")
+    parser.add_argument("--freq-mhz", type=float, default=2400.0, help="Frequency (MHz)")
+    parser.add_argument("--n", type=float, default=2.0, help="Path loss exponent")
+    parser.add_argument("--model", choices=tuple(core.MODEL_CODES), default="1m", help="Path loss model")
+    parser.add_argument("--model-param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra propagation model input, e.g. h_tx_m=10 (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        model_params = {name: float(value) for name, value in (item.split("=", 1) for item in args.model_param)}
+    except ValueError:
+        parser.error("--model-param values must be NAME=NUMBER.")
+
+    try:
+        nodes = read_nodes(args.nodes)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    result = find_links(nodes["x_m"], nodes["y_m"], nodes["p_tx"], nodes["p_rx_sensitivity"], args.freq_mhz,
+                        args.n, args.model, nodes["g_ant"], nodes["l_cable"], args.l_fade, args.l_misc,
+                        args.min_margin, **model_params)
+    stats = result.connectivity()
+    elapsed = time.perf_counter() - start
+    write_links(args.output, result)
+
+    print(f"{stats.nodes:,} nodes, {stats.links:,} links in {elapsed:.2f} s; "
+          f"mean degree {stats.mean_degree:.1f} (max {stats.max_degree}), "
+          f"{stats.isolated_nodes:,} isolated, {stats.components:,} component(s), "
+          f"largest {stats.largest_component:,} ({stats.largest_fraction:.1%})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
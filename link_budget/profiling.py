@@ -0,0 +1,167 @@
+"""
+Opt-in per-stage timing of interactive reruns.
+
+Set LINK_BUDGET_PROFILE to enable: "1" writes one JSON line per rerun to
+stderr, any other value is taken as a file to append the lines to. When the
+variable is unset (or "0") every call below is a no-op.
+
+Each line holds the source ("app", "gui"), the total wall time and the time
+spent in each stage:
+    parse      reading and validating inputs
+    compute    link budget math
+    render     building figures
+    serialize  encoding charts and emitting them to the UI
+
+Example:
+    LINK_BUDGET_PROFILE=profile.jsonl streamlit run app.py
+
+The module can also be run to report cold-import times: each module is
+imported in a fresh interpreter and the whole import is timed, including its
+parent packages and everything it pulls in. It exits with status 1 if a
+module loads matplotlib, pandas or streamlit. This keeps the core, the CLIs
+and the worker processes starting without plotting libraries.
+
+How to Run:
+    python -m link_budget.profiling
+    python -m link_budget.profiling link_budget.coverage link_budget.network --repeat 5
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+ENV_VAR = "LINK_BUDGET_PROFILE"
+STAGES = ("parse", "compute", "render", "serialize")
+
+# Modules timed by default, and packages they should only load on demand
+IMPORT_TARGETS = ("link_budget", "link_budget.batch", "link_budget_calculator")
+HEAVY_PACKAGES = ("matplotlib", "pandas", "streamlit")
+
+
+def _destination():
+    value = os.environ.get(ENV_VAR, "").strip()
+    return None if value in ("", "0") else value
+
+
+class RerunProfiler:
+    """Accumulates wall time per stage over one rerun.
+
+    Time is attributed either with the stage() context manager or with lap(),
+    which charges everything since the previous lap that no stage() claimed.
+    """
+
+    def __init__(self, source, destination=None):
+        self.source = source
+        self.destination = destination if destination is not None else _destination()
+        self.timings = dict.fromkeys(STAGES, 0.0)
+        self._start = self._last_lap = time.perf_counter()
+        self._claimed = 0.0
+        self._depth = 0
+
+    @property
+    def enabled(self):
+        return self.destination is not None
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            # Nested stages are already covered by the outermost one
+            if self._depth == 0:
+                elapsed = time.perf_counter() - start
+                self.timings[name] += elapsed
+                self._claimed += elapsed
+
+    def stage(self, name):
+        """Context manager charging the enclosed block to one stage."""
+        return self._timed(name) if self.enabled else contextlib.nullcontext()
+
+    def lap(self, name):
+        """Charges the time since the previous lap, less any stage() blocks, to one stage."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.timings[name] += now - self._last_lap - self._claimed
+        self._last_lap = now
+        self._claimed = 0.0
+
+    def report(self):
+        """Writes this rerun's timings as one JSON line; returns the record (None when disabled)."""
+        if not self.enabled:
+            return None
+        record = {
+            "source": self.source,
+            "timestamp": time.time(),
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()},
+        }
+        line = json.dumps(record) + "\n"
+        if self.destination == "1":
+            sys.stderr.write(line)
+        else:
+            with open(self.destination, "a") as f:
+                f.write(line)
+        return record
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    ms: float
+    heavy: tuple    # HEAVY_PACKAGES loaded by the import
+
+
+def import_time(module, repeat=3):
+    """Cold import time of module, parent packages included, in a fresh interpreter (best of repeat runs)."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (root, os.environ.get("PYTHONPATH")))))
+    # Times the import statement itself, so whatever it loads (the parent
+    # package first of all) is counted, and lists the top-level packages it added
+    code = ("import sys, time\n"
+            "before = set(sys.modules)\n"
+            "start = time.perf_counter()\n"
+            f"import {module}\n"
+            "print(time.perf_counter() - start)\n"
+            "print(' '.join({name.split('.')[0] for name in set(sys.modules) - before}))\n")
+    best = None
+    for _ in range(max(repeat, 1)):
+        stdout = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+        seconds, loaded = stdout.splitlines()[-2:]
+        best = float(seconds) if best is None else min(best, float(seconds))
+    loaded = set(loaded.split())
+    return ImportTiming(module, best * 1000, tuple(name for name in HEAVY_PACKAGES if name in loaded))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m link_budget.profiling",
+        description="Cold-import times of the package modules; exits 1 if one loads a plotting/UI package.",
+    )
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_TARGETS), help="Modules to time")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is reported")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for module in args.modules:
+        try:
+            timing = import_time(module, args.repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"{module}: import failed\n{e.stderr.strip().splitlines()[-1]}", file=sys.stderr)
+            status = 1
+            continue
+        note = f"  (loads {', '.join(timing.heavy)})" if timing.heavy else ""
+        print(f"{timing.module:<28}{timing.ms:9.1f} ms{note}")
+        status = status or int(bool(timing.heavy))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""
+Persistent scenario store: named, tagged link scenarios in a local SQLite file.
+
+A scenario is one set of link budget inputs (the same fields as a batch file
+row, see link_budget.batch) plus the selected model's parameters. Inputs are
+canonicalized (defaults filled in, floats rounded, keys sorted) and hashed, and
+computed results are stored once per hash, so repeated queries, identical
+scenarios under different names and shared links are served from the index
+instead of being recomputed.
+
+How to Run:
+    python -m link_budget.scenarios scenarios.db import scenarios.csv
+    python -m link_budget.scenarios scenarios.db list --tag rooftop
+    python -m link_budget.scenarios scenarios.db show "Site A to B"
+    python -m link_budget.scenarios scenarios.db export backup.json
+
+Import/export files are CSV (name, tags separated by ";", then the input
+columns, so an export is also a valid batch file) or JSON (a list of
+{"name", "tags", "inputs"} objects), chosen by file extension.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import atmosphere, core, models
+from link_budget.cache import KEY_DECIMALS
+
+# Default database file, overridable with LINK_BUDGET_DB
+DEFAULT_PATH = "scenarios.db"
+
+# Bumped whenever the stored results would change for the same inputs
+HASH_VERSION = 1
+
+INPUT_FIELDS = ("p_tx", "g_tx", "l_tx", "freq_mhz", "g_rx", "l_rx", "l_fade", "l_misc", "p_rx_sensitivity", "n", "model")
+RESULT_FIELDS = ("max_path_loss", "distance_km", "distance_m", "distance_mi", "distance_ft", "feasible")
+
+# SQLite's default limit on host parameters per statement is 999
+_QUERY_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    inputs TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenarios_hash ON scenarios (input_hash);
+CREATE TABLE IF NOT EXISTS scenario_tags (
+    scenario_id INTEGER NOT NULL REFERENCES scenarios (id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (scenario_id, tag)
+);
+CREATE INDEX IF NOT EXISTS scenario_tags_tag ON scenario_tags (tag);
+CREATE TABLE IF NOT EXISTS results (
+    input_hash TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    computed_at REAL NOT NULL
+);
+"""
+
+
+class Scenario(NamedTuple):
+    name: str
+    tags: tuple
+    inputs: dict
+    input_hash: str
+    created_at: float
+    updated_at: float
+
+
+def canonical_inputs(inputs):
+    """Returns the inputs with defaults filled in, unused model parameters dropped and floats rounded.
+
+    Atmospheric inputs are kept (all of them, defaults filled in) when any is given.
+
+    Raises ValueError for missing required fields, non-numeric values or an unknown model.
+    """
+    missing = [name for name in core.REQUIRED_INPUTS if inputs.get(name) is None]
+    if missing:
+        raise ValueError(f"Scenario is missing required input(s): {', '.join(missing)}")
+    model = models.get_model(inputs.get("model") or core.DEFAULT_INPUTS["model"])
+
+    canonical = {"model": model.name}
+    numeric = [(name, core.DEFAULT_INPUTS.get(name)) for name in INPUT_FIELDS if name != "model"]
+    numeric += [(name, spec.default) for name, spec in model.parameters.items()]
+    if any(inputs.get(name) not in (None, "") for name in atmosphere.PARAMETERS):
+        numeric += [(name, spec.default) for name, spec in atmosphere.PARAMETERS.items()]
+    for name, default in numeric:
+        value = inputs.get(name)
+        try:
+            value = float(default if value is None or value == "" else value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Scenario input '{name}' must be numeric") from None
+        canonical[name] = round(value, KEY_DECIMALS) + 0.0
+    return canonical
+
+
+def input_hash(inputs):
+    """Content hash of the canonical inputs; equal for scenarios that compute the same result."""
+    payload = json.dumps([HASH_VERSION, canonical_inputs(inputs)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def evaluate(canonical_list):
+    """Computes results for a list of canonical input dicts in one vectorized core call.
+
+    Scenarios with and without atmospheric inputs are evaluated separately, since
+    a missing atmospheric input means no attenuation rather than its default.
+    """
+    if not canonical_list:
+        return []
+    with_atmosphere = [any(name in inputs for name in atmosphere.PARAMETERS) for inputs in canonical_list]
+    if any(with_atmosphere) and not all(with_atmosphere):
+        results = {}
+        for flag in (False, True):
+            indices = [i for i, has in enumerate(with_atmosphere) if has == flag]
+            results.update(zip(indices, evaluate([canonical_list[i] for i in indices])))
+        return [results[i] for i in range(len(canonical_list))]
+    columns = {name: np.array([inputs[name] for inputs in canonical_list]) for name in INPUT_FIELDS}
+    model_params = {
+        name: np.array([inputs.get(name, default) for inputs in canonical_list])
+        for name, default in core.model_parameter_defaults().items()
+        if any(name in inputs for inputs in canonical_list)
+    }
+    max_pl = core.max_path_loss(*(columns[name] for name in (
+        "p_tx", "g_tx", "l_tx", "g_rx", "l_rx", "l_fade", "l_misc", "p_rx_sensitivity")))
+    distances = core.distance_from_path_loss(max_pl, columns["freq_mhz"], columns["n"],
+                                             core.model_codes(columns["model"]), **model_params)
+    values = [np.broadcast_to(column, max_pl.shape).tolist() for column in (max_pl, *distances)]
+    return [dict(zip(RESULT_FIELDS, row)) for row in zip(*values)]
+
+
+class ScenarioStore:
+    """SQLite-backed scenario store with results memoized by input hash. Thread-safe."""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("LINK_BUDGET_DB", DEFAULT_PATH)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _scenarios(self, where="", params=()):
+        rows = self._conn.execute(
+            "SELECT s.id, s.name, s.inputs, s.input_hash, s.created_at, s.updated_at, "
+            "COALESCE((SELECT group_concat(tag, ';') FROM scenario_tags t WHERE t.scenario_id = s.id), '') "
+            f"FROM scenarios s {where} ORDER BY s.name", params).fetchall()
+        return [Scenario(name, tuple(sorted(filter(None, tags.split(";")))), json.loads(inputs), digest, created, updated)
+                for _, name, inputs, digest, created, updated, tags in rows]
+
+    def _write(self, records, overwrite):
+        """Inserts (name, tags, canonical inputs) records inside the current transaction."""
+        now = time.time()
+        for name, tags, canonical in records:
+            if not name:
+                raise ValueError("Scenario name must not be empty")
+            payload = json.dumps(canonical, sort_keys=True)
+            digest = input_hash(canonical)
+            existing = self._conn.execute("SELECT id FROM scenarios WHERE name = ?", (name,)).fetchone()
+            if existing and not overwrite:
+                raise ValueError(f"Scenario '{name}' already exists")
+            if existing:
+                scenario_id = existing[0]
+                self._conn.execute("UPDATE scenarios SET inputs = ?, input_hash = ?, updated_at = ? WHERE id = ?",
+                                   (payload, digest, now, scenario_id))
+                self._conn.execute("DELETE FROM scenario_tags WHERE scenario_id = ?", (scenario_id,))
+            else:
+                scenario_id = self._conn.execute(
+                    "INSERT INTO scenarios (name, inputs, input_hash, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (name, payload, digest, now, now)).lastrowid
+            self._conn.executemany("INSERT OR IGNORE INTO scenario_tags (scenario_id, tag) VALUES (?, ?)",
+                                   [(scenario_id, tag) for tag in _clean_tags(tags)])
+
+    def save(self, name, inputs, tags=(), overwrite=True):
+        """Saves (or replaces) a named scenario and returns it."""
+        canonical = canonical_inputs(inputs)
+        with self._lock, self._conn:
+            self._write([(name.strip(), tags, canonical)], overwrite)
+            return self._scenarios("WHERE s.name = ?", (name.strip(),))[0]
+
+    def get(self, name):
+        """Returns the named scenario, or None."""
+        with self._lock:
+            found = self._scenarios("WHERE s.name = ?", (name,))
+        return found[0] if found else None
+
+    def delete(self, name):
+        """Deletes the named scenario; returns whether it existed. Memoized results are kept."""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM scenarios WHERE name = ?", (name,)).rowcount > 0
+
+    def find(self, tag=None, name_like=None, model=None, input_hash=None):
+        """Returns scenarios matching every given filter (name_like is a SQL LIKE pattern), sorted by name."""
+        clauses, params = [], []
+        if tag:
+            clauses.append("s.id IN (SELECT scenario_id FROM scenario_tags WHERE tag = ?)")
+            params.append(tag.strip())
+        if name_like:
+            clauses.append("s.name LIKE ?")
+            params.append(name_like)
+        if model:
+            clauses.append("json_extract(s.inputs, '$.model') = ?")
+            params.append(model)
+        if input_hash:
+            clauses.append("s.input_hash = ?")
+            params.append(input_hash)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._scenarios(where, params)
+
+    def names(self, tag=None):
+        """Returns scenario names (optionally only those with a tag), sorted."""
+        with self._lock:
+            if tag:
+                rows = self._conn.execute(
+                    "SELECT name FROM scenarios WHERE id IN (SELECT scenario_id FROM scenario_tags WHERE tag = ?) "
+                    "ORDER BY name", (tag,))
+            else:
+                rows = self._conn.execute("SELECT name FROM scenarios ORDER BY name")
+            return [name for name, in rows]
+
+    def tags(self):
+        """Returns every tag in use, sorted."""
+        with self._lock:
+            return [tag for tag, in self._conn.execute("SELECT DISTINCT tag FROM scenario_tags ORDER BY tag")]
+
+    def results(self, inputs_list):
+        """Results for many input dicts: memoized ones come from the index, the rest are computed together."""
+        canonical = [canonical_inputs(inputs) for inputs in inputs_list]
+        digests = [input_hash(inputs) for inputs in canonical]
+        with self._lock:
+            found = {}
+            unique = list(dict.fromkeys(digests))
+            for start in range(0, len(unique), _QUERY_BATCH):
+                part = unique[start:start + _QUERY_BATCH]
+                found.update(self._conn.execute(
+                    f"SELECT input_hash, result FROM results WHERE input_hash IN ({', '.join('?' * len(part))})",
+                    part).fetchall())
+            found = {digest: json.loads(result) for digest, result in found.items()}
+
+            pending = {digest: inputs for digest, inputs in zip(digests, canonical) if digest not in found}
+            self.hits += len(digests) - sum(digest in pending for digest in digests)
+            self.misses += sum(digest in pending for digest in digests)
+            if pending:
+                computed = dict(zip(pending, evaluate(list(pending.values()))))
+                now = time.time()
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO results (input_hash, result, computed_at) VALUES (?, ?, ?)",
+                        [(digest, json.dumps(result), now) for digest, result in computed.items()])
+                found.update(computed)
+        return [found[digest] for digest in digests]
+
+    def result(self, inputs):
+        """Memoized result for one input dict (see results)."""
+        return self.results([inputs])[0]
+
+    def import_scenarios(self, records, overwrite=True):
+        """Saves many {"name", "tags", "inputs"} records in one transaction; returns the count.
+
+        Nothing is saved if any record is invalid.
+        """
+        prepared = [(str(record["name"]).strip(), record.get("tags") or (), canonical_inputs(record["inputs"]))
+                    for record in records]
+        with self._lock, self._conn:
+            self._write(prepared, overwrite)
+        return len(prepared)
+
+    def export_scenarios(self, **filters):
+        """Returns {"name", "tags", "inputs"} records for the scenarios matching find(**filters)."""
+        return [{"name": s.name, "tags": list(s.tags), "inputs": s.inputs} for s in self.find(**filters)]
+
+
+def _clean_tags(tags):
+    if isinstance(tags, str):
+        tags = tags.replace(",", ";").split(";")
+    return sorted({tag.strip() for tag in tags if tag and tag.strip()})
+
+
+def _file_format(path, override=None):
+    """Returns "csv" or "json" from an explicit override or the file extension."""
+    if override:
+        return override
+    return "json" if str(path).lower().endswith(".json") else "csv"
+
+
+def read_records(source, file_format=None):
+    """Reads scenario records from a CSV or JSON file path or text file object."""
+    if isinstance(source, str):
+        with open(source, newline="") as f:
+            return read_records(f, _file_format(source, file_format))
+    if _file_format("", file_format) == "json":
+        return json.load(source)
+    return [
+        {"name": row.pop("name", None), "tags": row.pop("tags", None) or (),
+         "inputs": {key: value for key, value in row.items() if value not in ("", None)}}
+        for row in csv.DictReader(source)
+    ]
+
+
+def write_records(destination, records, file_format=None):
+    """Writes scenario records to a CSV (one input column per field) or JSON file path or text file object."""
+    if isinstance(destination, str):
+        with open(destination, "w", newline="") as f:
+            return write_records(f, records, _file_format(destination, file_format))
+    if _file_format("", file_format) == "json":
+        json.dump(records, destination, indent=2)
+        return
+    extra = sorted({name for record in records for name in record["inputs"]} - set(INPUT_FIELDS))
+    writer = csv.DictWriter(destination, fieldnames=["name", "tags", *INPUT_FIELDS, *extra])
+    writer.writeheader()
+    for record in records:
+        writer.writerow({"name": record["name"], "tags": ";".join(record["tags"]), **record["inputs"]})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m link_budget.scenarios",
+                                     description="Manage a local store of link scenarios.")
+    parser.add_argument("database", help="SQLite database file (created if missing)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_cmd = commands.add_parser("list", help="List scenarios with their (memoized) maximum distance")
+    list_cmd.add_argument("--tag", help="Only scenarios with this tag")
+    list_cmd.add_argument("--name", help="SQL LIKE pattern on the scenario name, e.g. 'Site%%'")
+    list_cmd.add_argument("--model", help="Only scenarios using this model")
+    show_cmd = commands.add_parser("show", help="Show one scenario's inputs and result")
+    show_cmd.add_argument("name")
+    delete_cmd = commands.add_parser("delete", help="Delete a scenario")
+    delete_cmd.add_argument("name")
+    import_cmd = commands.add_parser("import", help="Import scenarios from a CSV or JSON file")
+    import_cmd.add_argument("file")
+    import_cmd.add_argument("--no-overwrite", action="store_true", help="Fail instead of replacing existing names")
+    export_cmd = commands.add_parser("export", help="Export scenarios to a CSV or JSON file")
+    export_cmd.add_argument("file")
+    export_cmd.add_argument("--tag", help="Only scenarios with this tag")
+    args = parser.parse_args(argv)
+
+    with ScenarioStore(args.database) as store:
+        try:
+            if args.command == "list":
+                scenarios = store.find(tag=args.tag, name_like=args.name, model=args.model)
+                for scenario, result in zip(scenarios, store.results([s.inputs for s in scenarios])):
+                    distance = f"{result['distance_km']:.3f} km" if result["feasible"] else "not feasible"
+                    print(f"{scenario.name}\t{';'.join(scenario.tags)}\t{scenario.inputs['model']}\t{distance}")
+            elif args.command == "show":
+                scenario = store.get(args.name)
+                if scenario is None:
+                    parser.error(f"No scenario named '{args.name}'")
+                print(json.dumps({"name": scenario.name, "tags": list(scenario.tags), "inputs": scenario.inputs,
+                                  "result": store.result(scenario.inputs)}, indent=2))
+            elif args.command == "delete":
+                if not store.delete(args.name):
+                    parser.error(f"No scenario named '{args.name}'")
+            elif args.command == "import":
+                start = time.perf_counter()
+                count = store.import_scenarios(read_records(args.file), overwrite=not args.no_overwrite)
+                print(f"Imported {count:,} scenarios in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+            elif args.command == "export":
+                records = store.export_scenarios(tag=args.tag)
+                write_records(args.file, records)
+                print(f"Exported {len(records):,} scenarios", file=sys.stderr)
+        except (ValueError, KeyError) as e:
+            parser.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
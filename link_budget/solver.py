@@ -0,0 +1,48 @@
+"""
+Design solver: the link parameters required to reach a target distance.
+
+This runs the link budget backwards. The path loss at the target distance is
+computed with the forward model, and its difference from the allowable path
+loss (the shortfall) is exactly how much Tx power, antenna gain or receiver
+sensitivity must change, because all of those enter the budget linearly in
+dB. The maximum tolerable path loss exponent comes from the model's inverse
+for n (closed form for the reference-distance models; NaN for models that do
+not use an exponent). Every function accepts arrays, so many target distances (and
+parameter sets) are solved in one vectorized call.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import core
+
+
+class DesignResult(NamedTuple):
+    """Requirements for each target distance, with the other parameters held at their given values."""
+    required_path_loss_db: np.ndarray   # path loss at the target distance
+    shortfall_db: np.ndarray            # required minus allowable path loss (<= 0 means the link already closes)
+    tx_power_dbm: np.ndarray            # minimum transmit power
+    sensitivity_dbm: np.ndarray         # receiver sensitivity needed (the link closes at or below this)
+    tx_gain_dbi: np.ndarray             # minimum transmit antenna gain (equally, receive antenna gain)
+    max_exponent: np.ndarray            # largest path loss exponent that still reaches the target
+
+
+def design(target_km, p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity, freq_mhz, n, model_choice,
+           **model_params):
+    """Solves for every design requirement at once for arrays of target distances (km)."""
+    target_km = np.asarray(target_km, dtype=float)
+    max_pl = core.max_path_loss(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required = core.path_loss_db(freq_mhz, n, model_choice, np.where(target_km > 0, target_km, np.nan),
+                                    **model_params)
+    shortfall = required - max_pl
+
+    return DesignResult(
+        required_path_loss_db=required,
+        shortfall_db=shortfall,
+        tx_power_dbm=p_tx + shortfall,
+        sensitivity_dbm=p_rx_sensitivity - shortfall,
+        tx_gain_dbi=g_tx + shortfall,
+        max_exponent=core.exponent_from_path_loss(max_pl, freq_mhz, model_choice, target_km, **model_params),
+    )
@@ -0,0 +1,174 @@
+"""
+N-dimensional parameter sweeps and sensitivity analysis of maximum distance.
+
+Any subset of the link budget inputs can be given as a range. Each swept
+parameter becomes one axis of a Cartesian grid, and the whole grid is
+evaluated by NumPy broadcasting in a single call to the vectorized core.
+Grids with more than `max_cells` points are evaluated lazily in slabs along
+the first axis, so reductions over very large grids never hold the full
+result in memory.
+
+Sensitivity is reported two ways:
+  * tornado - distance at the low/high end of each parameter, others at base
+  * main effects - share of the variance of log10(distance) over the full
+    grid explained by each parameter alone (first-order variance share);
+    the remainder is due to interactions, mainly with the exponent n
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import core
+
+SWEEP_PARAMETERS = (
+    "p_tx", "g_tx", "l_tx", "freq_mhz", "g_rx", "l_rx",
+    "l_fade", "l_misc", "p_rx_sensitivity", "n",
+)
+
+DEFAULT_MAX_CELLS = 16_000_000
+
+
+class SweepResult(NamedTuple):
+    """Maximum distance (km, NaN where infeasible) over the grid spanned by `values`."""
+    names: tuple
+    values: tuple
+    distance_km: np.ndarray
+
+
+class TornadoBar(NamedTuple):
+    name: str
+    low_value: float
+    high_value: float
+    low_distance_km: float
+    high_distance_km: float
+
+    @property
+    def swing_km(self):
+        return abs(self.high_distance_km - self.low_distance_km)
+
+
+class ParameterSensitivity(NamedTuple):
+    name: str
+    variance_share: float          # first-order share of var(log10 distance)
+    min_effect_km: float           # distance at the worst value, averaged over other axes (geometric)
+    max_effect_km: float           # distance at the best value, averaged over other axes (geometric)
+
+
+def _check_names(names):
+    unknown = [name for name in names if name not in SWEEP_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown sweep parameter(s): {', '.join(unknown)}")
+
+
+def _grid_distance(base, ranges, model_choice, axis0_slice=slice(None), model_params=None):
+    """Evaluates the grid (or a slab of it along the first axis) by broadcasting."""
+    names = list(ranges)
+    ndim = len(names)
+    inputs = dict(base)
+    for axis, name in enumerate(names):
+        values = np.asarray(ranges[name], dtype=float)
+        if axis == 0:
+            values = values[axis0_slice]
+        shape = [1] * ndim
+        shape[axis] = len(values)
+        inputs[name] = values.reshape(shape)
+    return core.link_distances(model_choice=model_choice, **inputs, **(model_params or {})).km
+
+
+def _grid_shape(ranges):
+    return tuple(len(np.atleast_1d(values)) for values in ranges.values())
+
+
+def iter_grid(base, ranges, model_choice, max_cells=DEFAULT_MAX_CELLS, model_params=None):
+    """Yields (axis-0 slice, distance_km slab) covering the grid with slabs of at most max_cells."""
+    _check_names(ranges)
+    shape = _grid_shape(ranges)
+    if not shape:
+        yield slice(None), _grid_distance(base, ranges, model_choice, model_params=model_params)
+        return
+    cells_per_row = int(np.prod(shape[1:], dtype=np.int64))
+    rows_per_slab = max(1, max_cells // max(cells_per_row, 1))
+    for start in range(0, shape[0], rows_per_slab):
+        part = slice(start, min(start + rows_per_slab, shape[0]))
+        yield part, np.broadcast_to(_grid_distance(base, ranges, model_choice, part, model_params),
+                                    (part.stop - part.start,) + shape[1:])
+
+
+def evaluate_grid(base, ranges, model_choice, max_cells=DEFAULT_MAX_CELLS, model_params=None):
+    """Evaluates the full Cartesian grid of `ranges` in memory.
+
+    `base` holds a value for every SWEEP_PARAMETERS entry; swept parameters
+    override it. `model_params` holds the propagation model's extra inputs.
+    Raises ValueError if the grid exceeds max_cells; use iter_grid or
+    sensitivity() for larger grids.
+    """
+    _check_names(ranges)
+    shape = _grid_shape(ranges)
+    if int(np.prod(shape, dtype=np.int64)) > max_cells:
+        raise ValueError(f"Grid of {shape} exceeds {max_cells:,} cells; evaluate it in slabs with iter_grid().")
+    distance = np.broadcast_to(_grid_distance(base, ranges, model_choice, model_params=model_params), shape)
+    return SweepResult(tuple(ranges), tuple(np.asarray(v, dtype=float) for v in ranges.values()), distance)
+
+
+def tornado(base, spans, model_choice, model_params=None):
+    """Distance at the (low, high) value of each parameter in `spans`, sorted by swing (largest first)."""
+    _check_names(spans)
+    bars = []
+    for name, (low, high) in spans.items():
+        distances = _grid_distance(base, {name: [low, high]}, model_choice, model_params=model_params)
+        bars.append(TornadoBar(name, float(low), float(high), float(distances[0]), float(distances[1])))
+    # Infeasible ends (NaN) count as the largest swing
+    return sorted(bars, key=lambda bar: -np.nan_to_num(bar.swing_km, nan=np.inf))
+
+
+def sensitivity(base, ranges, model_choice, max_cells=DEFAULT_MAX_CELLS, model_params=None):
+    """Ranks swept parameters by the share of log-distance variance each explains alone.
+
+    Main effects are accumulated slab by slab, so grids too large for memory
+    are supported. Infeasible grid points are excluded.
+    """
+    _check_names(ranges)
+    names = list(ranges)
+    shape = _grid_shape(ranges)
+    sums = [np.zeros(size) for size in shape]
+    counts = [np.zeros(size) for size in shape]
+    total_sum = total_sq = total_count = 0.0
+
+    for part, slab in iter_grid(base, ranges, model_choice, max_cells, model_params):
+        log_d = np.log10(slab)
+        valid = np.isfinite(log_d)
+        log_d = np.where(valid, log_d, 0.0)
+        total_sum += log_d.sum()
+        total_sq += (log_d * log_d).sum()
+        total_count += valid.sum()
+        for axis in range(len(shape)):
+            other = tuple(a for a in range(len(shape)) if a != axis)
+            axis_sum = log_d.sum(axis=other)
+            axis_count = valid.sum(axis=other)
+            if axis == 0:
+                sums[0][part] += axis_sum
+                counts[0][part] += axis_count
+            else:
+                sums[axis] += axis_sum
+                counts[axis] += axis_count
+
+    if total_count == 0:
+        return [ParameterSensitivity(name, np.nan, np.nan, np.nan) for name in names]
+
+    mean = total_sum / total_count
+    variance = max(total_sq / total_count - mean * mean, 0.0)
+    results = []
+    for name, axis_sum, axis_count in zip(names, sums, counts):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            effect = axis_sum / axis_count
+        weights = axis_count / total_count
+        ok = axis_count > 0
+        effect_var = float(np.sum(weights[ok] * (effect[ok] - mean) ** 2))
+        share = effect_var / variance if variance > 0 else 0.0
+        results.append(ParameterSensitivity(
+            name, share,
+            float(10 ** np.min(effect[ok])) if ok.any() else np.nan,
+            float(10 ** np.max(effect[ok])) if ok.any() else np.nan,
+        ))
+    return sorted(results, key=lambda s: -s.variance_share)
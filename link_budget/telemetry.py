@@ -0,0 +1,328 @@
+"""
+Streaming RSSI telemetry: online fit of the path loss exponent.
+
+Field measurements (distance, received signal strength, frequency) are
+turned into measured path loss with the known transmitter and receiver
+terms of the link budget, and fitted against a reference-distance model
+(the 1 m / 1 km log-distance models, ITU-R P.1238, ...):
+
+    PL_meas  = p_tx + g_tx - l_tx + g_rx - l_rx - rssi
+    PL_meas - PL_ref(f) = offset + n * 10log10(d / d_ref)
+
+The slope n is the path loss exponent; the offset is the loss at the
+reference distance beyond the model's (0 dB when the model is exact), which
+the calculator can carry as a misc. loss. Atmospheric inputs (see
+link_budget.atmosphere) are taken off the measured loss before the fit. The
+fit keeps only running means and co-moments, merged per batch with the
+parallel update of Chan et al., so logs of any size (or an endless stdin
+stream) are fitted in constant memory and the estimate is available after
+every batch. Confidence intervals use Student's t with n - 2 degrees of
+freedom.
+
+A fixed-size uniform sample of the measurements is kept alongside for
+plotting.
+
+How to Run:
+    python -m link_budget.telemetry drive_test.csv --p-tx 20 --model 1m
+    tail -f rssi.log | python -m link_budget.telemetry - --p-tx 14 --freq-mhz 868 --block-kb 4
+
+Measurement columns (missing optional columns take the default shown):
+    distance_m, rssi_dbm     (required)
+    freq_mhz                 (--freq-mhz)
+
+Requirements:
+- pyarrow (measurement files only)
+"""
+
+import argparse
+import math
+import statistics
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import atmosphere, core, models
+
+MEASUREMENT_COLUMNS = ("distance_m", "rssi_dbm")
+DEFAULT_BLOCK_KB = 1024
+DEFAULT_SAMPLE_SIZE = 2000
+DEFAULT_CONFIDENCE = 0.95
+
+
+# Below this many degrees of freedom the series is too coarse and the exact
+# distribution function is inverted instead
+EXACT_T_DOF = 5
+
+
+def _t_central_probability(theta, dof):
+    """P(|T| < sqrt(dof) * tan(theta)) for an integer dof (Abramowitz & Stegun 26.7.3-4)."""
+    cos2 = math.cos(theta) ** 2
+    term = total = 1.0
+    if dof % 2:
+        for k in range(1, (dof - 1) // 2):
+            term *= 2 * k / (2 * k + 1) * cos2
+            total += term
+        return 2 / math.pi * (theta + (math.sin(theta) * math.cos(theta) * total if dof > 1 else 0.0))
+    for k in range(1, dof // 2):
+        term *= (2 * k - 1) / (2 * k) * cos2
+        total += term
+    return math.sin(theta) * total
+
+
+def _exact_t_quantile(probability, dof):
+    if probability < 0.5:
+        return -_exact_t_quantile(1 - probability, dof)
+    lo, hi = 0.0, math.pi / 2
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if _t_central_probability(mid, dof) < 2 * probability - 1:
+            lo = mid
+        else:
+            hi = mid
+    return math.sqrt(dof) * math.tan((lo + hi) / 2)
+
+
+def t_quantile(probability, dof):
+    """Student's t quantile from the normal one (Cornish-Fisher series; exact as dof grows).
+
+    Within 0.3% of the exact value from 5 degrees of freedom up at the usual
+    confidence levels; fewer (integer) degrees of freedom use the exact
+    distribution.
+    """
+    if dof < EXACT_T_DOF and float(dof).is_integer():
+        return _exact_t_quantile(probability, int(dof))
+    z = statistics.NormalDist().inv_cdf(probability)
+    if math.isinf(dof):
+        return z
+    v = float(dof)
+    return (z + (z ** 3 + z) / (4 * v)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3)
+            + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * v ** 4))
+
+
+class FitResult(NamedTuple):
+    """Fitted exponent and reference offset with (low, high) confidence intervals."""
+    n: float
+    n_interval: tuple
+    offset_db: float
+    offset_interval: tuple
+    rmse_db: float
+    r_squared: float
+    count: int
+    skipped: int
+    confidence: float
+
+
+class ExponentFit:
+    """Incremental least-squares fit of n and the reference offset for one model.
+
+    Feed measurement batches to update(); result() is valid at any point once
+    three or more measurements spanning more than one distance were seen.
+    """
+
+    def __init__(self, model_choice="1m", sample_size=DEFAULT_SAMPLE_SIZE, seed=0, **model_params):
+        self.model = models.get_model(model_choice)
+        if not isinstance(self.model, models.ReferenceDistanceModel):
+            raise ValueError(f"{self.model.label} has no path loss exponent to fit.")
+        self.model_params, self.atmospheric = atmosphere.split_parameters(model_params)
+        self.count = 0
+        self.skipped = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+        self.syy = 0.0
+        # Uniform sample: the sample_size measurements with the smallest random keys
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+        self._sample_keys = np.empty(0)
+        self.sample_distance_m = np.empty(0)
+        self.sample_path_loss_db = np.empty(0)
+
+    def update(self, distance_m, rssi_dbm, freq_mhz, p_tx, g_tx=0.0, l_tx=0.0, g_rx=0.0, l_rx=0.0):
+        """Adds a batch of measurements; rows with missing or non-positive values are skipped."""
+        distance_m, rssi_dbm, freq_mhz = np.broadcast_arrays(
+            np.asarray(distance_m, dtype=float), np.asarray(rssi_dbm, dtype=float), np.asarray(freq_mhz, dtype=float))
+        path_loss = np.asarray(p_tx, dtype=float) + g_tx - l_tx + g_rx - l_rx - rssi_dbm
+        valid = (distance_m > 0) & (freq_mhz > 0) & np.isfinite(path_loss)
+        self.skipped += int(valid.size - np.count_nonzero(valid))
+        distance_m, freq_mhz, path_loss = distance_m[valid], freq_mhz[valid], path_loss[valid]
+        if not len(distance_m):
+            return self
+
+        x = 10 * np.log10(distance_m / (core.M_PER_KM * self.model.reference_km))
+        y = path_loss - self.model.reference_loss_db(freq_mhz, **self.model_params)
+        if self.atmospheric:
+            y = y - atmosphere.attenuation_db(distance_m / core.M_PER_KM, freq_mhz, **self.atmospheric)
+        self._merge(len(x), x.mean(), y.mean(), *self._comoments(x, y))
+        self._update_sample(distance_m, path_loss)
+        return self
+
+    @staticmethod
+    def _comoments(x, y):
+        dx = x - x.mean()
+        dy = y - y.mean()
+        return float(dx @ dx), float(dx @ dy), float(dy @ dy)
+
+    def _merge(self, count, mean_x, mean_y, sxx, sxy, syy):
+        total = self.count + count
+        dx = mean_x - self.mean_x
+        dy = mean_y - self.mean_y
+        weight = self.count * count / total
+        self.sxx += sxx + dx * dx * weight
+        self.sxy += sxy + dx * dy * weight
+        self.syy += syy + dy * dy * weight
+        self.mean_x += dx * count / total
+        self.mean_y += dy * count / total
+        self.count = total
+
+    def _update_sample(self, distance_m, path_loss):
+        if not self.sample_size:
+            return
+        keys = np.concatenate((self._sample_keys, self._rng.random(len(distance_m))))
+        distance_m = np.concatenate((self.sample_distance_m, distance_m))
+        path_loss = np.concatenate((self.sample_path_loss_db, path_loss))
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, distance_m, path_loss = keys[keep], distance_m[keep], path_loss[keep]
+        self._sample_keys = keys
+        self.sample_distance_m = distance_m
+        self.sample_path_loss_db = path_loss
+
+    def result(self, confidence=DEFAULT_CONFIDENCE):
+        """Current estimate; raises ValueError while the measurements cannot determine it."""
+        if self.count < 3 or self.sxx <= 0:
+            raise ValueError("At least three measurements at different distances are needed to fit the exponent.")
+        slope = self.sxy / self.sxx
+        offset = self.mean_y - slope * self.mean_x
+        sse = max(self.syy - slope * self.sxy, 0.0)
+        dof = self.count - 2
+        variance = sse / dof
+        slope_se = math.sqrt(variance / self.sxx)
+        offset_se = math.sqrt(variance * (1 / self.count + self.mean_x ** 2 / self.sxx))
+        t = t_quantile(0.5 + confidence / 2, dof)
+        return FitResult(
+            n=slope,
+            n_interval=(slope - t * slope_se, slope + t * slope_se),
+            offset_db=offset,
+            offset_interval=(offset - t * offset_se, offset + t * offset_se),
+            rmse_db=math.sqrt(sse / self.count),
+            r_squared=1 - sse / self.syy if self.syy > 0 else 1.0,
+            count=self.count,
+            skipped=self.skipped,
+            confidence=confidence,
+        )
+
+    def fitted_path_loss_db(self, distance_m, freq_mhz):
+        """Path loss of the fitted model at the given distances."""
+        fit = self.result()
+        distance_km = np.asarray(distance_m, dtype=float) / core.M_PER_KM
+        loss = self.model.path_loss_db(distance_km, freq_mhz, fit.n, **self.model_params) + fit.offset_db
+        if self.atmospheric:
+            loss = loss + atmosphere.attenuation_db(distance_km, freq_mhz, **self.atmospheric)
+        return loss
+
+
+def read_measurements(source, freq_mhz=None, block_kb=DEFAULT_BLOCK_KB):
+    """Yields {distance_m, rssi_dbm, freq_mhz: array} per block of a measurement CSV.
+
+    source is a path, a binary file object or "-" for stdin. Smaller blocks
+    give more frequent updates on a slow live stream. Empty cells are NaN.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    if source == "-":
+        source = sys.stdin.buffer
+    reader = pa_csv.open_csv(source, read_options=pa_csv.ReadOptions(block_size=block_kb * 1024))
+    names = reader.schema.names
+    missing = [name for name in MEASUREMENT_COLUMNS if name not in names]
+    if "freq_mhz" not in names and freq_mhz is None:
+        missing.append("freq_mhz")
+    if missing:
+        raise ValueError(f"Measurement file is missing required column(s): {', '.join(missing)}")
+    try:
+        for batch in reader:
+            columns = {name: batch.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False)
+                       for name in MEASUREMENT_COLUMNS + ("freq_mhz",) if name in names}
+            columns.setdefault("freq_mhz", freq_mhz)
+            yield columns
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Measurement file could not be read: {e}") from None
+
+
+def fit_stream(batches, fit, p_tx, g_tx=0.0, l_tx=0.0, g_rx=0.0, l_rx=0.0):
+    """Feeds measurement batches to fit, yielding it after each batch for live reporting."""
+    for batch in batches:
+        yield fit.update(batch["distance_m"], batch["rssi_dbm"], batch["freq_mhz"], p_tx, g_tx, l_tx, g_rx, l_rx)
+
+
+def format_result(fit):
+    """One-line summary of a FitResult."""
+    level = f"{fit.confidence:.0%}"
+    return (f"{fit.count:,} measurements: n = {fit.n:.3f} ({level} CI {fit.n_interval[0]:.3f} to {fit.n_interval[1]:.3f}), "
+            f"offset {fit.offset_db:+.2f} dB ({fit.offset_interval[0]:+.2f} to {fit.offset_interval[1]:+.2f}), "
+            f"RMSE {fit.rmse_db:.2f} dB, R^2 {fit.r_squared:.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m link_budget.telemetry",
+        description="Fit the path loss exponent to streamed RSSI measurements.",
+    )
+    parser.add_argument("input", help="Measurement CSV (distance_m, rssi_dbm[, freq_mhz]), '-' for stdin")
+    parser.add_argument("--p-tx", type=float, required=True, help="Transmit power (dBm)")
+    parser.add_argument("--g-tx", type=float, default=0.0, help="Transmit antenna gain (dBi)")
+    parser.add_argument("--l-tx", type=float, default=0.0, help="Transmit cable loss (dB)")
+    parser.add_argument("--g-rx", type=float, default=0.0, help="Receiver antenna gain (dBi)")
+    parser.add_argument("--l-rx", type=float, default=0.0, help="Receiver cable loss (dB)")
+    parser.add_argument("--freq-mhz", type=float, help="Frequency (MHz) of rows without a freq_mhz column")
+    parser.add_argument("--model", choices=[name for name, model in models.MODELS.items()
+                                            if isinstance(model, models.ReferenceDistanceModel)],
+                        default="1m", help="Reference-distance model to fit")
+    parser.add_argument("--model-param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra propagation model input, e.g. floor_loss_db=15 (repeatable)")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE, help="Confidence level (default 0.95)")
+    parser.add_argument("--block-kb", type=int, default=DEFAULT_BLOCK_KB,
+                        help="Read size per update; small values follow a live stream closely")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final fit")
+    args = parser.parse_args(argv)
+
+    if not 0 < args.confidence < 1:
+        parser.error("--confidence must be between 0 and 1.")
+    if args.block_kb <= 0:
+        parser.error("--block-kb must be a positive number.")
+    try:
+        model_params = {name: float(value) for name, value in (item.split("=", 1) for item in args.model_param)}
+    except ValueError:
+        parser.error("--model-param values must be NAME=NUMBER.")
+
+    fit = ExponentFit(args.model, sample_size=0, **model_params)
+    try:
+        for fit in fit_stream(read_measurements(args.input, args.freq_mhz, args.block_kb), fit,
+                              args.p_tx, args.g_tx, args.l_tx, args.g_rx, args.l_rx):
+            if not args.quiet:
+                try:
+                    print(format_result(fit.result(args.confidence)), file=sys.stderr, flush=True)
+                except ValueError:
+                    pass  # not enough measurements yet
+    except KeyboardInterrupt:
+        pass  # stopping a live stream still reports the fit so far
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        print(format_result(fit.result(args.confidence)))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if fit.skipped:
+        print(f"Skipped {fit.skipped:,} rows with missing or non-positive values.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
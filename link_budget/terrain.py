@@ -0,0 +1,219 @@
+"""
+Terrain-aware point-to-point links from a local elevation raster.
+
+The elevation model is a 2D float array stored as .npy (opened as a memory
+map, so rasters larger than RAM work) with a JSON sidecar of the same name
+giving its georeferencing in the same projected meter coordinates used by
+the coverage grid:
+
+    dem.npy       elevation (m), row 0 at origin_y, column 0 at origin_x
+    dem.npy.json  {"origin_x": 0.0, "origin_y": 0.0, "cell_size_m": 30.0}
+
+Terrain profiles are sampled for many links at once with bilinear
+interpolation. The raster is read in square tiles that are kept in a bounded
+LRU cache, so links in the same area reuse tiles already read from disk.
+
+For every link the single dominant obstruction (largest Fresnel-Kirchhoff
+parameter v along the path, including 4/3 effective earth curvature) gives
+the knife-edge diffraction loss of ITU-R P.526:
+
+    J(v) = 6.9 + 20log10(sqrt((v - 0.1)^2 + 1) + v - 0.1)   for v > -0.78, else 0
+"""
+
+import json
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import core
+from link_budget.cache import LRUCache
+
+SPEED_OF_LIGHT_M_S = 299_792_458.0
+EFFECTIVE_EARTH_RADIUS_M = 4 / 3 * 6_371_000.0
+
+DEFAULT_TILE_SIZE = 256
+
+# Profiles are sampled at the raster resolution by default, within these bounds
+MIN_PROFILE_SAMPLES = 16
+MAX_PROFILE_SAMPLES = 4096
+
+# Fraction of the first Fresnel zone that must be clear for a path to count as line of sight
+FRESNEL_CLEARANCE_RATIO = 0.6
+
+
+class ElevationModel:
+    """Memory-mapped elevation raster with tile-cached, vectorized bilinear sampling."""
+
+    def __init__(self, elevation, origin_x=0.0, origin_y=0.0, cell_size_m=1.0,
+                 tile_size=DEFAULT_TILE_SIZE, cache_bytes=256 * 1024 * 1024):
+        if elevation.ndim != 2:
+            raise ValueError("Elevation raster must be a 2D array.")
+        if cell_size_m <= 0:
+            raise ValueError("Raster cell size must be positive.")
+        self.elevation = elevation
+        self.origin_x = float(origin_x)
+        self.origin_y = float(origin_y)
+        self.cell_size_m = float(cell_size_m)
+        self.tile_size = tile_size
+        self._tiles = LRUCache(max_entries=4096, max_bytes=cache_bytes)
+
+    @classmethod
+    def open(cls, path, **kwargs):
+        """Opens a .npy raster and its .json georeferencing sidecar without reading the data."""
+        with open(f"{path}.json") as f:
+            georef = json.load(f)
+        elevation = np.load(path, mmap_mode="r")
+        return cls(elevation, georef.get("origin_x", 0.0), georef.get("origin_y", 0.0),
+                   georef["cell_size_m"], **kwargs)
+
+    def _tile(self, tile_row, tile_col):
+        """Returns one tile as an in-memory float array, with one extra row/column for interpolation."""
+        def read():
+            r0 = tile_row * self.tile_size
+            c0 = tile_col * self.tile_size
+            return np.asarray(self.elevation[r0:r0 + self.tile_size + 1, c0:c0 + self.tile_size + 1], dtype=float)
+
+        return self._tiles.get_or_compute((tile_row, tile_col), read)
+
+    def sample(self, x, y):
+        """Bilinear elevation (m) at arrays of x, y coordinates; NaN outside the raster."""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        col = (x - self.origin_x) / self.cell_size_m
+        row = (y - self.origin_y) / self.cell_size_m
+
+        rows, cols = self.elevation.shape
+        inside = (row >= 0) & (row <= rows - 1) & (col >= 0) & (col <= cols - 1)
+        heights = np.full(x.shape, np.nan)
+
+        # Clamp so points on the last row/column interpolate inside the raster
+        r_idx = np.minimum(np.floor(row[inside]).astype(np.int64), max(rows - 2, 0))
+        c_idx = np.minimum(np.floor(col[inside]).astype(np.int64), max(cols - 2, 0))
+        fr = row[inside] - r_idx
+        fc = col[inside] - c_idx
+
+        tile_ids = (r_idx // self.tile_size) * (cols // self.tile_size + 1) + c_idx // self.tile_size
+        values = np.empty(len(r_idx))
+        for tile_id in np.unique(tile_ids):
+            sel = tile_ids == tile_id
+            tr = r_idx[sel][0] // self.tile_size
+            tc = c_idx[sel][0] // self.tile_size
+            tile = self._tile(tr, tc)
+            lr = r_idx[sel] - tr * self.tile_size
+            lc = c_idx[sel] - tc * self.tile_size
+            lr1 = np.minimum(lr + 1, tile.shape[0] - 1)
+            lc1 = np.minimum(lc + 1, tile.shape[1] - 1)
+            top = tile[lr, lc] * (1 - fc[sel]) + tile[lr, lc1] * fc[sel]
+            bottom = tile[lr1, lc] * (1 - fc[sel]) + tile[lr1, lc1] * fc[sel]
+            values[sel] = top * (1 - fr[sel]) + bottom * fr[sel]
+
+        heights[inside] = values
+        return heights
+
+
+class TerrainProfile(NamedTuple):
+    """Terrain and path geometry along each link, shape (links, samples)."""
+    distance_m: np.ndarray         # distance from the transmitter
+    terrain_m: np.ndarray          # terrain elevation plus earth bulge
+    line_of_sight_m: np.ndarray    # height of the direct ray
+    fresnel_radius_m: np.ndarray   # first Fresnel zone radius
+
+
+class TerrainResult(NamedTuple):
+    """Per-link terrain evaluation."""
+    distance_km: np.ndarray
+    diffraction_loss_db: np.ndarray
+    clearance_ratio: np.ndarray     # min over the path of (ray clearance / first Fresnel radius)
+    line_of_sight: np.ndarray       # clearance_ratio >= FRESNEL_CLEARANCE_RATIO
+
+
+def knife_edge_loss_db(v):
+    """Single knife-edge diffraction loss J(v) of ITU-R P.526 (dB)."""
+    v = np.asarray(v, dtype=float)
+    loss = 6.9 + 20 * np.log10(np.sqrt((v - 0.1) ** 2 + 1) + v - 0.1)
+    return np.where(v > -0.78, loss, 0.0)
+
+
+def _profile_samples(dem, length_m):
+    """Enough samples for the longest path to visit every raster cell it crosses."""
+    longest = float(np.max(length_m, initial=0.0))
+    needed = int(np.ceil(longest / dem.cell_size_m)) + 1 if np.isfinite(longest) else MIN_PROFILE_SAMPLES
+    return min(max(needed, MIN_PROFILE_SAMPLES), MAX_PROFILE_SAMPLES)
+
+
+def terrain_profiles(dem, tx_xy, rx_xy, tx_height_m, rx_height_m, freq_mhz, samples=None):
+    """Samples the terrain between every (tx, rx) pair; antenna heights are above ground.
+
+    By default the sample count follows the raster resolution along the longest path.
+    """
+    tx_xy = np.atleast_2d(np.asarray(tx_xy, dtype=float))
+    rx_xy = np.atleast_2d(np.asarray(rx_xy, dtype=float))
+    if samples is None:
+        samples = _profile_samples(dem, np.hypot(*(rx_xy - tx_xy).T))
+    fraction = np.linspace(0.0, 1.0, samples)
+
+    points_x = tx_xy[:, :1] + (rx_xy[:, :1] - tx_xy[:, :1]) * fraction
+    points_y = tx_xy[:, 1:] + (rx_xy[:, 1:] - tx_xy[:, 1:]) * fraction
+    ground = dem.sample(points_x, points_y)
+
+    length = np.hypot(*(rx_xy - tx_xy).T)[:, np.newaxis]
+    d1 = length * fraction
+    d2 = length - d1
+    bulge = d1 * d2 / (2 * EFFECTIVE_EARTH_RADIUS_M)
+
+    tx_top = ground[:, :1] + np.reshape(tx_height_m, (-1, 1))
+    rx_top = ground[:, -1:] + np.reshape(rx_height_m, (-1, 1))
+    line_of_sight = tx_top + (rx_top - tx_top) * fraction
+
+    wavelength = SPEED_OF_LIGHT_M_S / (np.reshape(freq_mhz, (-1, 1)) * 1e6)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fresnel = np.sqrt(wavelength * d1 * d2 / length)
+
+    return TerrainProfile(d1, ground + bulge, line_of_sight, fresnel)
+
+
+def evaluate_links(dem, tx_xy, rx_xy, tx_height_m, rx_height_m, freq_mhz,
+                   samples=None, chunk_size=1024):
+    """Fresnel clearance and knife-edge diffraction loss for many links at once.
+
+    Links are processed in chunks of `chunk_size` so the (links x samples)
+    profile arrays stay bounded. Links leaving the raster get NaN results.
+    """
+    tx_xy = np.atleast_2d(np.asarray(tx_xy, dtype=float))
+    rx_xy = np.atleast_2d(np.asarray(rx_xy, dtype=float))
+    n_links = max(len(tx_xy), len(rx_xy))
+    tx_xy = np.broadcast_to(tx_xy, (n_links, 2))
+    rx_xy = np.broadcast_to(rx_xy, (n_links, 2))
+    tx_h = np.broadcast_to(np.asarray(tx_height_m, dtype=float), (n_links,))
+    rx_h = np.broadcast_to(np.asarray(rx_height_m, dtype=float), (n_links,))
+    freq = np.broadcast_to(np.asarray(freq_mhz, dtype=float), (n_links,))
+
+    loss = np.empty(n_links)
+    clearance = np.empty(n_links)
+    for start in range(0, n_links, chunk_size):
+        part = slice(start, start + chunk_size)
+        profile = terrain_profiles(dem, tx_xy[part], rx_xy[part], tx_h[part], rx_h[part], freq[part], samples)
+
+        # Endpoints have zero Fresnel radius; only interior samples can obstruct
+        obstruction = (profile.terrain_m - profile.line_of_sight_m)[:, 1:-1]
+        d1 = profile.distance_m[:, 1:-1]
+        d2 = profile.distance_m[:, -1:] - d1
+        wavelength = SPEED_OF_LIGHT_M_S / (freq[part, np.newaxis] * 1e6)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            v = obstruction * np.sqrt(2 / wavelength * (1 / d1 + 1 / d2))
+            ratio = -obstruction / profile.fresnel_radius_m[:, 1:-1]
+
+        # Propagate NaN (outside the raster) instead of letting max/min skip it
+        any_nan = np.isnan(v).any(axis=1)
+        v_max = np.where(any_nan, np.nan, np.max(np.nan_to_num(v, nan=-np.inf), axis=1, initial=-np.inf))
+        loss[part] = np.where(any_nan, np.nan, knife_edge_loss_db(v_max))
+        clearance[part] = np.where(any_nan, np.nan, np.min(np.nan_to_num(ratio, nan=np.inf), axis=1, initial=np.inf))
+
+    distance_km = np.hypot(*(rx_xy - tx_xy).T) / core.M_PER_KM
+    return TerrainResult(distance_km, loss, clearance, clearance >= FRESNEL_CLEARANCE_RATIO)
+
+
+def link_margin_db(max_path_loss, freq_mhz, n, model_choice, terrain, **model_params):
+    """Link margin (dB) of each terrain-evaluated link, including its diffraction loss."""
+    path_loss = core.path_loss_db(freq_mhz, n, model_choice, terrain.distance_km, **model_params)
+    return np.asarray(max_path_loss, dtype=float) - path_loss - terrain.diffraction_loss_db
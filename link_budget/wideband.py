@@ -0,0 +1,218 @@
+"""
+Wideband per-channel link budgets with frequency-dependent gain and loss.
+
+Antenna gains and cable losses are given as tables against frequency and
+interpolated linearly onto every channel of a band, so the budget and the
+maximum distance of thousands of channels are evaluated in one vectorized
+call to the core. Channels outside a table's frequency range take the value
+at the nearest end of the table and are flagged as extrapolated.
+
+Table files are CSV with a header and two columns (any names), frequency in
+MHz and value in dB, e.g.:
+
+    freq_mhz,gain_dbi
+    2400,5.8
+    2450,6.1
+    2500,5.5
+
+Parsed tables are cached per file version (path and modification time), so
+re-planning a band with the same files does not read them again.
+
+How to Run:
+    python -m link_budget.wideband channels.csv --start-mhz 2400 --stop-mhz 2483.5 --spacing-mhz 0.5 \\
+        --p-tx 20 --p-rx-sensitivity -95 --g-tx antenna.csv --l-tx cable.csv
+"""
+
+import argparse
+import csv
+import functools
+import os
+import sys
+from typing import NamedTuple
+
+import numpy as np
+
+from link_budget import core
+
+# Budget inputs that may be given as a frequency table instead of a constant
+TABLE_INPUTS = ("g_tx", "l_tx", "g_rx", "l_rx")
+
+MAX_CHANNELS = 1_000_000
+
+
+class FrequencyTable:
+    """Gain or loss (dB) against frequency (MHz), linearly interpolated between points."""
+
+    def __init__(self, freq_mhz, value_db, name=""):
+        freq = np.asarray(freq_mhz, dtype=float)
+        values = np.asarray(value_db, dtype=float)
+        if freq.ndim != 1 or freq.shape != values.shape or len(freq) == 0:
+            raise ValueError("A frequency table needs matching, non-empty frequency and value columns.")
+        if not (np.isfinite(freq).all() and np.isfinite(values).all()):
+            raise ValueError("Frequency table entries must be finite numbers.")
+        order = np.argsort(freq, kind="stable")
+        self.freq_mhz = freq[order]
+        self.value_db = values[order]
+        if (np.diff(self.freq_mhz) == 0).any():
+            raise ValueError("Frequency table has duplicate frequencies.")
+        self.name = name
+
+    @classmethod
+    def read(cls, source, name=""):
+        """Reads a two-column CSV table (frequency MHz, value dB) from a path or text file object."""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, newline="") as f:
+                return cls.read(f, name or os.path.basename(source))
+        rows = [row for row in csv.reader(source) if row and any(cell.strip() for cell in row)]
+        try:
+            if rows:
+                float(rows[0][0])
+        except ValueError:
+            rows = rows[1:]  # header
+        try:
+            pairs = [(float(row[0]), float(row[1])) for row in rows]
+        except (ValueError, IndexError):
+            raise ValueError(f"Frequency table '{name}' must have two numeric columns.") from None
+        freq, values = zip(*pairs) if pairs else ((), ())
+        return cls(freq, values, name)
+
+    def __call__(self, freq_mhz):
+        """Interpolated value (dB) at each frequency, holding the end values outside the table."""
+        return np.interp(np.asarray(freq_mhz, dtype=float), self.freq_mhz, self.value_db)
+
+    def covers(self, freq_mhz):
+        """Mask of the frequencies inside the table's range."""
+        freq = np.asarray(freq_mhz, dtype=float)
+        return (freq >= self.freq_mhz[0]) & (freq <= self.freq_mhz[-1])
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_table(path, mtime):
+    return FrequencyTable.read(path)
+
+
+def load_table(path):
+    """Reads a table file once per version; later calls return the cached, already parsed table."""
+    path = os.path.abspath(path)
+    return _cached_table(path, os.path.getmtime(path))
+
+
+class WidebandResult(NamedTuple):
+    """Per-channel inputs taken from the tables and the resulting budget and distance."""
+    freq_mhz: np.ndarray
+    gains: dict
+    max_path_loss: np.ndarray
+    distances: core.Distances
+    extrapolated: np.ndarray
+
+    @property
+    def worst_index(self):
+        """Index of the channel with the shortest range (infeasible channels count as zero)."""
+        return int(np.argmin(np.where(self.distances.feasible, self.distances.km, 0.0)))
+
+    @property
+    def best_index(self):
+        return int(np.argmax(np.where(self.distances.feasible, self.distances.km, 0.0)))
+
+
+def channel_frequencies(start_mhz, stop_mhz, spacing_mhz):
+    """Center frequencies from start to stop (inclusive when it falls on the grid)."""
+    if spacing_mhz <= 0:
+        raise ValueError("Channel spacing must be positive.")
+    if stop_mhz < start_mhz:
+        raise ValueError("The band must stop at or above its start frequency.")
+    count = int(np.floor((stop_mhz - start_mhz) / spacing_mhz + 1e-9)) + 1
+    if count > MAX_CHANNELS:
+        raise ValueError(f"The band has {count:,} channels; at most {MAX_CHANNELS:,} are supported.")
+    return start_mhz + spacing_mhz * np.arange(count)
+
+
+def channel_budget(freq_mhz, p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity,
+                   n, model_choice, **model_params):
+    """Evaluates the link budget of every channel in freq_mhz.
+
+    Any of g_tx, l_tx, g_rx and l_rx may be a FrequencyTable (or any callable
+    of frequency) instead of a number; the other inputs apply to all channels.
+    """
+    freq = np.asarray(freq_mhz, dtype=float)
+    extrapolated = np.zeros(freq.shape, dtype=bool)
+    gains = {}
+    for name, value in zip(TABLE_INPUTS, (g_tx, l_tx, g_rx, l_rx)):
+        if callable(value):
+            gains[name] = value(freq)
+            if isinstance(value, FrequencyTable):
+                extrapolated |= ~value.covers(freq)
+        else:
+            gains[name] = np.broadcast_to(np.asarray(value, dtype=float), freq.shape)
+
+    pl = core.max_path_loss(p_tx, gains["g_tx"], gains["l_tx"], gains["g_rx"], gains["l_rx"],
+                            l_fade, l_misc, p_rx_sensitivity)
+    distances = core.distance_from_path_loss(pl, freq, n, model_choice, **model_params)
+    return WidebandResult(freq, gains, pl, distances, extrapolated)
+
+
+def write_channels(destination, result):
+    """Writes one CSV row per channel (frequency, table values, budget, distance) to a path or text file object."""
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, "w", newline="") as f:
+            return write_channels(f, result)
+    columns = {"freq_mhz": result.freq_mhz, **result.gains, "max_path_loss": result.max_path_loss,
+               "distance_km": result.distances.km, "feasible": result.distances.feasible,
+               "extrapolated": result.extrapolated}
+    writer = csv.writer(destination)
+    writer.writerow(columns)
+    writer.writerows(zip(*(np.asarray(values).tolist() for values in columns.values())))
+
+
+def _table_or_number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return load_table(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m link_budget.wideband",
+        description="Per-channel maximum distance across a band with frequency-dependent gains and losses.",
+    )
+    parser.add_argument("output", help="Output CSV with one row per channel")
+    parser.add_argument("--start-mhz", type=float, required=True, help="First channel center frequency (MHz)")
+    parser.add_argument("--stop-mhz", type=float, required=True, help="Last channel center frequency (MHz)")
+    parser.add_argument("--spacing-mhz", type=float, required=True, help="Channel spacing (MHz)")
+    parser.add_argument("--p-tx", type=float, required=True, help="Transmit power (dBm)")
+    parser.add_argument("--p-rx-sensitivity", type=float, required=True, help="Receiver sensitivity (dBm)")
+    for name, label in (("g-tx", "Transmit antenna gain (dBi)"), ("l-tx", "Transmit cable loss (dB)"),
+                        ("g-rx", "Receiver antenna gain (dBi)"), ("l-rx", "Receiver cable loss (dB)")):
+        parser.add_argument(f"--{name}", default="0", help=f"{label}: a number or a table CSV file")
+    parser.add_argument("--l-fade", type=float, default=0.0, help="Fade margin (dB)")
+    parser.add_argument("--l-misc", type=float, default=0.0, help="Misc. losses (dB)")
+    parser.add_argument("--n", type=float, default=2.0, help="Path loss exponent")
+    parser.add_argument("--model", choices=tuple(core.MODEL_CODES), default="1m", help="Path loss model")
+    parser.add_argument("--model-param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra propagation model input, e.g. h_tx_m=10 (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        model_params = {name: float(value) for name, value in (item.split("=", 1) for item in args.model_param)}
+    except ValueError:
+        parser.error("--model-param values must be NAME=NUMBER.")
+
+    try:
+        freq = channel_frequencies(args.start_mhz, args.stop_mhz, args.spacing_mhz)
+        tables = [_table_or_number(value) for value in (args.g_tx, args.l_tx, args.g_rx, args.l_rx)]
+    except (ValueError, OSError) as e:
+        parser.error(str(e))
+
+    result = channel_budget(freq, args.p_tx, *tables, args.l_fade, args.l_misc, args.p_rx_sensitivity,
+                            args.n, args.model, **model_params)
+    write_channels(args.output, result)
+
+    worst = result.worst_index
+    print(f"{len(freq):,} channels; worst {freq[worst]:.3f} MHz at {result.distances.km[worst]:.3f} km, "
+          f"{int(result.extrapolated.sum()):,} outside the tables", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,8 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import math
+from tkinter import ttk, filedialog, messagebox
 import numpy as np
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import (
-    FigureCanvasTkAgg,
-    NavigationToolbar2Tk
-)
+
+from link_budget import atmosphere, core, models, profiling, scenarios, solver, telemetry
 class LinkBudgetCalculator(tk.Tk):
     """
     An interactive GUI application for calculating the maximum communication
@@ -16,6 +12,26 @@ class LinkBudgetCalculator(tk.Tk):
     receiver sensitivity, and a path loss exponent. The application
     calculates the maximum achievable distance.
     """
+    # Input events arriving within this window are coalesced into one redraw
+    # (~one display frame at 60 Hz)
+    REDRAW_DELAY_MS = 16
+
+    # Exponent sweep shown in the plot
+    N_VALUES = np.linspace(2, 10, 100)
+
+    # Input label -> link budget argument name
+    BUDGET_INPUTS = {
+        "Transmit Power (dBm)": "p_tx",
+        "Transmit Antenna Gain (dBi)": "g_tx",
+        "Transmit Cable Loss (dB)": "l_tx",
+        "Frequency (MHz)": "freq_mhz",
+        "Receiver Antenna Gain (dBi)": "g_rx",
+        "Receiver Cable Loss (dB)": "l_rx",
+        "Fade Margin (dB)": "l_fade",
+        "Misc. Losses (dB)": "l_misc",
+        "Receiver Sensitivity (dBm)": "p_rx_sensitivity",
+    }
+
     def __init__(self):
         super().__init__()
         self.title("Link Budget Distance Calculator")
@@ -38,12 +54,33 @@ class LinkBudgetCalculator(tk.Tk):
         self.result_ft_var = tk.StringVar(value="---")
         self.fspl_exponent_var = tk.DoubleVar(value=2.0)
         self.model_choice_var = tk.StringVar(value="1km")
+        self.model_param_vars = {}
+        self.model_param_frame = None
+        self.atmosphere_var = tk.BooleanVar(value=False)
+        self.atmosphere_vars = {}
+        self.target_km_var = tk.StringVar(value="5")
+        self.design_vars = {
+            "Required Tx Power (dBm):": tk.StringVar(value="---"),
+            "Required Sensitivity (dBm):": tk.StringVar(value="---"),
+            "Required Tx Antenna Gain (dBi):": tk.StringVar(value="---"),
+            "Max FSPL Exponent:": tk.StringVar(value="---"),
+        }
+
+        self.scenario_store = scenarios.ScenarioStore()
+        self.scenario_name_var = tk.StringVar()
+        self.scenario_combo = None
 
+        self.plot_frame = None
         self.fig = None
         self.ax = None
         self.canvas = None
+        self.sweep_line = None
+        self.current_marker = None
+        self._pending_update = None
         self.create_widgets()
-        self.calculate_distance() # Perform initial calculation and plot
+        # Perform the initial calculation and plot once the window is up, so
+        # the matplotlib import does not delay the first paint
+        self.after_idle(self.calculate_distance)
 
     def create_widgets(self):
         """Creates and arranges all the GUI widgets in the main window."""
@@ -120,11 +157,63 @@ class LinkBudgetCalculator(tk.Tk):
         model_frame = ttk.LabelFrame(left_frame, text="Path Loss Model", padding="10")
         model_frame.pack(fill=tk.X, pady=10)
         
-        rb1 = ttk.Radiobutton(model_frame, text="Classic Model (1 km reference)", variable=self.model_choice_var, value="1km", command=self.calculate_distance)
-        rb1.pack(anchor=tk.W)
-        rb2 = ttk.Radiobutton(model_frame, text="Log-distance Model (1m reference)", variable=self.model_choice_var, value="1m", command=self.calculate_distance)
-        rb2.pack(anchor=tk.W)
-
+        # One radio button per registered propagation model
+        for model in models.MODELS.values():
+            rb = ttk.Radiobutton(model_frame, text=model.label, variable=self.model_choice_var, value=model.name, command=self._on_model_change)
+            rb.pack(anchor=tk.W)
+
+        # Inputs specific to the selected model are rebuilt when the model changes
+        self.model_param_frame = ttk.Frame(model_frame)
+        self.model_param_frame.pack(fill=tk.X, pady=(5, 0))
+        self._build_model_param_widgets()
+
+        fit_button = ttk.Button(model_frame, text="Fit n from Measurements...", command=self.fit_from_measurements)
+        fit_button.pack(anchor=tk.W, pady=(5, 0))
+
+        # --- Atmospheric Losses ---
+        atmosphere_frame = ttk.LabelFrame(left_frame, text="Atmospheric Losses", padding="10")
+        atmosphere_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Checkbutton(atmosphere_frame, text="Gas & rain attenuation", variable=self.atmosphere_var,
+                        command=self.calculate_distance).grid(row=0, column=0, columnspan=2, sticky="w")
+        for row, (name, spec) in enumerate(atmosphere.PARAMETERS.items(), start=1):
+            ttk.Label(atmosphere_frame, text=spec.label).grid(row=row, column=0, sticky="w", padx=5, pady=2)
+            if spec.choices:
+                default_label = next(label for label, value in spec.choices.items() if value == spec.default)
+                var = tk.StringVar(value=default_label)
+                widget = ttk.Combobox(atmosphere_frame, textvariable=var, values=list(spec.choices), state="readonly", width=22)
+                widget.bind("<<ComboboxSelected>>", self._on_input_change)
+            else:
+                var = tk.StringVar(value=f"{spec.default:g}")
+                widget = ttk.Entry(atmosphere_frame, textvariable=var, width=10)
+                widget.bind("<KeyRelease>", self._on_input_change)
+            widget.grid(row=row, column=1, sticky="e", padx=5, pady=2)
+            self.atmosphere_vars[name] = var
+
+        # --- Design Solver ---
+        design_frame = ttk.LabelFrame(left_frame, text="Design for Target Distance", padding="10")
+        design_frame.pack(fill=tk.X)
+
+        ttk.Label(design_frame, text="Target Distance (km)").grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        target_entry = ttk.Entry(design_frame, textvariable=self.target_km_var, width=10)
+        target_entry.bind("<Return>", lambda event: self.solve_design())
+        target_entry.grid(row=0, column=1, sticky="e", padx=5)
+        solve_button = ttk.Button(design_frame, text="Solve", command=self.solve_design)
+        solve_button.grid(row=0, column=2, padx=(5, 0))
+
+        for i, (text, var) in enumerate(self.design_vars.items(), start=1):
+            ttk.Label(design_frame, text=text).grid(row=i, column=0, sticky="w", padx=5, pady=2)
+            ttk.Label(design_frame, textvariable=var, style="Result.TLabel").grid(row=i, column=1, columnspan=2, sticky="w", padx=5, pady=2)
+
+        # --- Saved Scenarios ---
+        scenario_frame = ttk.LabelFrame(left_frame, text="Scenarios", padding="10")
+        scenario_frame.pack(fill=tk.X, pady=10)
+
+        ttk.Label(scenario_frame, text="Name").grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        self.scenario_combo = ttk.Combobox(scenario_frame, textvariable=self.scenario_name_var,
+                                           values=self.scenario_store.names(), width=20)
+        self.scenario_combo.grid(row=0, column=1, sticky="ew", padx=5)
+        ttk.Button(scenario_frame, text="Save", command=self.save_scenario).grid(row=1, column=0, pady=(5, 0))
+        ttk.Button(scenario_frame, text="Load", command=self.load_scenario).grid(row=1, column=1, sticky="w", padx=5, pady=(5, 0))
 
         # --- Result Display ---
         results_display_frame = ttk.LabelFrame(right_frame, text="Maximum Communication Distance", padding="10")
@@ -144,19 +233,34 @@ class LinkBudgetCalculator(tk.Tk):
 
         results_display_frame.columnconfigure(1, weight=1)
 
-        # --- Matplotlib Plot ---
-        plot_frame = ttk.Frame(right_frame)
-        plot_frame.pack(fill=tk.BOTH, expand=True)
+        # --- Matplotlib Plot (built by _create_plot on the first update) ---
+        self.plot_frame = ttk.Frame(right_frame)
+        self.plot_frame.pack(fill=tk.BOTH, expand=True)
+
+    def _create_plot(self):
+        """Creates the figure, canvas and toolbar; matplotlib is imported here, on first use."""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 
         self.fig = Figure(figsize=(6, 4), dpi=100)
         self.ax = self.fig.add_subplot(111)
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=plot_frame)
+        # Create the plot artists once; update_plot only swaps their data
+        self.sweep_line, = self.ax.plot([], [], label="Max Distance vs. FSPL Exponent")
+        self.current_marker, = self.ax.plot([], [], 'ro') # Mark the current point
+        self.ax.set_xlabel("FSPL Path Loss Exponent (n)")
+        self.ax.set_ylabel("Maximum Distance (ft)")
+        self.ax.set_title("Impact of Path Loss Exponent on Range")
+        self.ax.grid(True, which='both', linestyle='--')
+        self.ax.legend()
+        self.fig.tight_layout()
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
         self.canvas.draw()
         # Note: The toolbar packs itself, so we only need to pack the canvas widget
         # self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
-        toolbar = NavigationToolbar2Tk(self.canvas, plot_frame)
+        toolbar = NavigationToolbar2Tk(self.canvas, self.plot_frame)
         toolbar.update()
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
@@ -170,7 +274,7 @@ class LinkBudgetCalculator(tk.Tk):
                 var.set(f"{new_value:.0f}")
             else:
                 var.set(f"{new_value:.1f}")
-            self.calculate_distance()
+            self._schedule_update()
         except ValueError:
             # Handle cases where the entry is empty or not a number
             pass
@@ -182,42 +286,83 @@ class LinkBudgetCalculator(tk.Tk):
         self.fspl_exponent_var.set(rounded_value)
 
         self.fspl_value_label.config(text=f"{rounded_value:.2f}")
+        self._schedule_update()
+
+    def _build_model_param_widgets(self):
+        """Creates entry/combobox widgets for the selected model's extra inputs."""
+        for child in self.model_param_frame.winfo_children():
+            child.destroy()
+
+        model = models.get_model(self.model_choice_var.get())
+        previous = self.model_param_vars
+        self.model_param_vars = {}
+        for row, (name, spec) in enumerate(model.parameters.items()):
+            ttk.Label(self.model_param_frame, text=spec.label).grid(row=row, column=0, sticky="w", padx=5, pady=2)
+            if spec.choices:
+                default_label = next(label for label, value in spec.choices.items() if value == spec.default)
+                var = tk.StringVar(value=default_label)
+                widget = ttk.Combobox(self.model_param_frame, textvariable=var, values=list(spec.choices), state="readonly", width=22)
+                widget.bind("<<ComboboxSelected>>", self._on_input_change)
+            else:
+                # Keep values shared between models (e.g. antenna heights) when switching
+                var = previous.get(name) or tk.StringVar(value=f"{spec.default:g}")
+                widget = ttk.Entry(self.model_param_frame, textvariable=var, width=10)
+                widget.bind("<KeyRelease>", self._on_input_change)
+            widget.grid(row=row, column=1, sticky="e", padx=5, pady=2)
+            self.model_param_vars[name] = var
+
+        if not model.uses_exponent:
+            ttk.Label(self.model_param_frame, text="This model does not use the FSPL exponent.").grid(
+                row=len(model.parameters), column=0, columnspan=2, sticky="w", padx=5, pady=2)
+
+    def _read_model_params(self):
+        """Returns the selected model's extra inputs (and the atmospheric ones, when enabled) as numbers; raises ValueError if invalid."""
+        model = models.get_model(self.model_choice_var.get())
+        params = {}
+        for name, var in self.model_param_vars.items():
+            spec = model.parameters[name]
+            params[name] = float(spec.choices[var.get()]) if spec.choices else float(var.get())
+        if self.atmosphere_var.get():
+            for name, var in self.atmosphere_vars.items():
+                spec = atmosphere.PARAMETERS[name]
+                params[name] = float(spec.choices[var.get()]) if spec.choices else float(var.get())
+        return params
+
+    def _on_model_change(self):
+        """Callback for when a different propagation model is selected."""
+        self._build_model_param_widgets()
         self.calculate_distance()
 
     def _on_input_change(self, event=None):
         """Callback for when an entry value is changed by typing."""
-        self.calculate_distance()
+        self._schedule_update()
 
-    def update_plot(self, max_path_loss, freq_mhz, current_n, current_dist_ft, model_choice):
-        """Updates the matplotlib plot with new data."""
-        self.ax.clear()
+    def _schedule_update(self):
+        """Coalesces bursts of input events into a single recalculation.
 
-        n_values = np.linspace(2, 10, 100)
-
-        if model_choice == "1m":
-            # 1-meter reference model
-            # d_m = 10 ^ ((PL - 20log10(f) + 27.55) / (10n))
-            log_term_numerator = max_path_loss - 20 * math.log10(freq_mhz) + 27.55
-            distances_m = 10 ** (log_term_numerator / (10 * n_values))
-            distances_km = distances_m / 1000
-        else:
-            # 1-km reference model
-            # d_km = 10^((PL - 20log10(f) - 32.44) / (10n))
-            log_term_numerator = max_path_loss - 20 * math.log10(freq_mhz) - 32.44
-            distances_km = 10 ** (log_term_numerator / (10 * n_values))
+        Only one update is pending at a time; it reads the latest widget values
+        when it fires, so a slider drag redraws at most once per REDRAW_DELAY_MS.
+        """
+        if self._pending_update is None:
+            self._pending_update = self.after(self.REDRAW_DELAY_MS, self._run_scheduled_update)
 
-        # Convert to feet for plotting
-        distances_ft = distances_km * 1000 * 3.28084
+    def _run_scheduled_update(self):
+        self._pending_update = None
+        self.calculate_distance()
 
-        self.ax.plot(n_values, distances_ft, label="Max Distance vs. FSPL Exponent")
-        self.ax.plot(current_n, current_dist_ft, 'ro') # Mark the current point
-        self.ax.set_xlabel("FSPL Path Loss Exponent (n)")
-        self.ax.set_ylabel("Maximum Distance (ft)")
-        self.ax.set_title("Impact of Path Loss Exponent on Range")
-        self.ax.grid(True, which='both', linestyle='--')
-        self.ax.legend()
-        self.fig.tight_layout()
-        self.canvas.draw()
+    def update_plot(self, max_path_loss, freq_mhz, current_n, current_dist_ft, model_choice, model_params=None):
+        """Updates the matplotlib plot with new data."""
+        # Evaluate the whole exponent sweep in one vectorized call
+        distances_ft = core.distance_from_path_loss(max_path_loss, freq_mhz, self.N_VALUES, model_choice, **(model_params or {})).ft
+
+        if self.canvas is None:
+            self._create_plot()
+        self.sweep_line.set_data(self.N_VALUES, distances_ft)
+        self.current_marker.set_data([current_n], [current_dist_ft])
+        self.ax.relim()
+        self.ax.autoscale_view()
+        # Let Tk render during idle time instead of blocking the event loop
+        self.canvas.draw_idle()
 
     def calculate_distance(self):
         """
@@ -225,6 +370,8 @@ class LinkBudgetCalculator(tk.Tk):
         It reads all input values, validates them, computes the distance,
         and displays it in the GUI.
         """
+        # Per-stage timings of this recalculation, recorded only when LINK_BUDGET_PROFILE is set
+        profiler = profiling.RerunProfiler("gui")
         try:
             # --- Gather and validate inputs ---
             p_tx = float(self.input_vars["Transmit Power (dBm)"].get())
@@ -238,6 +385,7 @@ class LinkBudgetCalculator(tk.Tk):
             p_rx_sensitivity = float(self.input_vars["Receiver Sensitivity (dBm)"].get())
             n = self.fspl_exponent_var.get()
             model_choice = self.model_choice_var.get()
+            model_params = self._read_model_params()
 
             if not (2.0 <= n <= 10.0):
                 messagebox.showerror("Input Error", "FSPL Exponent must be between 2 and 10.")
@@ -245,35 +393,28 @@ class LinkBudgetCalculator(tk.Tk):
             if freq_mhz <= 0:
                 messagebox.showerror("Input Error", "Frequency must be a positive number.")
                 return
+            profiler.lap("parse")
 
             # --- Link Budget Calculation ---
             # Received Power = Tx Power + Gains - Losses
             # At max distance, Received Power = Receiver Sensitivity
             # p_rx_sensitivity = p_tx + g_tx + g_rx - l_tx - l_rx - fspl
             # Therefore, max allowable path loss (FSPL) is:
-            max_path_loss = p_tx + g_tx + g_rx - l_tx - l_rx - l_fade - l_misc - p_rx_sensitivity
+            max_path_loss = float(core.max_path_loss(p_tx, g_tx, l_tx, g_rx, l_rx, l_fade, l_misc, p_rx_sensitivity))
+
+            # --- FSPL to Distance Calculation (all units) ---
+            distances = core.distance_from_path_loss(max_path_loss, freq_mhz, n, model_choice, **model_params)
+            profiler.lap("compute")
 
-            if max_path_loss < 0:
+            if not distances.feasible:
                 for var in [self.result_km_var, self.result_m_var, self.result_mi_var, self.result_ft_var]:
                     var.set("Link cannot be established.")
                 return
 
-            # --- FSPL to Distance Calculation ---
-            if model_choice == "1m":
-                # Using 1-meter reference model: PL(d) = (20log10(f) - 27.55) + 10n*log10(d_m)
-                # Rearranging for d_m:
-                log_term = (max_path_loss - 20 * math.log10(freq_mhz) + 27.55) / (10 * n)
-                current_distance_m = 10 ** log_term
-                current_distance_km = current_distance_m / 1000
-            else:
-                # Using 1-km reference model: PL(d) = 20log10(f) + 10n*log10(d_km) + 32.44
-                log_term = (max_path_loss - 20 * math.log10(freq_mhz) - 32.44) / (10 * n)
-                current_distance_km = 10 ** log_term
-
-            # --- Unit Conversions ---
-            current_distance_m = current_distance_km * 1000
-            current_distance_mi = current_distance_km * 0.621371
-            current_distance_ft = current_distance_m * 3.28084
+            current_distance_km = float(distances.km)
+            current_distance_m = float(distances.m)
+            current_distance_mi = float(distances.mi)
+            current_distance_ft = float(distances.ft)
 
             # --- Update Result Display ---
             self.result_km_var.set(f"{current_distance_km:.2f}")
@@ -282,7 +423,8 @@ class LinkBudgetCalculator(tk.Tk):
             self.result_ft_var.set(f"{current_distance_ft:.2f}")
 
             # --- Update Plot ---
-            self.update_plot(max_path_loss, freq_mhz, n, current_distance_ft, model_choice)
+            with profiler.stage("render"):
+                self.update_plot(max_path_loss, freq_mhz, n, current_distance_ft, model_choice, model_params)
 
         except ValueError:
             # Suppress pop-up errors during dynamic updates for a smoother experience
@@ -290,6 +432,123 @@ class LinkBudgetCalculator(tk.Tk):
             pass
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+        finally:
+            # Also covers the early returns (invalid or infeasible inputs)
+            profiler.report()
+
+    def solve_design(self):
+        """
+        Solves the link budget backwards for the target distance, showing the
+        Tx power, sensitivity, antenna gain and maximum exponent that would
+        just reach it with the other inputs unchanged.
+        """
+        try:
+            inputs = {name: float(self.input_vars[label].get()) for label, name in self.BUDGET_INPUTS.items()}
+            inputs.update(self._read_model_params())
+            target_km = float(self.target_km_var.get())
+        except ValueError:
+            messagebox.showerror("Input Error", "Please ensure all inputs and the target distance are valid numbers.")
+            return
+        if target_km <= 0 or inputs["freq_mhz"] <= 0:
+            messagebox.showerror("Input Error", "Target distance and frequency must be positive numbers.")
+            return
+
+        result = solver.design(target_km, n=self.fspl_exponent_var.get(), model_choice=self.model_choice_var.get(), **inputs)
+
+        max_exponent = float(result.max_exponent)
+        if np.isnan(max_exponent):
+            exponent_text = "Not reachable"
+        elif np.isinf(max_exponent):
+            exponent_text = "Any"
+        else:
+            exponent_text = f"{max_exponent:.2f}"
+
+        self.design_vars["Required Tx Power (dBm):"].set(f"{float(result.tx_power_dbm):.1f}")
+        self.design_vars["Required Sensitivity (dBm):"].set(f"{float(result.sensitivity_dbm):.1f}")
+        self.design_vars["Required Tx Antenna Gain (dBi):"].set(f"{float(result.tx_gain_dbi):.1f}")
+        self.design_vars["Max FSPL Exponent:"].set(exponent_text)
+
+    def save_scenario(self):
+        """Saves the current inputs under the name typed in the Scenarios box."""
+        try:
+            inputs = {name: float(self.input_vars[label].get()) for label, name in self.BUDGET_INPUTS.items()}
+            inputs.update(self._read_model_params())
+        except ValueError:
+            messagebox.showerror("Input Error", "Please ensure all inputs are valid numbers.")
+            return
+        inputs.update(n=self.fspl_exponent_var.get(), model=self.model_choice_var.get())
+        try:
+            saved = self.scenario_store.save(self.scenario_name_var.get(), inputs)
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e))
+            return
+        self.scenario_combo.config(values=self.scenario_store.names())
+        self.scenario_name_var.set(saved.name)
+
+    def load_scenario(self):
+        """Restores the inputs of the saved scenario named in the Scenarios box and recalculates."""
+        scenario = self.scenario_store.get(self.scenario_name_var.get().strip())
+        if scenario is None:
+            messagebox.showerror("Input Error", f"No saved scenario named '{self.scenario_name_var.get()}'.")
+            return
+        inputs = scenario.inputs
+        for label, name in self.BUDGET_INPUTS.items():
+            self.input_vars[label].set(f"{inputs[name]:g}")
+        n = min(max(round(float(inputs["n"]), 1), 2.0), 10.0)
+        self.fspl_exponent_var.set(n)
+        self.fspl_value_label.config(text=f"{n:.2f}")
+        self.model_choice_var.set(inputs["model"])
+        self._build_model_param_widgets()
+        model = models.get_model(inputs["model"])
+        for name, var in self.model_param_vars.items():
+            spec = model.parameters[name]
+            value = inputs.get(name, spec.default)
+            if spec.choices:
+                var.set(next((label for label, choice in spec.choices.items() if float(choice) == float(value)),
+                             var.get()))
+            else:
+                var.set(f"{value:g}")
+        self.atmosphere_var.set(any(name in inputs for name in atmosphere.PARAMETERS))
+        for name, var in self.atmosphere_vars.items():
+            spec = atmosphere.PARAMETERS[name]
+            value = inputs.get(name, spec.default)
+            if spec.choices:
+                var.set(next((label for label, choice in spec.choices.items() if float(choice) == float(value)),
+                             var.get()))
+            else:
+                var.set(f"{value:g}")
+        self.calculate_distance()
+
+    def fit_from_measurements(self):
+        """Fits the exponent and reference offset of the selected model to an RSSI measurement CSV."""
+        path = filedialog.askopenfilename(title="Measurement File (distance_m, rssi_dbm[, freq_mhz])",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            inputs = {name: float(self.input_vars[label].get()) for label, name in self.BUDGET_INPUTS.items()}
+            model_params = self._read_model_params()
+        except ValueError:
+            messagebox.showerror("Input Error", "Please ensure all inputs are valid numbers.")
+            return
+        try:
+            fit = telemetry.ExponentFit(self.model_choice_var.get(), sample_size=0, **model_params)
+            for fit in telemetry.fit_stream(telemetry.read_measurements(path, inputs["freq_mhz"]), fit, inputs["p_tx"],
+                                            inputs["g_tx"], inputs["l_tx"], inputs["g_rx"], inputs["l_rx"]):
+                pass
+            result = fit.result()
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Fit Error", str(e))
+            return
+
+        n = min(max(round(result.n, 1), 2.0), 10.0)
+        if messagebox.askyesno("Fitted Exponent", f"{telemetry.format_result(result)}\n\n"
+                               f"Set the exponent to {n:.1f} and Misc. Losses to {result.offset_db:.1f} dB?"):
+            self.fspl_exponent_var.set(n)
+            self.fspl_value_label.config(text=f"{n:.2f}")
+            self.input_vars["Misc. Losses (dB)"].set(f"{result.offset_db:.1f}")
+            self.calculate_distance()
+
 if __name__ == "__main__":
     app = LinkBudgetCalculator()
     app.mainloop()